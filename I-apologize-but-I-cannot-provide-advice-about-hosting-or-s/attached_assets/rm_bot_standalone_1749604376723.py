@@ -16,10 +16,44 @@ import subprocess
 import threading
 import time
 import json
+import math
+import queue
+import zipfile
+import heapq
+import itertools
 import sqlite3
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from types import MappingProxyType
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import messagebox
+
+class StartupTimer:
+    """Marcos de tempo da inicialização, relativos à criação do timer"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+    
+    def mark(self, name):
+        """Registrar fim de uma etapa"""
+        self.marks.append((name, time.perf_counter()))
+    
+    def report(self):
+        """Texto com a duração de cada etapa e o total"""
+        lines = ["⏱️ Inicialização:"]
+        previous = self.start
+        for name, moment in self.marks:
+            lines.append(f"   {name}: {(moment - previous) * 1000:.0f} ms")
+            previous = moment
+        lines.append(f"   total: {(previous - self.start) * 1000:.0f} ms")
+        return "\n".join(lines)
+
+startup_timer = StartupTimer()
 
 # Auto-instalador de dependências
 def install_dependencies():
@@ -27,300 +61,3425 @@ def install_dependencies():
     import platform
     system = platform.system()
     
-    if system != "Windows":
-        print("ℹ️ Sistema não-Windows detectado. Pulando verificação de dependências.")
-        print("Para funcionalidade completa, execute no Windows com:")
-        print("pip install customtkinter pyautogui opencv-python psutil pywin32 keyboard bcrypt pillow")
-        return
+    if system != "Windows":
+        print("ℹ️ Sistema não-Windows detectado. Pulando verificação de dependências.")
+        print("Para funcionalidade completa, execute no Windows com:")
+        print("pip install customtkinter pyautogui opencv-python psutil pywin32 keyboard bcrypt pillow mss")
+        return
+    
+    # Pacote pip -> módulo importável
+    required_packages = {
+        'customtkinter': 'customtkinter',
+        'bcrypt': 'bcrypt',
+        'pillow': 'PIL'
+    }
+    
+    # Opcionais (visão/automação) - só avisar, a instalação é pesada e fica a cargo do usuário
+    optional_packages = {
+        'pyautogui': 'pyautogui',
+        'opencv-python': 'cv2',
+        'psutil': 'psutil',
+        'pywin32': 'win32api',
+        'keyboard': 'keyboard',
+        'mss': 'mss'
+    }
+    
+    print("🔧 Verificando dependências básicas...")
+    from importlib.util import find_spec
+    
+    # find_spec só localiza o módulo - sem pagar o custo de importá-lo
+    missing_packages = [package for package, module in required_packages.items() if find_spec(module) is None]
+    
+    if missing_packages:
+        print(f"📦 Instalando {len(missing_packages)} dependências básicas...")
+        try:
+            for package in missing_packages:
+                print(f"   Instalando {package}...")
+                subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
+            print("✅ Dependências básicas instaladas!")
+        except Exception as e:
+            print(f"❌ Erro na instalação: {e}")
+            print("Instale manualmente: pip install customtkinter bcrypt pillow")
+    
+    missing_optional = [package for package, module in optional_packages.items() if find_spec(module) is None]
+    if missing_optional:
+        print(f"ℹ️ Opcionais ausentes (automação limitada): {', '.join(missing_optional)}")
+        print(f"Para funcionalidade completa: pip install {' '.join(missing_optional)}")
+
+# Executar auto-instalador apenas no Windows
+if __name__ == "__main__":
+    install_dependencies()
+
+import customtkinter as ctk
+import bcrypt
+
+startup_timer.mark("customtkinter + bcrypt")
+
+# Bibliotecas de visão/automação - carregadas sob demanda por AutomationStack
+IS_WINDOWS = sys.platform == "win32"
+AUTOMATION_AVAILABLE = False
+pyautogui = cv2 = np = psutil = win32gui = win32process = win32api = win32con = keyboard = None
+
+class AutomationStack:
+    """Carregamento em segundo plano das bibliotecas de visão e automação.
+    
+    O import de cv2/numpy/pyautogui/win32 custa segundos - fica fora do caminho
+    da tela de login e roda numa thread quando a automação é necessária.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.thread = None
+        self.error = None
+        self.load_time = None
+    
+    def start(self):
+        """Iniciar carregamento (apenas uma vez)"""
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.load, name="automation-loader", daemon=True)
+                self.thread.start()
+    
+    def wait(self, timeout=None):
+        """Iniciar (se preciso) e aguardar o carregamento"""
+        self.start()
+        return self.ready.wait(timeout)
+    
+    def load(self):
+        """Importar bibliotecas e publicá-las como globais do módulo"""
+        global AUTOMATION_AVAILABLE, pyautogui, cv2, np, psutil
+        global win32gui, win32process, win32api, win32con, keyboard
+        
+        start = time.perf_counter()
+        try:
+            if IS_WINDOWS:
+                import pyautogui
+                import cv2
+                import numpy as np
+                import psutil
+                import win32gui
+                import win32process
+                import win32api
+                import win32con
+                import keyboard
+                
+                pyautogui.FAILSAFE = True
+                # Sem pausa global - o ritmo é definido por ação no InputBackend
+                pyautogui.PAUSE = 0
+                AUTOMATION_AVAILABLE = True
+                print("✅ Bibliotecas Windows carregadas com sucesso")
+            else:
+                print("⚠️ Sistema não-Windows detectado. Funcionalidades limitadas.")
+        except ImportError as e:
+            self.error = e
+            print("❌ Bibliotecas de automação não encontradas. Para Windows instale:")
+            print("pip install pyautogui opencv-python psutil pywin32 keyboard")
+            print(f"Erro específico: {e}")
+        finally:
+            self.load_time = time.perf_counter() - start
+            print(f"⏱️ Bibliotecas de automação: {self.load_time * 1000:.0f} ms (em segundo plano)")
+            self.ready.set()
+
+automation_stack = AutomationStack()
+
+# Configurar aparência
+ctk.set_appearance_mode("dark")
+ctk.set_default_color_theme("blue")
+
+DEFAULT_BCRYPT_ROUNDS = 12
+
+def bcrypt_rounds():
+    """Custo bcrypt configurado (variável RM_BOT_BCRYPT_ROUNDS, limitado a 4..31)"""
+    try:
+        rounds = int(os.environ.get("RM_BOT_BCRYPT_ROUNDS", DEFAULT_BCRYPT_ROUNDS))
+    except ValueError:
+        rounds = DEFAULT_BCRYPT_ROUNDS
+    return max(4, min(31, rounds))
+
+def hash_password(password, rounds=None):
+    """Gerar hash bcrypt da senha"""
+    salt = bcrypt.gensalt(rounds or bcrypt_rounds())
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+class ConnectionPool:
+    """Pool de conexões SQLite persistentes (WAL, pragmas ajustados e cache de statements)"""
+    
+    PRAGMAS = (
+        ("journal_mode", "WAL"),       # Leitores não bloqueiam o escritor
+        ("synchronous", "NORMAL"),     # fsync apenas no checkpoint do WAL
+        ("busy_timeout", 5000),        # Esperar lock em vez de falhar na hora
+        ("cache_size", -8000),         # ~8 MB de cache de páginas por conexão
+        ("temp_store", "MEMORY"),
+    )
+    
+    def __init__(self, db_path, max_connections=4, cached_statements=128, timeout=5.0):
+        self.db_path = db_path
+        self.max_connections = max_connections
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.idle = []
+        self.connections = []
+        self.local = threading.local()
+        self.closed = False
+    
+    def _connect(self):
+        """Abrir conexão configurada (autocommit - transações são explícitas)"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        for name, value in self.PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+    
+    def acquire(self):
+        """Obter conexão do pool (reentrante na mesma thread)"""
+        held = getattr(self.local, 'conn', None)
+        if held is not None:
+            self.local.depth += 1
+            return held
+        
+        with self.condition:
+            deadline = time.monotonic() + self.timeout
+            while True:
+                if self.closed:
+                    raise sqlite3.ProgrammingError("Pool de conexões fechado")
+                if self.idle:
+                    conn = self.idle.pop()
+                    break
+                if len(self.connections) < self.max_connections:
+                    conn = self._connect()
+                    self.connections.append(conn)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise sqlite3.OperationalError("Tempo esgotado aguardando conexão do pool")
+                self.condition.wait(remaining)
+        
+        self.local.conn = conn
+        self.local.depth = 1
+        return conn
+    
+    def release(self, conn):
+        """Devolver conexão ao pool"""
+        self.local.depth -= 1
+        if self.local.depth > 0:
+            return
+        self.local.conn = None
+        
+        if conn.in_transaction:
+            conn.rollback()  # Nunca devolver conexão com transação pendente
+        with self.condition:
+            if self.closed:
+                conn.close()
+            else:
+                self.idle.append(conn)
+                self.condition.notify()
+    
+    def close(self):
+        """Fechar todas as conexões ociosas (as em uso fecham ao serem devolvidas)"""
+        with self.condition:
+            self.closed = True
+            for conn in self.idle:
+                conn.close()
+            self.idle.clear()
+            self.condition.notify_all()
+
+class EntitlementCache:
+    """Cache de assinaturas por usuário.
+    
+    Cada entrada vale até o que vier primeiro: o fim da assinatura ou o TTL.
+    loader(user_id) retorna (expires_at, subscription_type) ou None.
+    """
+    
+    def __init__(self, loader, ttl=60.0):
+        self.loader = loader
+        self.ttl = ttl
+        self.entries = {}  # user_id -> (registro, válido_até monotônico)
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, user_id):
+        """Registro da assinatura do usuário (do cache quando válido)"""
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and now < entry[1]:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self.generation
+        
+        record = self.loader(user_id)
+        valid_for = self.ttl
+        if record is not None:
+            remaining = (record[0] - datetime.now()).total_seconds()
+            if remaining > 0:
+                valid_for = min(valid_for, remaining)
+        
+        with self.lock:
+            # Não gravar se houve invalidação durante a consulta
+            if generation == self.generation:
+                self.entries[user_id] = (record, now + valid_for)
+        return record
+    
+    def is_entitled(self, user_id):
+        """Usuário tem assinatura ativa e não expirada"""
+        record = self.get(user_id)
+        return record is not None and record[0] > datetime.now()
+    
+    def invalidate(self, user_id=None):
+        """Descartar entrada de um usuário (ou todas)"""
+        with self.lock:
+            self.generation += 1
+            if user_id is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(user_id, None)
+
+class DatabaseManager:
+    """Gerenciador do banco de dados SQLite local"""
+    
+    def __init__(self, db_path="rm_bot.db", pool_size=4, create_admin=True):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, max_connections=pool_size)
+        self.entitlements = EntitlementCache(self._load_subscription)
+        self.init_database(create_admin)
+    
+    @contextmanager
+    def connection(self):
+        """Conexão do pool para leituras (autocommit)"""
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
+    
+    @contextmanager
+    def transaction(self, immediate=True):
+        """Transação atômica - commit ao sair, rollback em exceção.
+        
+        Transações aninhadas na mesma thread participam da transação externa.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+    
+    def close(self):
+        """Fechar pool de conexões"""
+        self.pool.close()
+    
+    # Migrações em ordem: (versão, descrição, statements). Nunca editar uma
+    # migração já publicada - adicionar uma nova versão no fim da lista.
+    MIGRATIONS = [
+        (1, "tabelas users e subscriptions", [
+            '''
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    password_hash TEXT NOT NULL,
+                    is_admin BOOLEAN DEFAULT FALSE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_login TIMESTAMP
+                )
+            ''',
+            '''
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    expires_at TIMESTAMP NOT NULL,
+                    active BOOLEAN DEFAULT TRUE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    subscription_type TEXT DEFAULT 'premium',
+                    FOREIGN KEY (user_id) REFERENCES users (id)
+                )
+            ''',
+        ]),
+        (2, "índices de assinaturas e ordenação de usuários", [
+            # Cobre get_user_subscription, extend_user_subscription e o JOIN de get_all_users
+            """
+                CREATE INDEX IF NOT EXISTS idx_subscriptions_user_active
+                ON subscriptions (user_id, active, expires_at, subscription_type)
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_users_created_at ON users (created_at)",
+            "ANALYZE",
+        ]),
+        (3, "índice de expiração para operações em lote", [
+            "CREATE INDEX IF NOT EXISTS idx_subscriptions_active_expires ON subscriptions (active, expires_at)",
+        ]),
+    ]
+    
+    def schema_version(self):
+        """Versão atual do schema (0 para banco novo ou anterior às migrações)"""
+        with self.connection() as conn:
+            row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        return row[0] or 0
+    
+    def migrate(self):
+        """Aplicar migrações pendentes, cada uma em sua própria transação"""
+        with self.transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+        
+        current = self.schema_version()
+        for version, description, statements in self.MIGRATIONS:
+            if version <= current:
+                continue
+            with self.transaction() as conn:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description)
+                )
+            print(f"🗄️ Migração {version} aplicada: {description}")
+    
+    def init_database(self, create_admin=True):
+        """Inicializar banco de dados (create_admin=False deixa o admin padrão para depois)"""
+        self.migrate()
+        if create_admin:
+            self.ensure_default_admin()
+    
+    def ensure_default_admin(self, hasher=hash_password):
+        """Criar usuário admin padrão se ainda não existir - True se criado.
+        
+        hasher(senha) gera o hash; o bcrypt roda fora de qualquer conexão do pool.
+        """
+        if self.get_credentials('admin'):
+            return False
+        password_hash = hasher('admin123')
+        
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM users WHERE username = 'admin'").fetchone():
+                return False
+            cursor = conn.execute(
+                "INSERT INTO users (username, password_hash, is_admin) VALUES (?, ?, ?)",
+                ('admin', password_hash, True)
+            )
+            
+            # Criar assinatura para admin
+            expires_at = datetime.now() + timedelta(days=365)
+            conn.execute(
+                "INSERT INTO subscriptions (user_id, expires_at, subscription_type) VALUES (?, ?, ?)",
+                (cursor.lastrowid, expires_at, 'admin')
+            )
+        return True
+    
+    def get_credentials(self, username):
+        """Obter (id, password_hash, is_admin) do usuário ou None"""
+        with self.connection() as conn:
+            return conn.execute(
+                "SELECT id, password_hash, is_admin FROM users WHERE username = ?", (username,)
+            ).fetchone()
+    
+    def record_login(self, user_id, password_hash=None):
+        """Atualizar último login (e o hash da senha, se re-gerado)"""
+        with self.transaction() as conn:
+            if password_hash:
+                conn.execute(
+                    "UPDATE users SET last_login = ?, password_hash = ? WHERE id = ?",
+                    (datetime.now(), password_hash, user_id)
+                )
+            else:
+                conn.execute("UPDATE users SET last_login = ? WHERE id = ?", (datetime.now(), user_id))
+    
+    def authenticate_user(self, username, password):
+        """Autenticar usuário (síncrono - a UI usa AuthService)"""
+        user = self.get_credentials(username)
+        
+        # bcrypt fora da conexão - não segurar o pool durante o hash
+        if user and bcrypt.checkpw(password.encode('utf-8'), user[1].encode('utf-8')):
+            # Atualizar último login
+            self.record_login(user[0])
+            return {'id': user[0], 'username': username, 'is_admin': user[2]}
+        
+        return None
+    
+    def _load_subscription(self, user_id):
+        """Ler (expires_at, subscription_type) da assinatura ativa no banco"""
+        with self.connection() as conn:
+            subscription = conn.execute(
+                "SELECT expires_at, subscription_type FROM subscriptions WHERE user_id = ? AND active = 1",
+                (user_id,)
+            ).fetchone()
+        
+        if subscription:
+            return datetime.fromisoformat(subscription[0]), subscription[1]
+        return None
+    
+    def get_user_subscription(self, user_id):
+        """Obter assinatura do usuário"""
+        subscription = self.entitlements.get(user_id)
+        
+        if subscription:
+            expires_at, subscription_type = subscription
+            now = datetime.now()
+            return {
+                'expires_at': expires_at,
+                'subscription_type': subscription_type,
+                'is_expired': expires_at < now,
+                'days_remaining': max(0, (expires_at - now).days)
+            }
+        return None
+    
+    def is_entitled(self, user_id):
+        """Checagem barata de licença válida (cache - não consulta o banco a cada chamada)"""
+        return self.entitlements.is_entitled(user_id)
+    
+    def create_user(self, username, password=None, is_admin=False, password_hash=None):
+        """Criar novo usuário (aceita o hash já calculado em password_hash)"""
+        password_hash = password_hash or hash_password(password)
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO users (username, password_hash, is_admin) VALUES (?, ?, ?)",
+                    (username, password_hash, is_admin)
+                )
+                return cursor.lastrowid
+        except sqlite3.IntegrityError:
+            return None
+    
+    USER_COLUMNS = """
+        SELECT u.id, u.username, u.is_admin, u.created_at, u.last_login,
+               s.expires_at, s.subscription_type, s.active
+        FROM users u
+        LEFT JOIN subscriptions s ON u.id = s.user_id AND s.active = 1
+    """
+    
+    # Filtros de status aceitos por list_users (:now = horário de referência).
+    # O "+" impede o uso do índice de expiração - com ele o SQLite ordenaria todas
+    # as assinaturas filtradas; percorrer users por created_at para no LIMIT.
+    STATUS_FILTERS = {
+        'active': "+s.expires_at >= :now",
+        'expired': "+s.expires_at < :now",
+        'none': "s.user_id IS NULL",
+        'admin': "u.is_admin",
+    }
+    
+    def _user_from_row(self, row, now):
+        """Converter linha de USER_COLUMNS no dicionário de usuário"""
+        user_data = {
+            'id': row[0],
+            'username': row[1],
+            'is_admin': row[2],
+            'created_at': row[3],
+            'last_login': row[4],
+            'subscription': None
+        }
+        
+        if row[5]:  # Tem assinatura
+            expires_at = datetime.fromisoformat(row[5])
+            user_data['subscription'] = {
+                'expires_at': expires_at,
+                'subscription_type': row[6],
+                'active': row[7],
+                'is_expired': expires_at < now,
+                'days_remaining': max(0, (expires_at - now).days)
+            }
+        
+        return user_data
+    
+    def get_all_users(self):
+        """Obter todos os usuários"""
+        with self.connection() as conn:
+            rows = conn.execute(self.USER_COLUMNS + " ORDER BY u.created_at DESC").fetchall()
+        
+        now = datetime.now()
+        return [self._user_from_row(row, now) for row in rows]
+    
+    def list_users(self, search=None, status=None, after=None, limit=50, now=None):
+        """Página de usuários (mais novos primeiro) com paginação por keyset.
+        
+        after é o cursor retornado pela página anterior. Retorna (usuários, cursor);
+        o cursor é None quando não há mais páginas.
+        """
+        now = now or datetime.now()
+        params = {'now': now.isoformat(" "), 'limit': limit}
+        conditions = []
+        
+        if search:
+            conditions.append("u.username LIKE :search ESCAPE '\\'")
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params['search'] = f"%{escaped}%"
+        if status:
+            conditions.append(self.STATUS_FILTERS[status])
+        if after:
+            conditions.append("(u.created_at < :after_created OR (u.created_at = :after_created AND u.id < :after_id))")
+            params['after_created'], params['after_id'] = after
+        
+        query = self.USER_COLUMNS
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY u.created_at DESC, u.id DESC LIMIT :limit"
+        
+        with self.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        cursor = (rows[-1][3], rows[-1][0]) if len(rows) == limit else None
+        return [self._user_from_row(row, now) for row in rows], cursor
+    
+    def user_stats(self, now=None):
+        """Contagem de usuários por status numa única consulta agregada"""
+        now = (now or datetime.now()).isoformat(" ")
+        with self.connection() as conn:
+            total, active, expired = conn.execute("""
+                SELECT COUNT(*),
+                       COALESCE(SUM(s.expires_at >= :now), 0),
+                       COALESCE(SUM(s.expires_at < :now), 0)
+                FROM users u
+                LEFT JOIN subscriptions s ON u.id = s.user_id AND s.active = 1
+            """, {'now': now}).fetchone()
+        
+        return {'total': total, 'active': active, 'expired': expired}
+    
+    def extend_user_subscription(self, user_id, days, subscription_type='premium'):
+        """Estender assinatura de usuário"""
+        with self.transaction() as conn:
+            # Verificar se já tem assinatura ativa
+            existing = conn.execute(
+                "SELECT expires_at FROM subscriptions WHERE user_id = ? AND active = 1", (user_id,)
+            ).fetchone()
+            
+            if existing:
+                # Estender assinatura existente
+                current_expires = datetime.fromisoformat(existing[0])
+                if current_expires < datetime.now():
+                    # Se expirou, começar de hoje
+                    new_expires = datetime.now() + timedelta(days=days)
+                else:
+                    # Se ainda está ativa, adicionar aos dias restantes
+                    new_expires = current_expires + timedelta(days=days)
+                
+                conn.execute(
+                    "UPDATE subscriptions SET expires_at = ?, subscription_type = ? WHERE user_id = ? AND active = 1",
+                    (new_expires, subscription_type, user_id)
+                )
+            else:
+                # Criar nova assinatura
+                expires_at = datetime.now() + timedelta(days=days)
+                conn.execute(
+                    "INSERT INTO subscriptions (user_id, expires_at, subscription_type) VALUES (?, ?, ?)",
+                    (user_id, expires_at, subscription_type)
+                )
+        
+        self.entitlements.invalidate(user_id)
+        return True
+    
+    def delete_user(self, user_id):
+        """Deletar usuário"""
+        with self.transaction() as conn:
+            # Deletar assinaturas primeiro
+            conn.execute("DELETE FROM subscriptions WHERE user_id = ?", (user_id,))
+            # Deletar usuário
+            conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        
+        self.entitlements.invalidate(user_id)
+        return True
+    
+    def extend_all_subscriptions(self, days, subscription_type='premium', now=None):
+        """Estender licenças de todos os usuários não-admin numa única transação.
+        
+        Mesma regra de extend_user_subscription: assinaturas expiradas recomeçam
+        de agora, as ativas somam aos dias restantes e quem não tem recebe uma nova.
+        Retorna o número de licenças afetadas.
+        """
+        now = (now or datetime.now()).isoformat(" ")
+        
+        with self.transaction() as conn:
+            extended = conn.execute("""
+                UPDATE subscriptions
+                SET expires_at = strftime('%Y-%m-%d %H:%M:%f', MAX(expires_at, :now), :modifier),
+                    subscription_type = :type
+                WHERE active = 1
+                  AND user_id IN (SELECT id FROM users WHERE NOT is_admin)
+            """, {'now': now, 'modifier': f"+{int(days)} days", 'type': subscription_type}).rowcount
+            
+            created = conn.execute("""
+                INSERT INTO subscriptions (user_id, expires_at, subscription_type)
+                SELECT u.id, strftime('%Y-%m-%d %H:%M:%f', :now, :modifier), :type
+                FROM users u
+                WHERE NOT u.is_admin
+                  AND NOT EXISTS (SELECT 1 FROM subscriptions s WHERE s.user_id = u.id AND s.active = 1)
+            """, {'now': now, 'modifier': f"+{int(days)} days", 'type': subscription_type}).rowcount
+        
+        self.entitlements.invalidate()
+        return extended + created
+    
+    def purge_expired(self, now=None):
+        """Deletar usuários não-admin com licença expirada numa única transação.
+        
+        Retorna o número de usuários deletados.
+        """
+        now = (now or datetime.now()).isoformat(" ")
+        
+        with self.transaction() as conn:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS purge_ids (id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM purge_ids")
+            conn.execute("""
+                INSERT OR IGNORE INTO purge_ids (id)
+                SELECT s.user_id
+                FROM subscriptions s
+                JOIN users u ON u.id = s.user_id
+                WHERE s.active = 1 AND s.expires_at < ? AND NOT u.is_admin
+            """, (now,))
+            
+            # Deletar assinaturas primeiro
+            conn.execute("DELETE FROM subscriptions WHERE user_id IN (SELECT id FROM purge_ids)")
+            deleted = conn.execute("DELETE FROM users WHERE id IN (SELECT id FROM purge_ids)").rowcount
+            conn.execute("DELETE FROM purge_ids")
+        
+        self.entitlements.invalidate()
+        return deleted
+
+class AuthService:
+    """Autenticação com bcrypt em threads de trabalho e callbacks na thread da UI.
+    
+    Hashes com custo diferente do configurado são re-gerados no login. O admin
+    padrão de um banco novo também é criado no pool (start_setup).
+    """
+    
+    def __init__(self, db, rounds=None, workers=2, poll_interval_ms=20):
+        self.db = db
+        self.rounds = rounds or bcrypt_rounds()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="auth")
+        self.poll_interval_ms = poll_interval_ms
+        self.setup = None  # Future da criação do admin padrão
+    
+    @staticmethod
+    def cost_of(password_hash):
+        """Custo bcrypt de um hash ($2b$<custo>$...)"""
+        try:
+            return int(password_hash.split('$')[2])
+        except (IndexError, ValueError):
+            return None
+    
+    def needs_rehash(self, password_hash):
+        """Hash gerado com custo diferente do configurado"""
+        return self.cost_of(password_hash) != self.rounds
+    
+    def hash_password(self, password):
+        """Hash bcrypt com o custo configurado"""
+        return hash_password(password, self.rounds)
+    
+    def start_setup(self):
+        """Criar o admin padrão (se faltar) no pool, sem bcrypt na thread da UI"""
+        self.setup = self.executor.submit(self.db.ensure_default_admin, self.hash_password)
+        return self.setup
+    
+    def authenticate(self, username, password):
+        """Verificar credenciais (bloqueante - usar via submit fora da thread da UI)"""
+        if self.setup is not None:
+            self.setup.result()  # Admin padrão precisa existir antes do primeiro login
+        credentials = self.db.get_credentials(username)
+        if not credentials:
+            return None
+        user_id, password_hash, is_admin = credentials
+        
+        if not bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
+            return None
+        
+        new_hash = self.hash_password(password) if self.needs_rehash(password_hash) else None
+        self.db.record_login(user_id, new_hash)
+        return {'id': user_id, 'username': username, 'is_admin': is_admin}
+    
+    def create_user(self, username, password, is_admin=False):
+        """Criar usuário com o hash calculado fora da thread da UI"""
+        return self.db.create_user(username, is_admin=is_admin, password_hash=self.hash_password(password))
+    
+    def submit(self, root, func, *args, callback=None, on_error=None):
+        """Executar func(*args) no pool e entregar o resultado a callback na thread da UI"""
+        future = self.executor.submit(func, *args)
+        
+        def poll():
+            if not future.done():
+                root.after(self.poll_interval_ms, poll)
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                if on_error:
+                    on_error(e)
+                else:
+                    print(f"❌ Erro na autenticação: {e}")
+                return
+            if callback:
+                callback(result)
+        
+        root.after(self.poll_interval_ms, poll)
+        return future
+    
+    def shutdown(self):
+        """Encerrar pool de trabalho"""
+        self.executor.shutdown(wait=False)
+
+def clip_region(region, width, height):
+    """Limitar região (left, top, width, height) aos limites do frame"""
+    if region is None:
+        return (0, 0, width, height)
+    left, top, w, h = [int(v) for v in region]
+    right, bottom = min(left + w, width), min(top + h, height)
+    left = max(0, min(left, width))
+    top = max(0, min(top, height))
+    return (left, top, max(0, right - left), max(0, bottom - top))
+
+class FrameSource:
+    """Fonte de frames base - captura regiões da tela como arrays BGR"""
+    
+    name = "base"
+    
+    def grab(self, region=None):
+        """Capturar frame BGR da região (left, top, width, height) ou da tela inteira"""
+        raise NotImplementedError
+    
+    def grab_pixel(self, x, y):
+        """Capturar cor RGB de um único pixel"""
+        frame = self.grab((x, y, 1, 1))
+        b, g, r = frame[0, 0][:3]
+        return (int(r), int(g), int(b))
+    
+    def area(self, region=None):
+        """Retângulo de tela (left, top, width, height) efetivamente capturado para a região"""
+        width, height = self.screen_size()
+        return clip_region(region, width, height)
+    
+    def screen_size(self):
+        """Obter tamanho (largura, altura) da área capturável"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Liberar recursos da captura"""
+        pass
+
+class PyAutoGUIFrameSource(FrameSource):
+    """Captura via pyautogui/PIL - compatível com qualquer Windows"""
+    
+    name = "pyautogui"
+    
+    def grab(self, region=None):
+        """Capturar região via pyautogui.screenshot"""
+        import cv2
+        import numpy as np
+        
+        if region is not None:
+            width, height = self.screen_size()
+            region = clip_region(region, width, height)
+        
+        start = profiler.clock()
+        screenshot = pyautogui.screenshot(region=region)
+        start = profiler.lap("grab", start)
+        frame = cv2.cvtColor(np.asarray(screenshot), cv2.COLOR_RGB2BGR)
+        profiler.lap("convert", start)
+        return frame
+    
+    def grab_pixel(self, x, y):
+        """Ler pixel direto sem montar array"""
+        return tuple(pyautogui.pixel(int(x), int(y))[:3])
+    
+    def screen_size(self):
+        """Obter tamanho da tela principal"""
+        size = pyautogui.size()
+        return (size[0], size[1])
+
+class MSSFrameSource(FrameSource):
+    """Captura nativa rápida via mss (BitBlt no Windows) sem passar por PIL"""
+    
+    name = "mss"
+    
+    def __init__(self):
+        import mss
+        self._mss = mss
+        # Instâncias do mss não podem ser compartilhadas entre threads
+        self._local = threading.local()
+    
+    def _sct(self):
+        """Obter instância do mss da thread atual"""
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = self._mss.mss()
+            self._local.sct = sct
+        return sct
+    
+    def grab(self, region=None):
+        """Capturar região convertendo BGRA para BGR contíguo"""
+        import cv2
+        import numpy as np
+        
+        left, top, width, height = self.area(region)
+        area = {'left': left, 'top': top, 'width': max(1, width), 'height': max(1, height)}
+        
+        start = profiler.clock()
+        shot = self._sct().grab(area)
+        start = profiler.lap("grab", start)
+        frame = cv2.cvtColor(np.asarray(shot), cv2.COLOR_BGRA2BGR)
+        profiler.lap("convert", start)
+        return frame
+    
+    def area(self, region=None):
+        """Região recortada pelos limites reais da área virtual (monitores à esquerda ou
+        acima do principal dão coordenadas negativas)"""
+        monitor = self._sct().monitors[0]
+        if region is None:
+            return (monitor['left'], monitor['top'], monitor['width'], monitor['height'])
+        left, top, width, height = clip_region(
+            (region[0] - monitor['left'], region[1] - monitor['top'], region[2], region[3]),
+            monitor['width'], monitor['height']
+        )
+        return (left + monitor['left'], top + monitor['top'], width, height)
+    
+    def screen_size(self):
+        """Obter tamanho da área virtual de todos os monitores"""
+        monitor = self._sct().monitors[0]
+        return (monitor['width'], monitor['height'])
+    
+    def close(self):
+        """Fechar instância da thread atual"""
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+class FileFrameSource(FrameSource):
+    """Frames de arquivos ou sintéticos - permite rodar a visão sem tela (Linux/testes)"""
+    
+    name = "file"
+    
+    def __init__(self, frames):
+        self.frames = []
+        for frame in frames:
+            if isinstance(frame, str):
+                import cv2
+                image = cv2.imread(frame, cv2.IMREAD_COLOR)
+                if image is None:
+                    raise ValueError(f"Não foi possível carregar o frame: {frame}")
+                frame = image
+            self.frames.append(frame)
+        
+        if not self.frames:
+            raise ValueError("Nenhum frame informado")
+        
+        self.index = 0
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def synthetic(cls, width=1920, height=1080, color=(0, 0, 0)):
+        """Criar fonte com um frame sólido (cor em RGB)"""
+        import numpy as np
+        
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:] = (color[2], color[1], color[0])
+        return cls([frame])
+    
+    def current(self):
+        """Frame atual sem avançar"""
+        return self.frames[self.index]
+    
+    def advance(self):
+        """Avançar para o próximo frame (em ciclo)"""
+        with self.lock:
+            self.index = (self.index + 1) % len(self.frames)
+    
+    def grab(self, region=None):
+        """Recortar região do frame atual"""
+        frame = self.current()
+        height, width = frame.shape[:2]
+        left, top, w, h = clip_region(region, width, height)
+        return frame[top:top + h, left:left + w]
+    
+    def screen_size(self):
+        """Tamanho do frame atual"""
+        height, width = self.current().shape[:2]
+        return (width, height)
+
+def create_frame_source(backend=None):
+    """Criar fonte de frames (auto, mss, pyautogui, synthetic ou file:<caminho>)"""
+    backend = backend or os.environ.get("RM_BOT_FRAME_SOURCE", "auto")
+    
+    if backend.startswith("file:"):
+        return FileFrameSource(backend[len("file:"):].split(os.pathsep))
+    if backend == "synthetic":
+        return FileFrameSource.synthetic()
+    
+    if backend in ("auto", "mss") and AUTOMATION_AVAILABLE:
+        try:
+            return MSSFrameSource()
+        except ImportError:
+            if backend == "mss":
+                print("⚠️ mss não instalado - usando captura via pyautogui")
+    
+    if AUTOMATION_AVAILABLE:
+        return PyAutoGUIFrameSource()
+    
+    # Sem automação (Linux/sem dependências) - fonte sintética se houver numpy
+    try:
+        return FileFrameSource.synthetic()
+    except ImportError:
+        return None
+
+# origin: posição na tela do canto superior esquerdo da imagem
+Frame = namedtuple('Frame', ['image', 'timestamp', 'sequence', 'origin'], defaults=((0, 0),))
+
+class FrameBus:
+    """Barramento de frames - um único produtor de captura compartilhado entre os loops"""
+    
+    def __init__(self, source, fps=5, max_age=0.25):
+        self.source = source
+        self.interval = 1.0 / fps
+        self.max_age = max_age
+        self.latest = None
+        self.sequence = 0
+        self.captures = 0
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.capture_lock = threading.Lock()
+        self.new_frame = threading.Condition(self.lock)
+        self.running = False
+        self.thread = None
+    
+    def subscribe(self, name):
+        """Registrar consumidor e iniciar o produtor se necessário.
+        
+        O produtor só encerra sob o mesmo lock (ver _producer_loop), então nunca há
+        dois produtores ao mesmo tempo.
+        """
+        with self.lock:
+            self.subscribers.add(name)
+            self.running = True
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._producer_loop, name="frame-bus", daemon=True)
+                self.thread.start()
+    
+    def unsubscribe(self, name):
+        """Remover consumidor e parar o produtor quando não houver mais nenhum"""
+        with self.lock:
+            self.subscribers.discard(name)
+            if not self.subscribers:
+                self.running = False
+                self.new_frame.notify_all()
+    
+    def publish(self, image, origin=(0, 0)):
+        """Publicar frame imutável com timestamp monotônico"""
+        image.setflags(write=False)
+        with self.lock:
+            self.sequence += 1
+            self.latest = Frame(image, time.monotonic(), self.sequence, origin)
+            self.new_frame.notify_all()
+            return self.latest
+    
+    def peek(self, max_age=None):
+        """Frame mais recente se ainda estiver dentro da idade máxima, sem capturar"""
+        max_age = self.max_age if max_age is None else max_age
+        frame = self.latest
+        if frame is not None and time.monotonic() - frame.timestamp <= max_age:
+            return frame
+        return None
+    
+    def capture(self):
+        """Capturar e publicar um novo frame"""
+        image = self.source.grab()
+        self.captures += 1
+        return self.publish(image, self.source.area()[:2])
+    
+    def set_source(self, source):
+        """Trocar a fonte (ex: janela do jogo selecionada) descartando o frame atual"""
+        with self.capture_lock:
+            self.source = source
+            with self.lock:
+                self.latest = None
+    
+    def latest_frame(self, max_age=None):
+        """Obter frame recente - captura sob demanda apenas se o atual estiver velho"""
+        frame = self.peek(max_age)
+        if frame is not None:
+            return frame
+        
+        with self.capture_lock:
+            # Outra thread pode ter capturado enquanto esperávamos
+            frame = self.peek(max_age)
+            if frame is not None:
+                return frame
+            return self.capture()
+    
+    def wait_next(self, after_sequence, timeout=1.0):
+        """Aguardar frame mais novo que a sequência informada"""
+        with self.lock:
+            self.new_frame.wait_for(
+                lambda: not self.running or (self.latest is not None and self.latest.sequence > after_sequence),
+                timeout
+            )
+            return self.latest
+    
+    def _producer_loop(self):
+        """Loop do produtor - captura na taxa configurada enquanto houver consumidores"""
+        profiler.bind("frame_bus")
+        while True:
+            with self.lock:
+                if not self.subscribers:
+                    self.thread = None
+                    return
+            
+            started = time.monotonic()
+            try:
+                with self.capture_lock:
+                    self.capture()
+            except Exception as e:
+                print(f"Erro na captura do barramento de frames: {e}")
+                time.sleep(1)
+            
+            remaining = self.interval - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+class TemplateCache:
+    """Cache LRU de imagens de referência - decodifica cada template uma única vez"""
+    
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+    
+    def get(self, path, grayscale=False, scale=1.0):
+        """Obter template decodificado, recarregando só se o mtime do arquivo mudar"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        
+        key = (os.path.abspath(path), grayscale, scale)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        
+        # Decodificar fora do lock para não travar outros loops
+        image = self._load(path, grayscale, scale)
+        if image is None:
+            return None
+        image.setflags(write=False)
+        
+        with self.lock:
+            self.entries[key] = (mtime, image)
+            self.entries.move_to_end(key)
+            self.loads += 1
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return image
+    
+    def _load(self, path, grayscale, scale):
+        """Ler, converter e redimensionar template do disco"""
+        import cv2
+        
+        flag = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        image = cv2.imread(path, flag)
+        if image is None:
+            return None
+        
+        if scale != 1.0:
+            height, width = image.shape[:2]
+            size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+            image = cv2.resize(image, size, interpolation=interpolation)
+        return image
+    
+    def invalidate(self, path=None):
+        """Descartar templates de um arquivo (ou todos)"""
+        with self.lock:
+            if path is None:
+                self.entries.clear()
+                return
+            path = os.path.abspath(path)
+            for key in [k for k in self.entries if k[0] == path]:
+                del self.entries[key]
+
+class TemplateMatcher:
+    """Template matching que procura primeiro numa janela ao redor do último acerto"""
+    
+    def __init__(self, padding=32):
+        self.padding = padding
+        self.last_location = None
+        self.local_hits = 0
+        self.local_misses = 0
+        self.full_searches = 0
+    
+    def _best_match(self, image, template):
+        """Melhor score e posição (x, y) do template na imagem"""
+        import cv2
+        
+        result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        return max_val, max_loc
+    
+    def _fits(self, frame, template):
+        """Template cabe no frame"""
+        return template.shape[0] <= frame.shape[0] and template.shape[1] <= frame.shape[1]
+    
+    def _local_template(self, template):
+        """Template usado na janela local"""
+        return template
+    
+    def _search_full(self, frame, template):
+        """Busca no frame inteiro"""
+        self.full_searches += 1
+        return self._best_match(frame, template)
+    
+    def _accept_full(self, loc):
+        """Registrar acerto da busca completa"""
+        self.last_location = tuple(loc)
+    
+    def match(self, frame, template, threshold):
+        """Procurar template - retorna (encontrado, score, posição)"""
+        frame_h, frame_w = frame.shape[:2]
+        if not self._fits(frame, template):
+            return False, 0.0, None
+        
+        if self.last_location is not None:
+            local_template = self._local_template(template)
+            template_h, template_w = local_template.shape[:2]
+            x, y = self.last_location
+            left = max(0, x - self.padding)
+            top = max(0, y - self.padding)
+            right = min(frame_w, x + template_w + self.padding)
+            bottom = min(frame_h, y + template_h + self.padding)
+            
+            if right - left >= template_w and bottom - top >= template_h:
+                score, loc = self._best_match(frame[top:bottom, left:right], local_template)
+                if score >= threshold:
+                    self.local_hits += 1
+                    self.last_location = (left + loc[0], top + loc[1])
+                    return True, score, self.last_location
+            self.local_misses += 1
+        
+        # Falhou na janela local - procurar no frame inteiro
+        score, loc = self._search_full(frame, template)
+        if score >= threshold:
+            self._accept_full(loc)
+            return True, score, self.last_location
+        
+        self.last_location = None
+        return False, score, None
+    
+    def hit_ratio(self):
+        """Proporção de buscas resolvidas na janela local"""
+        total = self.local_hits + self.local_misses
+        return self.local_hits / total if total else 0.0
+    
+    def reset(self):
+        """Esquecer última posição e estatísticas"""
+        self.last_location = None
+        self.local_hits = 0
+        self.local_misses = 0
+        self.full_searches = 0
+
+def scale_steps(minimum, maximum, steps):
+    """Lista de escalas igualmente espaçadas, começando pela mais próxima de 1.0"""
+    if steps <= 1 or minimum == maximum:
+        return (1.0,)
+    step = (maximum - minimum) / (steps - 1)
+    scales = [round(minimum + step * i, 4) for i in range(steps)]
+    return tuple(sorted(scales, key=lambda s: abs(s - 1.0)))
+
+class PyramidMatcher(TemplateMatcher):
+    """Matching coarse-to-fine: 1ª passada em pirâmide reduzida em cinza, refinamento em resolução cheia"""
+    
+    def __init__(self, padding=32, levels=2, scales=(1.0,), candidates=3, min_size=8):
+        super().__init__(padding)
+        self.levels = levels
+        self.scales = tuple(scales)
+        self.candidates = candidates
+        self.min_size = min_size
+        self.last_scale = 1.0
+        self.found_scale = 1.0  # Escala do melhor candidato da última busca completa
+        self._source = None
+        self._derived = {}
+    
+    def _derived_template(self, template, scale, level=0):
+        """Template redimensionado (e reduzido em cinza para o nível da pirâmide), em cache"""
+        import cv2
+        
+        if template is not self._source:
+            self._source = template
+            self._derived = {}
+        
+        key = (scale, level)
+        derived = self._derived.get(key)
+        if derived is None:
+            if level == 0:
+                derived = template
+                if scale != 1.0:
+                    height, width = template.shape[:2]
+                    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+                    derived = cv2.resize(template, size, interpolation=cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR)
+            else:
+                derived = self._derived_template(template, scale, 0)
+                if derived.ndim == 3:
+                    derived = cv2.cvtColor(derived, cv2.COLOR_BGR2GRAY)
+                for _ in range(level):
+                    derived = cv2.pyrDown(derived)
+            self._derived[key] = derived
+        return derived
+    
+    def _fits(self, frame, template):
+        """Alguma das escalas do template cabe no frame"""
+        return any(TemplateMatcher._fits(self, frame, self._derived_template(template, scale))
+                   for scale in self.scales)
+    
+    def _local_template(self, template):
+        """Template na escala do último acerto"""
+        return self._derived_template(template, self.last_scale)
+    
+    def _accept_full(self, loc):
+        """Acerto confirmado - só então adotar a escala encontrada"""
+        super()._accept_full(loc)
+        self.last_scale = self.found_scale
+    
+    def _search_full(self, frame, template):
+        """Busca multi-escala: candidatos no nível reduzido, refinados em resolução cheia"""
+        import cv2
+        
+        self.full_searches += 1
+        frame_h, frame_w = frame.shape[:2]
+        pyramid = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame]
+        best_score, best_loc, best_scale = -1.0, (0, 0), self.last_scale
+        
+        for scale in self.scales:
+            scaled = self._derived_template(template, scale)
+            template_h, template_w = scaled.shape[:2]
+            if template_h > frame_h or template_w > frame_w:
+                continue
+            
+            # Nível mais reduzido em que o template ainda tem detalhes suficientes
+            level = self.levels
+            while level > 0 and min(template_h, template_w) >> level < self.min_size:
+                level -= 1
+            
+            if level == 0:
+                score, loc = self._best_match(frame, scaled)
+                if score > best_score:
+                    best_score, best_loc, best_scale = score, loc, scale
+                continue
+            
+            while len(pyramid) <= level:
+                pyramid.append(cv2.pyrDown(pyramid[-1]))
+            
+            coarse_template = self._derived_template(template, scale, level)
+            coarse_h, coarse_w = coarse_template.shape[:2]
+            result = cv2.matchTemplate(pyramid[level], coarse_template, cv2.TM_CCOEFF_NORMED)
+            factor = 2 ** level
+            margin = factor * 2
+            
+            for _ in range(self.candidates):
+                _, _, _, (cx, cy) = cv2.minMaxLoc(result)
+                
+                # Refinar candidato em resolução cheia
+                left = max(0, cx * factor - margin)
+                top = max(0, cy * factor - margin)
+                right = min(frame_w, cx * factor + template_w + margin)
+                bottom = min(frame_h, cy * factor + template_h + margin)
+                if right - left >= template_w and bottom - top >= template_h:
+                    score, loc = self._best_match(frame[top:bottom, left:right], scaled)
+                    if score > best_score:
+                        best_score, best_loc, best_scale = score, (left + loc[0], top + loc[1]), scale
+                
+                # Suprimir vizinhança do candidato para achar o próximo
+                result[max(0, cy - coarse_h // 2):cy + coarse_h // 2 + 1,
+                       max(0, cx - coarse_w // 2):cx + coarse_w // 2 + 1] = -1.0
+        
+        self.found_scale = best_scale
+        return best_score, best_loc
+
+class PixelProbe:
+    """Amostragem esparsa - lê apenas os pontos configurados (ou pequenos patches ao redor)"""
+    
+    # Acima desta área os pontos são capturados um a um em vez de pela caixa envolvente
+    MAX_BOX_AREA = 256 * 256
+    
+    def __init__(self, source, points, radius=0):
+        import numpy as np
+        
+        self.source = source
+        self.points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        self.radius = radius
+        
+        left, top = self.points.min(axis=0) - radius
+        right, bottom = self.points.max(axis=0) + radius + 1
+        self.box = (int(left), int(top), int(right - left), int(bottom - top))
+    
+    @staticmethod
+    def _mean(patch, x, y):
+        """Cor média BGR do patch (ValueError se o ponto (x, y) da tela ficou fora da imagem)"""
+        if patch.size == 0:
+            raise ValueError(f"Ponto ({x}, {y}) fora da área capturada")
+        return patch.reshape(-1, patch.shape[-1])[:, :3].mean(axis=0)
+    
+    def covers(self, indices, shape, origin=(0, 0)):
+        """Os patches dos pontos cabem inteiros num frame com shape e origin na tela"""
+        import numpy as np
+        
+        local = self.points[indices] - np.asarray(origin)
+        r = self.radius
+        return bool(((local >= r) & (local + r < (shape[1], shape[0]))).all())
+    
+    def sample(self, indices=None, frame=None, origin=(0, 0)):
+        """Cores RGB (N x 3, float) dos pontos - usa o frame informado ou captura só o necessário.
+        
+        origin é a posição na tela do canto superior esquerdo do frame informado. Patches
+        são recortados pela imagem; um ponto totalmente fora dela gera ValueError.
+        """
+        import numpy as np
+        
+        points = self.points if indices is None else self.points[indices]
+        r = self.radius
+        
+        if frame is not None:
+            image = frame
+        elif indices is None and self.box[2] * self.box[3] <= self.MAX_BOX_AREA:
+            image, origin = self.source.grab(self.box), self.source.area(self.box)[:2]
+        else:
+            # Subconjunto ou pontos espalhados - capturar só o patch de cada ponto pedido
+            colors = [
+                self._mean(self.source.grab((int(x) - r, int(y) - r, 2 * r + 1, 2 * r + 1)), x, y)
+                for x, y in points
+            ]
+            return np.asarray(colors, dtype=np.float32)[:, ::-1]
+        
+        height, width = image.shape[:2]
+        colors = []
+        for (x, y), (lx, ly) in zip(points, points - np.asarray(origin)):
+            patch = image[max(0, ly - r):max(0, min(height, ly + r + 1)),
+                          max(0, lx - r):max(0, min(width, lx + r + 1))]
+            colors.append(self._mean(patch, x, y))
+        return np.asarray(colors, dtype=np.float32)[:, ::-1]
+    
+    def has_points(self, points):
+        """A sonda cobre exatamente estes pontos (mesmas coordenadas, mesma ordem)"""
+        import numpy as np
+        
+        return np.array_equal(self.points, np.asarray(points, dtype=np.int64).reshape(-1, 2))
+
+def rgb_to_lab(colors):
+    """Converter cores RGB (N x 3, 0-255) para CIE Lab (D65)"""
+    import numpy as np
+    
+    rgb = np.asarray(colors, dtype=np.float32).reshape(-1, 3) / 255.0
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    xyz = linear @ np.array([
+        [0.4124, 0.3576, 0.1805],
+        [0.2126, 0.7152, 0.0722],
+        [0.0193, 0.1192, 0.9505]
+    ], dtype=np.float32).T
+    xyz /= np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16.0 / 116.0)
+    return np.stack([
+        116.0 * f[:, 1] - 16.0,
+        500.0 * (f[:, 0] - f[:, 1]),
+        200.0 * (f[:, 1] - f[:, 2])
+    ], axis=1)
+
+class BiteDetector:
+    """Detector de mordida com baseline móvel por ponto, métrica de cor e amostragem adaptativa"""
+    
+    def __init__(self, metric="delta_e", threshold=12.0, baseline_alpha=0.05, confirm_samples=2,
+                 fast_interval=0.005, slow_interval=0.05, default_window=(1.0, 6.0)):
+        self.metric = metric
+        self.threshold = threshold
+        self.baseline_alpha = baseline_alpha
+        self.confirm_samples = confirm_samples
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.default_window = default_window
+        self.baselines = {}
+        self.over_threshold = {}
+        self.first_sample = set()  # Pontos cuja próxima amostra é a primeira do lançamento
+        self.bite_times = deque(maxlen=50)
+    
+    def distance(self, color, baseline):
+        """Distância entre cor atual e baseline (ΔE CIE76 ou maior diferença por canal)"""
+        import numpy as np
+        
+        if self.metric == "delta_e":
+            lab = rgb_to_lab([color, baseline])
+            return float(np.linalg.norm(lab[0] - lab[1]))
+        return float(np.abs(np.asarray(color, dtype=np.float32) - np.asarray(baseline, dtype=np.float32)).max())
+    
+    def start_cast(self, index, reference=None):
+        """Preparar ponto para um novo lançamento - a baseline recomeça a cada lançamento.
+        
+        reference (cor calibrada da água) só vale se a primeira amostra concordar com ela;
+        após uma mudança duradoura da cena (câmera, dia/noite, overlay) a primeira amostra
+        vira a baseline, senão todo lançamento acusaria mordida.
+        """
+        import numpy as np
+        
+        if reference is not None:
+            self.baselines[index] = np.asarray(reference, dtype=np.float32)
+        else:
+            self.baselines.pop(index, None)
+        self.over_threshold[index] = 0
+        self.first_sample.add(index)
+    
+    def reset(self):
+        """Descartar baselines (ex: cor da água ou pontos mudaram)"""
+        self.baselines.clear()
+        self.over_threshold.clear()
+        self.first_sample.clear()
+    
+    def update(self, index, color):
+        """Processar amostra do ponto - True quando a mudança se confirma como mordida"""
+        import numpy as np
+        
+        color = np.asarray(color, dtype=np.float32)
+        baseline = self.baselines.get(index)
+        first = index in self.first_sample
+        self.first_sample.discard(index)
+        if baseline is None or (first and self.distance(color, baseline) > self.threshold):
+            self.baselines[index] = color
+            return False
+        
+        if self.distance(color, baseline) > self.threshold:
+            # Exigir amostras consecutivas para ignorar serrilhado/ruído
+            self.over_threshold[index] = self.over_threshold.get(index, 0) + 1
+            return self.over_threshold[index] >= self.confirm_samples
+        
+        self.over_threshold[index] = 0
+        self.baselines[index] = baseline + (color - baseline) * self.baseline_alpha
+        return False
+    
+    def record_bite(self, elapsed):
+        """Registrar tempo até a mordida para ajustar a janela esperada"""
+        self.bite_times.append(elapsed)
+    
+    def expected_window(self):
+        """Janela (início, fim) em que mordidas costumam acontecer"""
+        if len(self.bite_times) < 5:
+            return self.default_window
+        times = sorted(self.bite_times)
+        low = times[int(len(times) * 0.1)]
+        high = times[min(len(times) - 1, int(len(times) * 0.9))]
+        return (max(0.0, low * 0.8), high * 1.2)
+    
+    def next_interval(self, elapsed):
+        """Intervalo até a próxima amostra - mais rápido dentro da janela esperada"""
+        start, end = self.expected_window()
+        if start <= elapsed <= end:
+            return self.fast_interval
+        return self.slow_interval
+
+class CooldownScheduler:
+    """Agendador de cooldowns - heap de deadlines em time.monotonic(), cada tarefa no seu intervalo.
+    
+    Cada entrada do heap leva o token da tarefa; entradas cujo token não é mais o da
+    tarefa (removida ou removida e adicionada de novo) são descartadas ao chegar ao topo.
+    """
+    
+    def __init__(self, min_interval=0.05):
+        self.min_interval = min_interval
+        self.heap = []
+        self.tasks = {}
+        self.retired = {}  # Tarefas removidas - estatísticas mantidas e retomadas se voltarem
+        self.counter = itertools.count()
+        self.config_version = None  # Versão da configuração já aplicada
+    
+    def _schedule(self, key, task, deadline):
+        """Inserir entrada no heap e torná-la a única válida da tarefa"""
+        token = next(self.counter)
+        task['token'] = token
+        heapq.heappush(self.heap, (deadline, token, key))
+    
+    def _is_current(self, entry):
+        """Entrada do heap pertence à tarefa ativa com a chave"""
+        task = self.tasks.get(entry[2])
+        return task is not None and task['token'] == entry[1]
+    
+    def set_task(self, key, interval, action):
+        """Adicionar tarefa (dispara já) ou atualizar intervalo/ação de uma existente"""
+        interval = max(interval, self.min_interval)
+        task = self.tasks.get(key)
+        if task is not None:
+            task['interval'] = interval
+            task['action'] = action
+            return
+        
+        task = self.retired.pop(key, None) or {'fired': 0, 'drift_total': 0.0, 'drift_max': 0.0}
+        task['interval'] = interval
+        task['action'] = action
+        self.tasks[key] = task
+        self._schedule(key, task, time.monotonic())
+    
+    def remove(self, key):
+        """Remover tarefa (entrada no heap é descartada ao vencer; estatísticas são mantidas)"""
+        task = self.tasks.pop(key, None)
+        if task is not None:
+            task['token'] = None
+            self.retired[key] = task
+    
+    def sync(self, intervals, action_for):
+        """Sincronizar tarefas com {chave: intervalo em segundos}"""
+        for key in list(self.tasks):
+            if key not in intervals:
+                self.remove(key)
+        for key, interval in intervals.items():
+            self.set_task(key, interval, action_for(key))
+    
+    def run_pending(self):
+        """Disparar todas as tarefas vencidas e reagendá-las pelo próprio deadline"""
+        fired = 0
+        while self.heap and self.heap[0][0] <= time.monotonic():
+            entry = heapq.heappop(self.heap)
+            if not self._is_current(entry):
+                continue
+            deadline, _, key = entry
+            task = self.tasks[key]
+            
+            now = time.monotonic()
+            drift = now - deadline
+            task['fired'] += 1
+            task['drift_total'] += drift
+            task['drift_max'] = max(task['drift_max'], drift)
+            
+            # Reagendar pelo deadline (sem acumular atraso); se ficou para trás, a partir de agora
+            next_deadline = deadline + task['interval']
+            if next_deadline <= now:
+                next_deadline = now + task['interval']
+            self._schedule(key, task, next_deadline)
+            
+            task['action']()
+            fired += 1
+        return fired
+    
+    def time_until_next(self):
+        """Segundos até o próximo deadline (None sem tarefas)"""
+        while self.heap and not self._is_current(self.heap[0]):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return None
+        return max(0.0, self.heap[0][0] - time.monotonic())
+    
+    def run(self, is_active, refresh, refresh_interval=0.5, max_sleep=0.05):
+        """Executar enquanto is_active() - refresh(scheduler) atualiza as tarefas periodicamente"""
+        last_refresh = None
+        while is_active():
+            now = time.monotonic()
+            if last_refresh is None or now - last_refresh >= refresh_interval:
+                refresh(self)
+                last_refresh = now
+            
+            start = profiler.clock()
+            if self.run_pending():
+                start = profiler.lap("actions", start)
+            wait = self.time_until_next()
+            time.sleep(max_sleep if wait is None else min(wait, max_sleep))
+            profiler.lap("sleep", start)
+    
+    def drift_stats(self):
+        """Estatísticas de atraso por tarefa em ms (inclui tarefas já removidas)"""
+        return {
+            key: {
+                'fired': task['fired'],
+                'mean_ms': task['drift_total'] / task['fired'] * 1000 if task['fired'] else 0.0,
+                'max_ms': task['drift_max'] * 1000
+            }
+            for key, task in itertools.chain(self.retired.items(), self.tasks.items())
+        }
+    
+    def drift_report(self):
+        """Resumo legível das estatísticas de atraso"""
+        lines = []
+        for key, stats in self.drift_stats().items():
+            lines.append(
+                f"📈 {key.upper()}: {stats['fired']} usos, atraso médio {stats['mean_ms']:.1f} ms, "
+                f"máx {stats['max_ms']:.1f} ms\n"
+            )
+        return "".join(lines)
+
+# Pausa padrão (segundos) após cada tipo de ação - substitui o pyautogui.PAUSE global
+DEFAULT_INPUT_PACING = {
+    'press': 0.03,
+    'hotkey': 0.03,
+    'click': 0.05,
+    'key_down': 0.0,
+    'key_up': 0.0,
+    'batch': 0.03,
+    'gap': 0.1  # Pausa explícita entre ações encadeadas (skills seguidas, clique -> skill)
+}
+
+class InputBackend:
+    """Backend de entrada base - teclas e cliques com ritmo configurável por tipo de ação"""
+    
+    name = "base"
+    
+    def __init__(self, pacing=None):
+        self.pacing = dict(DEFAULT_INPUT_PACING)
+        if pacing:
+            self.pacing.update(pacing)
+        self.local = threading.local()
+    
+    def _pace(self, action):
+        """Aplicar pausa da ação (suprimida dentro de um lote)"""
+        if getattr(self.local, 'batch_depth', 0):
+            return
+        delay = self.pacing.get(action, 0.0)
+        if delay > 0:
+            time.sleep(delay)
+    
+    @contextmanager
+    def batch(self):
+        """Agrupar ações sem pausas intermediárias - uma única pausa ao final"""
+        self.local.batch_depth = getattr(self.local, 'batch_depth', 0) + 1
+        try:
+            yield self
+        finally:
+            self.local.batch_depth -= 1
+            self._pace('batch')
+    
+    def wait(self, action='gap'):
+        """Pausa explícita do ritmo configurado - vale também dentro de um lote"""
+        delay = self.pacing.get(action, 0.0)
+        if delay > 0:
+            time.sleep(delay)
+    
+    def press(self, key):
+        """Pressionar e soltar tecla"""
+        self._press(key)
+        self._pace('press')
+    
+    def hotkey(self, *keys):
+        """Pressionar combinação de teclas (ex: shift+f1)"""
+        self._hotkey(keys)
+        self._pace('hotkey')
+    
+    def click(self, x, y):
+        """Clicar com o botão esquerdo na posição"""
+        self._click(int(x), int(y))
+        self._pace('click')
+    
+    def key_down(self, key):
+        """Manter tecla pressionada"""
+        self._key_down(key)
+        self._pace('key_down')
+    
+    def key_up(self, key):
+        """Soltar tecla"""
+        self._key_up(key)
+        self._pace('key_up')
+    
+    def _press(self, key):
+        self._key_down(key)
+        self._key_up(key)
+    
+    def _hotkey(self, keys):
+        for key in keys:
+            self._key_down(key)
+        for key in reversed(keys):
+            self._key_up(key)
+    
+    def _click(self, x, y):
+        raise NotImplementedError
+    
+    def _key_down(self, key):
+        raise NotImplementedError
+    
+    def _key_up(self, key):
+        raise NotImplementedError
+
+class PyAutoGUIInputBackend(InputBackend):
+    """Entrada via pyautogui sem a pausa global entre chamadas"""
+    
+    name = "pyautogui"
+    
+    def _press(self, key):
+        pyautogui.press(key, _pause=False)
+    
+    def _hotkey(self, keys):
+        pyautogui.hotkey(*keys, _pause=False)
+    
+    def _click(self, x, y):
+        pyautogui.click(x, y, _pause=False)
+    
+    def _key_down(self, key):
+        pyautogui.keyDown(key, _pause=False)
+    
+    def _key_up(self, key):
+        pyautogui.keyUp(key, _pause=False)
+
+class Win32InputBackend(PyAutoGUIInputBackend):
+    """Entrada direta via win32api (keybd_event/mouse_event) - teclas desconhecidas caem no pyautogui"""
+    
+    name = "win32"
+    
+    KEY_NAMES = {
+        'space': 'VK_SPACE', 'enter': 'VK_RETURN', 'return': 'VK_RETURN',
+        'esc': 'VK_ESCAPE', 'escape': 'VK_ESCAPE', 'tab': 'VK_TAB', 'backspace': 'VK_BACK',
+        'shift': 'VK_SHIFT', 'ctrl': 'VK_CONTROL', 'alt': 'VK_MENU',
+        'up': 'VK_UP', 'down': 'VK_DOWN', 'left': 'VK_LEFT', 'right': 'VK_RIGHT',
+        'home': 'VK_HOME', 'end': 'VK_END', 'pageup': 'VK_PRIOR', 'pagedown': 'VK_NEXT',
+        'insert': 'VK_INSERT', 'delete': 'VK_DELETE'
+    }
+    EXTENDED_KEYS = {'up', 'down', 'left', 'right', 'home', 'end', 'pageup', 'pagedown', 'insert', 'delete'}
+    
+    def _virtual_key(self, key):
+        """Código virtual da tecla (None se não mapeada)"""
+        key = key.lower()
+        if key in self.KEY_NAMES:
+            return getattr(win32con, self.KEY_NAMES[key])
+        if key.startswith('f') and key[1:].isdigit() and 1 <= int(key[1:]) <= 24:
+            return win32con.VK_F1 + int(key[1:]) - 1
+        if len(key) == 1 and key.isalnum():
+            return ord(key.upper())
+        return None
+    
+    def _send_key(self, key, up):
+        """Enviar evento de tecla - True se enviado pelo win32"""
+        vk = self._virtual_key(key)
+        if vk is None:
+            return False
+        if pyautogui.FAILSAFE:
+            pyautogui.failSafeCheck()
+        flags = win32con.KEYEVENTF_KEYUP if up else 0
+        if key.lower() in self.EXTENDED_KEYS:
+            flags |= win32con.KEYEVENTF_EXTENDEDKEY
+        win32api.keybd_event(vk, win32api.MapVirtualKey(vk, 0), flags, 0)
+        return True
+    
+    def _press(self, key):
+        if self._virtual_key(key) is None:
+            super()._press(key)
+            return
+        self._send_key(key, False)
+        self._send_key(key, True)
+    
+    def _hotkey(self, keys):
+        InputBackend._hotkey(self, keys)
+    
+    def _key_down(self, key):
+        if not self._send_key(key, False):
+            super()._key_down(key)
+    
+    def _key_up(self, key):
+        if not self._send_key(key, True):
+            super()._key_up(key)
+    
+    def _click(self, x, y):
+        if pyautogui.FAILSAFE:
+            pyautogui.failSafeCheck()
+        win32api.SetCursorPos((x, y))
+        win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
+        win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
+
+class RecordingInputBackend(InputBackend):
+    """Backend sem efeito que apenas registra as ações - para testes no Linux"""
+    
+    name = "recording"
+    
+    def __init__(self, pacing=None):
+        super().__init__(pacing or {action: 0.0 for action in DEFAULT_INPUT_PACING})
+        self.actions = []
+    
+    def _record(self, action, *args):
+        self.actions.append((time.monotonic(), action, args))
+    
+    def _press(self, key):
+        self._record('press', key)
+    
+    def _hotkey(self, keys):
+        self._record('hotkey', *keys)
+    
+    def _click(self, x, y):
+        self._record('click', x, y)
+    
+    def _key_down(self, key):
+        self._record('key_down', key)
+    
+    def _key_up(self, key):
+        self._record('key_up', key)
+
+def create_input_backend(backend=None, pacing=None):
+    """Criar backend de entrada (auto, win32, pyautogui ou recording)"""
+    backend = backend or os.environ.get("RM_BOT_INPUT_BACKEND", "auto")
+    
+    if backend == "recording" or not AUTOMATION_AVAILABLE:
+        return RecordingInputBackend(pacing)
+    if backend == "pyautogui":
+        return PyAutoGUIInputBackend(pacing)
+    return Win32InputBackend(pacing)
+
+class SessionRecorder:
+    """Gravação dos frames vistos pelo bot e das ações/eventos num arquivo .rmrec (zip).
+    
+    Cada frame vira um PNG: o primeiro de cada região (e um a cada keyframe_interval)
+    completo, os demais como delta módulo 256 do anterior da mesma região - quase nada
+    em cenas paradas. O index.json gravado em close() permite acesso aleatório.
+    A codificação roda numa thread própria; com a fila cheia o frame é descartado
+    em vez de atrasar o loop que capturou.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path, keyframe_interval=30, max_pending=64):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.archive = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED)
+        self.meta = {}
+        self.frames = []
+        self.events = []
+        self.streams = {}  # região -> (número do frame, imagem, frames desde o keyframe)
+        self.pending = queue.Queue(max_pending)
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.dropped = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._writer_loop, name="session-recorder", daemon=True)
+        self.thread.start()
+    
+    def add_frame(self, image, region=None, origin=(0, 0)):
+        """Enfileirar frame capturado (região None = tela inteira) e sua posição na tela"""
+        if self.closed:
+            return
+        try:
+            self.pending.put_nowait((time.monotonic() - self.started, region, origin, image))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+    
+    def event(self, kind, **data):
+        """Registrar ação ou evento de detecção no instante atual"""
+        with self.lock:
+            self.events.append(dict(data, t=round(time.monotonic() - self.started, 6), kind=kind))
+    
+    def _writer_loop(self):
+        """Codificar e gravar frames da fila até receber None"""
+        import cv2
+        import numpy as np
+        
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            t, region, origin, image = item
+            image = np.ascontiguousarray(image)
+            key = tuple(int(v) for v in region) if region is not None else None
+            number = len(self.frames)
+            entry = {'n': number, 't': round(t, 6), 'region': list(key) if key else None,
+                     'origin': [int(v) for v in origin], 'base': None}
+            
+            previous = self.streams.get(key)
+            if previous is None or previous[1].shape != image.shape or previous[2] + 1 >= self.keyframe_interval:
+                payload, since_key = image, 0
+            else:
+                # Diferença com wraparound (uint8) - reversível somando ao frame base
+                payload, since_key = image - previous[1], previous[2] + 1
+                entry['base'] = previous[0]
+            
+            ok, png = cv2.imencode(".png", payload, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            if not ok:
+                with self.lock:
+                    self.dropped += 1
+                continue
+            self.archive.writestr(f"frames/{number:06d}.png", png.tobytes())
+            self.frames.append(entry)
+            self.streams[key] = (number, image, since_key)
+    
+    def close(self):
+        """Esvaziar a fila e gravar o índice"""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.thread.join()
+        
+        with self.lock:
+            index = {
+                'version': self.VERSION,
+                'created_at': datetime.now().isoformat(),
+                'duration_s': round(time.monotonic() - self.started, 3),
+                'keyframe_interval': self.keyframe_interval,
+                'dropped': self.dropped,
+                'meta': self.meta,
+                'frames': self.frames,
+                'events': self.events
+            }
+        self.archive.writestr("index.json", json.dumps(index))
+        self.archive.close()
+        print(f"🎞️ Sessão gravada em {self.path}: {len(self.frames)} frames, "
+              f"{len(index['events'])} eventos, {self.dropped} descartados")
+
+class SessionReader:
+    """Leitura de uma gravação .rmrec - frames por número (acesso aleatório) e eventos"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.archive = zipfile.ZipFile(path)
+        index = json.loads(self.archive.read("index.json"))
+        if index.get('version') != SessionRecorder.VERSION:
+            raise ValueError(f"Versão de gravação não suportada: {index.get('version')}")
+        self.index = index
+        self.meta = index['meta']
+        self.frames = index['frames']
+        self.events = index['events']
+        self.decoded = {}  # região -> (número, imagem) do último frame decodificado
+    
+    def _payload(self, number):
+        """PNG do frame decodificado (imagem completa ou delta)"""
+        import cv2
+        import numpy as np
+        
+        data = np.frombuffer(self.archive.read(f"frames/{number:06d}.png"), dtype=np.uint8)
+        return cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+    
+    def frame(self, number):
+        """Imagem BGR do frame - reconstrói a partir do keyframe ou do último decodificado"""
+        entry = self.frames[number]
+        key = tuple(entry['region']) if entry['region'] else None
+        cached = self.decoded.get(key)
+        
+        chain = []
+        image = None
+        while entry is not None:
+            if cached is not None and cached[0] == entry['n']:
+                image = cached[1]
+                break
+            chain.append(entry)
+            entry = self.frames[entry['base']] if entry['base'] is not None else None
+        
+        for entry in reversed(chain):
+            payload = self._payload(entry['n'])
+            image = payload if entry['base'] is None else image + payload
+        
+        image.setflags(write=False)
+        self.decoded[key] = (number, image)
+        return image
+    
+    def timeline(self):
+        """Frames e eventos em ordem de tempo: ('frame', entrada) ou ('event', evento)"""
+        items = [(entry['t'], 1, 'frame', entry) for entry in self.frames]
+        items += [(event['t'], 0, 'event', event) for event in self.events]
+        for _, _, kind, item in sorted(items, key=lambda item: item[:2]):
+            yield kind, item
+    
+    def close(self):
+        """Fechar arquivo"""
+        self.archive.close()
+
+class RecordedFrameSource(FrameSource):
+    """Fonte de frames que repassa cada captura ao SessionRecorder"""
+    
+    def __init__(self, source, recorder):
+        self.source = source
+        self.recorder = recorder
+        self.name = f"{source.name}+record"
+        recorder.meta['frame_source'] = source.name
+        recorder.meta['screen_size'] = list(source.screen_size())
+    
+    def grab(self, region=None):
+        """Capturar pela fonte real e gravar"""
+        frame = self.source.grab(region)
+        self.recorder.add_frame(frame, region, self.source.area(region)[:2])
+        return frame
+    
+    def area(self, region=None):
+        """Área da fonte real"""
+        return self.source.area(region)
+    
+    def screen_size(self):
+        """Tamanho da fonte real"""
+        return self.source.screen_size()
+    
+    def close(self):
+        """Fechar fonte real"""
+        self.source.close()
+
+class ProxyInputBackend(InputBackend):
+    """Backend que repassa as ações a outro - base para gravação e restrição à janela"""
+    
+    suffix = "proxy"
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = f"{backend.name}+{self.suffix}"
+        self.pacing = backend.pacing
+    
+    def batch(self):
+        """Lote do backend real"""
+        return self.backend.batch()
+    
+    def press(self, key):
+        self.backend.press(key)
+    
+    def hotkey(self, *keys):
+        self.backend.hotkey(*keys)
+    
+    def click(self, x, y):
+        self.backend.click(x, y)
+    
+    def key_down(self, key):
+        self.backend.key_down(key)
+    
+    def key_up(self, key):
+        self.backend.key_up(key)
+
+class RecordedInputBackend(ProxyInputBackend):
+    """Backend que repassa as ações ao backend real registrando cada uma como evento"""
+    
+    suffix = "record"
+    
+    def __init__(self, backend, recorder):
+        super().__init__(backend)
+        self.recorder = recorder
+    
+    def press(self, key):
+        self.recorder.event("input", action="press", args=[key])
+        super().press(key)
+    
+    def hotkey(self, *keys):
+        self.recorder.event("input", action="hotkey", args=list(keys))
+        super().hotkey(*keys)
+    
+    def click(self, x, y):
+        self.recorder.event("input", action="click", args=[int(x), int(y)])
+        super().click(x, y)
+    
+    def key_down(self, key):
+        self.recorder.event("input", action="key_down", args=[key])
+        super().key_down(key)
+    
+    def key_up(self, key):
+        self.recorder.event("input", action="key_up", args=[key])
+        super().key_up(key)
+
+WindowInfo = namedtuple('WindowInfo', ['hwnd', 'pid', 'title', 'process'])
+
+class WindowBackend:
+    """Enumeração de janelas de processos - base"""
+    
+    name = "base"
+    
+    def windows(self):
+        """Janelas visíveis com título: lista de (hwnd, pid, título)"""
+        raise NotImplementedError
+    
+    def process_name(self, pid):
+        """Nome do executável do processo"""
+        raise NotImplementedError
+    
+    def client_rect(self, hwnd):
+        """Área cliente (left, top, width, height) em coordenadas de tela - None se fechada/minimizada"""
+        raise NotImplementedError
+    
+    def focus(self, hwnd):
+        """Trazer janela para frente"""
+        pass
+
+class Win32WindowBackend(WindowBackend):
+    """Janelas reais via win32gui/win32process e nomes de processo via psutil"""
+    
+    name = "win32"
+    
+    def windows(self):
+        """Enumerar janelas de topo visíveis"""
+        result = []
+        
+        def collect(hwnd, _):
+            if win32gui.IsWindowVisible(hwnd):
+                title = win32gui.GetWindowText(hwnd)
+                if title:
+                    _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                    result.append((hwnd, pid, title))
+            return True
+        
+        win32gui.EnumWindows(collect, None)
+        return result
+    
+    def process_name(self, pid):
+        """Nome do executável (pid entre parênteses se inacessível)"""
+        try:
+            return psutil.Process(pid).name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return f"({pid})"
+    
+    def client_rect(self, hwnd):
+        """Área cliente convertida para coordenadas de tela"""
+        if not win32gui.IsWindow(hwnd) or win32gui.IsIconic(hwnd):
+            return None
+        left, top, right, bottom = win32gui.GetClientRect(hwnd)
+        x, y = win32gui.ClientToScreen(hwnd, (left, top))
+        if right - left <= 0 or bottom - top <= 0:
+            return None
+        return (x, y, right - left, bottom - top)
+    
+    def focus(self, hwnd):
+        """Restaurar (se minimizada) e trazer para frente"""
+        if win32gui.IsIconic(hwnd):
+            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
+        win32gui.SetForegroundWindow(hwnd)
+
+class StubWindowBackend(WindowBackend):
+    """Janelas fictícias em memória - para testes e desenvolvimento no Linux"""
+    
+    name = "stub"
+    
+    def __init__(self, windows=None):
+        self.entries = {}
+        self.next_hwnd = itertools.count(0x1000)
+        if windows is None:
+            windows = [{'pid': 4242, 'title': "Poke Old", 'process': "PokeOld.exe", 'rect': (160, 90, 1280, 720)}]
+        for window in windows:
+            self.add(**window)
+    
+    def add(self, pid, title, process, rect):
+        """Abrir janela fictícia - retorna o hwnd"""
+        hwnd = next(self.next_hwnd)
+        self.entries[hwnd] = {'pid': pid, 'title': title, 'process': process, 'rect': rect}
+        return hwnd
+    
+    def move(self, hwnd, rect):
+        """Mover/redimensionar janela (None = minimizada)"""
+        self.entries[hwnd]['rect'] = rect
+    
+    def remove(self, hwnd):
+        """Fechar janela"""
+        self.entries.pop(hwnd, None)
+    
+    def windows(self):
+        return [(hwnd, entry['pid'], entry['title']) for hwnd, entry in self.entries.items()]
+    
+    def process_name(self, pid):
+        for entry in self.entries.values():
+            if entry['pid'] == pid:
+                return entry['process']
+        return f"({pid})"
+    
+    def client_rect(self, hwnd):
+        entry = self.entries.get(hwnd)
+        return entry['rect'] if entry else None
+
+def create_window_backend(backend=None):
+    """Criar backend de janelas (auto, win32 ou stub) - None se indisponível"""
+    backend = backend or os.environ.get("RM_BOT_WINDOW_BACKEND", "auto")
+    
+    if backend == "stub":
+        return StubWindowBackend()
+    if AUTOMATION_AVAILABLE and IS_WINDOWS:
+        return Win32WindowBackend()
+    return None
+
+class WindowIndex:
+    """Índice pid -> janelas -> área cliente, atualizado incrementalmente.
+    
+    refresh() reenumera as janelas (barato) mas só consulta o nome do processo de
+    pids novos; a área cliente é lida sob demanda e guardada por rect_ttl segundos.
+    """
+    
+    # Trechos de nome/título que colocam a janela no topo da lista
+    GAME_HINTS = ("poke",)
+    
+    def __init__(self, backend, ttl=2.0, rect_ttl=0.5):
+        self.backend = backend
+        self.ttl = ttl
+        self.rect_ttl = rect_ttl
+        self.windows = {}        # hwnd -> WindowInfo
+        self.process_names = {}  # pid -> executável
+        self.rects = {}          # hwnd -> (instante da leitura, área cliente)
+        self.refreshed_at = None
+        self.version = 0
+    
+    def refresh(self, force=False):
+        """Reenumerar janelas se o índice passou do ttl - True se algo mudou"""
+        now = time.monotonic()
+        if not force and self.refreshed_at is not None and now - self.refreshed_at < self.ttl:
+            return False
+        self.refreshed_at = now
+        
+        windows = {}
+        for hwnd, pid, title in self.backend.windows():
+            process = self.process_names.get(pid)
+            if process is None:
+                process = self.process_names[pid] = self.backend.process_name(pid)
+            windows[hwnd] = WindowInfo(hwnd, pid, title, process)
+        
+        # Pids encerrados saem do cache - o número pode ser reutilizado por outro processo
+        alive = {window.pid for window in windows.values()}
+        for pid in [pid for pid in self.process_names if pid not in alive]:
+            del self.process_names[pid]
+        for hwnd in [hwnd for hwnd in self.rects if hwnd not in windows]:
+            del self.rects[hwnd]
+        
+        if windows == self.windows:
+            return False
+        self.windows = windows
+        self.version += 1
+        return True
+    
+    def by_pid(self):
+        """{pid: [janelas]}"""
+        result = {}
+        for window in self.windows.values():
+            result.setdefault(window.pid, []).append(window)
+        return result
+    
+    def sorted_windows(self):
+        """Janelas com as do jogo primeiro, depois por processo e título"""
+        def key(window):
+            text = f"{window.process} {window.title}".lower()
+            return (not any(hint in text for hint in self.GAME_HINTS), window.process.lower(), window.title.lower())
+        return sorted(self.windows.values(), key=key)
+    
+    def client_rect(self, hwnd):
+        """Área cliente da janela (cache de rect_ttl - a janela pode mover ou redimensionar)"""
+        now = time.monotonic()
+        cached = self.rects.get(hwnd)
+        if cached is None or now - cached[0] >= self.rect_ttl:
+            cached = (now, self.backend.client_rect(hwnd))
+            self.rects[hwnd] = cached
+        return cached[1]
+
+class GameWindow:
+    """Janela do jogo selecionada - limites para captura e cliques"""
+    
+    def __init__(self, index, info):
+        self.index = index
+        self.info = info
+    
+    def rect(self):
+        """Área cliente atual (None se fechada ou minimizada)"""
+        return self.index.client_rect(self.info.hwnd)
+    
+    def contains(self, x, y):
+        """Ponto de tela dentro da área cliente"""
+        rect = self.rect()
+        if rect is None:
+            return False
+        left, top, width, height = rect
+        return left <= x < left + width and top <= y < top + height
+    
+    def describe(self):
+        """Texto curto para a interface"""
+        rect = self.rect()
+        where = f"{rect[2]}x{rect[3]} em ({rect[0]}, {rect[1]})" if rect else "minimizada/fechada"
+        return f"{self.info.process} - {self.info.title} ({where})"
+
+class WindowFrameSource(FrameSource):
+    """Captura restrita à área cliente da janela do jogo - regiões em coordenadas de tela"""
+    
+    def __init__(self, source, window):
+        self.source = source
+        self.window = window
+        self.name = f"{source.name}+window"
+    
+    def area(self, region=None):
+        """Região recortada pela área cliente (a janela inteira sem região)"""
+        rect = self.window.rect()
+        if rect is None:
+            raise RuntimeError("Janela do jogo fechada ou minimizada")
+        if region is None:
+            return rect
+        left, top, width, height = rect
+        x, y, w, h = clip_region((region[0] - left, region[1] - top, region[2], region[3]), width, height)
+        return (x + left, y + top, w, h)
+    
+    def grab(self, region=None):
+        """Capturar só a parte da região dentro da janela"""
+        area = self.area(region)
+        if area[2] <= 0 or area[3] <= 0:
+            raise ValueError(f"Região {region} fora da janela do jogo")
+        return self.source.grab(area)
+    
+    def screen_size(self):
+        """Tamanho da área cliente"""
+        rect = self.window.rect()
+        return (rect[2], rect[3]) if rect else (0, 0)
+    
+    def close(self):
+        """Fechar fonte real"""
+        self.source.close()
+
+class WindowInputBackend(ProxyInputBackend):
+    """Entrada com cliques restritos à área cliente da janela do jogo"""
     
-    required_packages = [
-        'customtkinter',
-        'bcrypt',
-        'pillow'
-    ]
+    suffix = "window"
     
-    optional_packages = [
-        'pyautogui', 
-        'opencv-python',
-        'psutil',
-        'pywin32',
-        'keyboard'
-    ]
+    def __init__(self, backend, window):
+        super().__init__(backend)
+        self.window = window
     
-    print("🔧 Verificando dependências básicas...")
-    missing_packages = []
+    def click(self, x, y):
+        """Clicar apenas dentro da janela"""
+        if not self.window.contains(x, y):
+            raise ValueError(f"Clique ({int(x)}, {int(y)}) fora da janela do jogo")
+        super().click(x, y)
+
+class LogSink:
+    """Logs thread-safe - workers publicam numa fila limitada, a UI drena em lotes para views com limite de linhas"""
+    
+    def __init__(self, root, max_queue=5000, max_lines=500, drain_interval=200, max_batch=500,
+                 log_file=None, max_file_bytes=1024 * 1024, backups=3):
+        self.root = root
+        self.max_lines = max_lines
+        self.drain_interval = drain_interval
+        self.max_batch = max_batch
+        # deque com maxlen: append/popleft atômicos, descarta os mais antigos se lotar
+        self.queue = deque(maxlen=max_queue)
+        self.history = {}
+        self.views = {}
+        self.line_counts = {}
+        self.dropped = 0
+        self.dropped_lock = threading.Lock()  # emit roda em várias threads de automação
+        
+        self.file_logger = None
+        if log_file:
+            import logging
+            from logging.handlers import RotatingFileHandler
+            
+            handler = RotatingFileHandler(log_file, maxBytes=max_file_bytes, backupCount=backups, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s [%(name)s] %(message)s'))
+            self.file_logger = logging.getLogger('rm_bot')
+            self.file_logger.setLevel(logging.INFO)
+            self.file_logger.propagate = False
+            self.file_logger.handlers = [handler]
+    
+    def emit(self, channel, message, level="info"):
+        """Publicar mensagem no canal (seguro para qualquer thread)"""
+        if not message.strip():
+            return
+        if len(self.queue) == self.queue.maxlen:
+            with self.dropped_lock:
+                self.dropped += 1
+        lines = message.rstrip("\n").split("\n")
+        self.queue.append((channel, lines))
+        
+        if self.file_logger:
+            log = self.file_logger.error if level == "error" else self.file_logger.info
+            for line in lines:
+                log(f"{channel}: {line}")
+    
+    def attach(self, channel, textbox):
+        """Ligar textbox ao canal e preencher com o histórico recente"""
+        self.views[channel] = textbox
+        self.line_counts[channel] = int(textbox.index("end-1c").split(".")[0]) - 1
+        history = list(self.history.get(channel, ()))
+        if history:
+            self._write(channel, history)
     
-    for package in required_packages:
+    def start(self):
+        """Iniciar drenagem periódica no loop da UI"""
+        self.root.after(self.drain_interval, self.drain)
+    
+    def drain(self):
+        """Drenar fila em lote e escrever uma vez por canal (thread da UI)"""
         try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
-            missing_packages.append(package)
+            pending = {}
+            for _ in range(min(self.max_batch, len(self.queue))):
+                channel, lines = self.queue.popleft()
+                history = self.history.get(channel)
+                if history is None:
+                    history = self.history[channel] = deque(maxlen=self.max_lines)
+                history.extend(lines)
+                pending.setdefault(channel, []).extend(lines)
+            
+            for channel, lines in pending.items():
+                self._write(channel, lines[-self.max_lines:])
+        finally:
+            self.root.after(self.drain_interval, self.drain)
     
-    if missing_packages:
-        print(f"📦 Instalando {len(missing_packages)} dependências básicas...")
+    def _write(self, channel, lines):
+        """Anexar linhas na view e descartar as mais antigas acima do limite"""
+        textbox = self.views.get(channel)
+        if textbox is None:
+            return
+        
         try:
-            for package in missing_packages:
-                print(f"   Instalando {package}...")
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
-            print("✅ Dependências básicas instaladas!")
-        except Exception as e:
-            print(f"❌ Erro na instalação: {e}")
-            print("Instale manualmente: pip install customtkinter bcrypt pillow")
-
-# Executar auto-instalador apenas no Windows
-if __name__ == "__main__":
-    install_dependencies()
+            if not textbox.winfo_exists():
+                self.views.pop(channel, None)
+                return
+            
+            textbox.insert("end", "\n".join(lines) + "\n")
+            self.line_counts[channel] += len(lines)
+            excess = self.line_counts[channel] - self.max_lines
+            if excess > 0:
+                textbox.delete("1.0", f"{excess + 1}.0")
+                self.line_counts[channel] -= excess
+            textbox.see("end")
+        except tk.TclError:
+            self.views.pop(channel, None)
 
-import customtkinter as ctk
-import bcrypt
+class LatencyHistogram:
+    """Histograma log-linear de latências (estilo HDR) em microssegundos.
+    
+    8 faixas por potência de 2 (erro relativo <= 12,5%) em 256 contadores fixos,
+    cobrindo de 1 µs a horas. Cada histograma tem um único escritor (a thread do
+    loop), então record() não usa lock.
+    """
+    
+    SUB_BUCKETS = 8
+    BUCKETS = 256
+    
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    @classmethod
+    def bucket(cls, us):
+        """Índice do contador para uma latência em µs"""
+        if us < cls.SUB_BUCKETS:
+            return us
+        shift = us.bit_length() - 4
+        return min(cls.BUCKETS - 1, (shift + 1) * cls.SUB_BUCKETS + (us >> shift) - cls.SUB_BUCKETS)
+    
+    @classmethod
+    def lower_bound(cls, index):
+        """Menor latência em µs contada no índice"""
+        if index < cls.SUB_BUCKETS:
+            return index
+        shift = index // cls.SUB_BUCKETS - 1
+        return (index % cls.SUB_BUCKETS + cls.SUB_BUCKETS) << shift
+    
+    def record(self, seconds):
+        """Registrar uma amostra em segundos"""
+        us = int(seconds * 1_000_000)
+        self.counts[self.bucket(us) if us > 0 else 0] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+    
+    def percentile(self, p):
+        """Percentil p (0-100) em segundos - limite superior da faixa, nunca acima do máximo"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.max, self.lower_bound(index + 1) / 1_000_000)
+        return self.max
+    
+    def summary(self):
+        """Contagem, média, percentis e máximo em ms"""
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(50) * 1000,
+            'p90_ms': self.percentile(90) * 1000,
+            'p99_ms': self.percentile(99) * 1000,
+            'max_ms': self.max * 1000
+        }
 
-# Importações para automação (instalar se necessário)
-try:
-    # Detectar sistema operacional
-    import platform
-    IS_WINDOWS = platform.system() == "Windows"
+class HotPathProfiler:
+    """Tempo por etapa (captura, conversão, matching, entrada, espera) de cada loop.
     
-    if IS_WINDOWS:
-        import pyautogui
-        import cv2
-        import numpy as np
-        import psutil
-        import random
-        import win32gui
-        import win32process
-        import win32api
-        import win32con
-        import keyboard
-        AUTOMATION_AVAILABLE = True
-        print("✅ Bibliotecas Windows carregadas com sucesso")
-    else:
-        print("⚠️ Sistema não-Windows detectado. Funcionalidades limitadas.")
-        AUTOMATION_AVAILABLE = False
-        
-except ImportError as e:
-    AUTOMATION_AVAILABLE = False
-    print("❌ Bibliotecas de automação não encontradas. Para Windows instale:")
-    print("pip install pyautogui opencv-python psutil pywin32 keyboard")
-    print(f"Erro específico: {e}")
-
-# Configurar PyAutoGUI se disponível
-if AUTOMATION_AVAILABLE:
-    pyautogui.FAILSAFE = True
-    pyautogui.PAUSE = 0.1
+    Cada thread de automação chama bind(loop) ao iniciar; as etapas registradas
+    nela (inclusive dentro das fontes de frame) vão para os histogramas desse
+    loop. Desligado via RM_BOT_PROFILE=0.
+    """
+    
+    clock = staticmethod(time.perf_counter)
+    
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+    
+    def bind(self, loop):
+        """Associar a thread atual a um loop"""
+        self.local.loop = loop
+    
+    def current_loop(self):
+        """Loop associado à thread atual"""
+        return getattr(self.local, 'loop', "main")
+    
+    def histogram(self, loop, stage):
+        """Histograma de (loop, etapa), criado no primeiro uso"""
+        key = (loop, stage)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+        return histogram
+    
+    def record(self, stage, seconds, loop=None):
+        """Registrar duração de uma etapa no loop da thread (ou no informado)"""
+        if self.enabled:
+            self.histogram(loop or self.current_loop(), stage).record(seconds)
+    
+    def lap(self, stage, since):
+        """Registrar etapa iniciada em since e devolver o instante atual (início da próxima)"""
+        now = time.perf_counter()
+        if self.enabled:
+            self.histogram(self.current_loop(), stage).record(now - since)
+        return now
+    
+    @contextmanager
+    def span(self, stage):
+        """Medir o bloco como uma etapa"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.lap(stage, start)
+    
+    def snapshot(self, loop=None):
+        """{loop: {etapa: resumo}} de todos os loops ou de um só"""
+        with self.lock:
+            items = sorted(self.histograms.items())
+        result = {}
+        for (name, stage), histogram in items:
+            if loop is None or name == loop:
+                result.setdefault(name, {})[stage] = histogram.summary()
+        return result
+    
+    def report(self, loop=None):
+        """Resumo legível por loop e etapa"""
+        lines = []
+        for name, stages in self.snapshot(loop).items():
+            lines.append(f"⏱️ {name}:\n")
+            for stage, stats in stages.items():
+                lines.append(
+                    f"   {stage}: {stats['count']}x, média {stats['mean_ms']:.3f} ms, "
+                    f"p50 {stats['p50_ms']:.3f}, p90 {stats['p90_ms']:.3f}, "
+                    f"p99 {stats['p99_ms']:.3f}, máx {stats['max_ms']:.3f} ms\n"
+                )
+        return "".join(lines)
+    
+    def dump(self, path):
+        """Gravar resumos e contadores brutos em JSON"""
+        with self.lock:
+            items = sorted(self.histograms.items())
+        data = {
+            'created_at': datetime.now().isoformat(),
+            'bucket_lower_bounds_us': [LatencyHistogram.lower_bound(i) for i in range(LatencyHistogram.BUCKETS)],
+            'loops': {}
+        }
+        for (name, stage), histogram in items:
+            data['loops'].setdefault(name, {})[stage] = dict(histogram.summary(), counts=list(histogram.counts))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        return path
+    
+    def reset(self, loop=None):
+        """Descartar histogramas de todos os loops ou de um só"""
+        with self.lock:
+            for key in [key for key in self.histograms if loop is None or key[0] == loop]:
+                del self.histograms[key]
 
-# Configurar aparência
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
+profiler = HotPathProfiler(enabled=os.environ.get("RM_BOT_PROFILE", "1") != "0")
 
-class DatabaseManager:
-    """Gerenciador do banco de dados SQLite local"""
+class BotCounters:
+    """Contadores de produtividade incrementados pelos loops de automação.
+    
+    Incrementos e leituras passam pelo mesmo lock, então a UI sempre vê um
+    snapshot consistente. Também mede o tempo em que ao menos um loop esteve
+    ativo, base das taxas por hora.
+    """
+    
+    NAMES = ("casts", "bites", "catches", "skills", "heals", "battles", "errors")
     
     def __init__(self):
-        self.db_path = "rm_bot.db"
-        self.init_database()
-    
-    def init_database(self):
-        """Inicializar banco de dados"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Tabela de usuários
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                is_admin BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP
-            )
-        ''')
-        
-        # Tabela de assinaturas
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS subscriptions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                expires_at TIMESTAMP NOT NULL,
-                active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                subscription_type TEXT DEFAULT 'premium',
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        # Criar usuário admin padrão
-        cursor.execute("SELECT * FROM users WHERE username = 'admin'")
-        if not cursor.fetchone():
-            password_hash = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            cursor.execute(
-                "INSERT INTO users (username, password_hash, is_admin) VALUES (?, ?, ?)",
-                ('admin', password_hash, True)
-            )
-            
-            # Criar assinatura para admin
-            user_id = cursor.lastrowid
-            expires_at = datetime.now() + timedelta(days=365)
-            cursor.execute(
-                "INSERT INTO subscriptions (user_id, expires_at, subscription_type) VALUES (?, ?, ?)",
-                (user_id, expires_at, 'admin')
-            )
-        
-        conn.commit()
-        conn.close()
+        self.lock = threading.Lock()
+        self.counts = dict.fromkeys(self.NAMES, 0)
+        self.running = set()
+        self.active_since = None
+        self.active_total = 0.0
     
-    def authenticate_user(self, username, password):
-        """Autenticar usuário"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT id, password_hash, is_admin FROM users WHERE username = ?", (username,))
-        user = cursor.fetchone()
-        
-        if user and bcrypt.checkpw(password.encode('utf-8'), user[1].encode('utf-8')):
-            # Atualizar último login
-            cursor.execute("UPDATE users SET last_login = ? WHERE id = ?", (datetime.now(), user[0]))
-            conn.commit()
-            conn.close()
-            return {'id': user[0], 'username': username, 'is_admin': user[2]}
-        
-        conn.close()
-        return None
+    def increment(self, name, amount=1):
+        """Somar amount ao contador"""
+        with self.lock:
+            self.counts[name] += amount
     
-    def get_user_subscription(self, user_id):
-        """Obter assinatura do usuário"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def loop_started(self, loop):
+        """Marcar loop como ativo (inicia o relógio de uso se for o primeiro)"""
+        with self.lock:
+            if not self.running:
+                self.active_since = time.monotonic()
+            self.running.add(loop)
+    
+    def loop_stopped(self, loop):
+        """Marcar loop como parado (pausa o relógio de uso se for o último)"""
+        with self.lock:
+            self.running.discard(loop)
+            if not self.running and self.active_since is not None:
+                self.active_total += time.monotonic() - self.active_since
+                self.active_since = None
+    
+    def snapshot(self):
+        """(contagens, segundos ativos, loops em execução) num instante consistente"""
+        with self.lock:
+            active = self.active_total
+            if self.active_since is not None:
+                active += time.monotonic() - self.active_since
+            return dict(self.counts), active, tuple(sorted(self.running))
+    
+    @staticmethod
+    def per_hour(count, seconds):
+        """Taxa por hora (0 sem tempo ativo suficiente para ser significativa)"""
+        return count * 3600 / seconds if seconds >= 60 else 0.0
+
+ConfigSnapshot = namedtuple('ConfigSnapshot', ['version', 'values'])
+
+class ConfigStore:
+    """Configuração imutável e versionada - a UI publica mudanças, os workers leem sem lock"""
+    
+    def __init__(self, **initial):
+        self.lock = threading.Lock()
+        self.current = ConfigSnapshot(0, self.freeze(initial))
+    
+    @classmethod
+    def freeze(cls, value):
+        """Cópia somente leitura em profundidade - dicts viram MappingProxyType, listas/sets tuplas"""
+        if isinstance(value, (dict, MappingProxyType)):
+            return MappingProxyType({key: cls.freeze(item) for key, item in value.items()})
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return tuple(cls.freeze(item) for item in value)
+        return value
+    
+    def snapshot(self):
+        """Snapshot atual (leitura de uma referência - segura em qualquer thread)"""
+        return self.current
+    
+    def get(self, key, default=None):
+        """Valor atual de uma chave"""
+        return self.current.values.get(key, default)
+    
+    def publish(self, **changes):
+        """Publicar novo snapshot com as mudanças (apenas se algo mudou)"""
+        changes = {key: self.freeze(value) for key, value in changes.items()}
+        with self.lock:
+            values = dict(self.current.values)
+            if all(key in values and values[key] == value for key, value in changes.items()):
+                return self.current
+            values.update(changes)
+            self.current = ConfigSnapshot(self.current.version + 1, MappingProxyType(values))
+            return self.current
+
+class VirtualList(ctk.CTkFrame):
+    """Lista virtualizada - instancia só as linhas visíveis e reaproveita os widgets no scroll.
+    
+    create_row(frame) monta os widgets de uma linha vazia; render_row(frame, item)
+    preenche a linha com um item. load_more() retorna (itens, tem_mais) e é chamado
+    sob demanda quando o scroll se aproxima do fim dos itens carregados.
+    """
+    
+    # Um único handler global de roda do mouse (por interpretador Tk) despacha para a
+    # lista sob o cursor - listas recriadas não acumulam bind_all nem ficam vivas
+    instances = weakref.WeakSet()
+    wheel_bound = set()
+    
+    def __init__(self, master, create_row, render_row, load_more=None, row_height=50, prefetch=20, **kwargs):
+        super().__init__(master, **kwargs)
+        self.create_row = create_row
+        self.render_row = render_row
+        self.load_more = load_more
+        self.row_height = row_height
+        self.prefetch = prefetch
+        self.items = []
+        self.has_more = False
+        self.first = 0
+        self.rows = []
+        
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.body.bind("<Configure>", lambda event: self.scroll_to(self.first))
+        self.bind("<Destroy>", lambda event: VirtualList.instances.discard(self), add="+")
+        
+        VirtualList.instances.add(self)
+        if id(self.tk) not in VirtualList.wheel_bound:
+            VirtualList.wheel_bound.add(id(self.tk))
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.bind_all(sequence, VirtualList.dispatch_mouse_wheel, add="+")
+    
+    def visible_count(self):
+        """Número de linhas que cabem na área visível"""
+        return max(1, self.body.winfo_height() // self.row_height)
+    
+    def reset(self, items=(), has_more=None):
+        """Substituir itens e voltar ao topo"""
+        self.items = list(items)
+        self.has_more = self.load_more is not None if has_more is None else has_more
+        self.scroll_to(0)
+    
+    def fill(self):
+        """Carregar páginas até cobrir a janela visível mais o prefetch"""
+        while self.has_more and self.first + self.visible_count() + self.prefetch > len(self.items):
+            batch, self.has_more = self.load_more()
+            self.items.extend(batch)
+    
+    def scroll_to(self, first):
+        """Posicionar o item first no topo da lista"""
+        visible = self.visible_count()
+        self.first = max(0, int(first))
+        self.fill()
+        self.first = min(self.first, max(0, len(self.items) - visible))
+        self.render()
+    
+    def render(self):
+        """Preencher as linhas visíveis com os itens a partir de self.first"""
+        visible = self.visible_count()
+        while len(self.rows) < visible:
+            row = ctk.CTkFrame(self.body, height=self.row_height - 5)
+            row.pack_propagate(False)
+            self.create_row(row)
+            self.rows.append(row)
+        
+        for position, row in enumerate(self.rows):
+            index = self.first + position
+            if position < visible and index < len(self.items):
+                self.render_row(row, self.items[index])
+                row.place(x=0, y=position * self.row_height, relwidth=1)
+            else:
+                row.place_forget()
         
-        cursor.execute(
-            "SELECT expires_at, subscription_type FROM subscriptions WHERE user_id = ? AND active = 1",
-            (user_id,)
-        )
-        subscription = cursor.fetchone()
-        conn.close()
+        total = max(1, len(self.items))
+        self.scrollbar.set(self.first / total, min(1.0, (self.first + visible) / total))
+    
+    def on_scrollbar(self, action, value, unit=None):
+        """Comando da scrollbar (moveto/scroll)"""
+        if action == "moveto":
+            self.scroll_to(float(value) * len(self.items))
+        elif action == "scroll":
+            step = self.visible_count() if unit == "pages" else 1
+            self.scroll_to(self.first + int(value) * step)
+    
+    @staticmethod
+    def dispatch_mouse_wheel(event):
+        """Entregar a roda do mouse à lista que contém o widget sob o cursor"""
+        widget = event.widget
+        if isinstance(widget, str):
+            return
+        while widget is not None:
+            if isinstance(widget, VirtualList) and widget in VirtualList.instances:
+                if widget.winfo_exists():
+                    widget.on_mouse_wheel(event)
+                return
+            widget = widget.master
+    
+    def on_mouse_wheel(self, event):
+        """Scroll pela roda do mouse"""
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.scroll_to(self.first - 3)
+        else:
+            self.scroll_to(self.first + 3)
+
+@functools.lru_cache(maxsize=256)
+def color_ramp(start, end, steps):
+    """Tons hex de start até end (inclusive) - pré-calculados uma vez por par de cores"""
+    r1, g1, b1 = int(start[1:3], 16), int(start[3:5], 16), int(start[5:7], 16)
+    r2, g2, b2 = int(end[1:3], 16), int(end[3:5], 16), int(end[5:7], 16)
+    ramp = []
+    for i in range(steps):
+        t = i / (steps - 1)
+        ramp.append(f"#{int(r1 + (r2 - r1) * t):02x}{int(g1 + (g2 - g1) * t):02x}{int(b1 + (b2 - b1) * t):02x}")
+    return tuple(ramp)
+
+class AnimationEngine:
+    """Relógio único de animação sobre root.after.
+    
+    Cada animação recebe step(t) com t em [0, 1] calculado pelo tempo decorrido,
+    então frames atrasados pulam passos em vez de acumular atraso. Se um frame
+    estoura frame_budget, as animações restantes ficam para o próximo frame.
+    """
+    
+    def __init__(self, root, fps=60, frame_budget=0.008):
+        self.root = root
+        self.interval = 1.0 / fps
+        self.frame_budget = frame_budget
+        self.animations = []
+        self.job = None
+        self.frames = 0
+        self.dropped = 0  # Animações adiadas por estouro de orçamento
+    
+    def animate(self, duration, step, on_done=None, easing=None):
+        """Registrar animação - step(t) a cada frame, on_done() ao terminar"""
+        animation = {
+            'start': time.perf_counter(),
+            'duration': max(duration, 1e-3),
+            'step': step,
+            'on_done': on_done,
+            'easing': easing
+        }
+        self.animations.append(animation)
+        if self.job is None:
+            self.job = self.root.after(0, self.tick)
+        return animation
+    
+    def cancel(self, animation):
+        """Remover animação sem chamar on_done"""
+        if animation in self.animations:
+            self.animations.remove(animation)
+    
+    def tick(self):
+        """Frame do relógio - avança todas as animações ativas"""
+        self.job = None
+        frame_start = time.perf_counter()
+        self.frames += 1
+        finished = []
+        
+        for position, animation in enumerate(list(self.animations)):
+            if position and time.perf_counter() - frame_start > self.frame_budget:
+                self.dropped += len(self.animations) - position
+                break
+            t = min(1.0, (frame_start - animation['start']) / animation['duration'])
+            easing = animation['easing']
+            try:
+                animation['step'](easing(t) if easing else t)
+            except tk.TclError:
+                t = 1.0  # Widget destruído no meio da animação
+            if t >= 1.0:
+                finished.append(animation)
+        
+        for animation in finished:
+            self.animations.remove(animation)
+        
+        # Agendar próximo frame antes dos callbacks (que podem iniciar novas animações)
+        if self.animations:
+            elapsed = time.perf_counter() - frame_start
+            self.job = self.root.after(max(1, int((self.interval - elapsed) * 1000)), self.tick)
+        
+        for animation in finished:
+            if animation['on_done']:
+                animation['on_done']()
+
+def measure(func, repeat=20, warmup=2):
+    """Tempo por chamada de func() em ms (mediana, p95 e mínimo)"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(samples[len(samples) // 2], 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        'min_ms': round(samples[0], 4),
+        'runs': repeat
+    }
+
+class BenchmarkSuite:
+    """Benchmarks headless dos caminhos quentes (visão, pesca, agendador e banco).
+    
+    Usa frames sintéticos com template plantado e bancos gerados - roda no Linux
+    sem tela. run() retorna um dicionário serializável em JSON para baselines.
+    """
+    
+    RESOLUTIONS = {'1080p': (1920, 1080), '1440p': (2560, 1440), '4k': (3840, 2160)}
+    DB_SIZES = (1000, 100000, 1000000)
+    
+    def __init__(self, resolutions=None, db_sizes=None, repeat=20, workdir="benchmark_data", seed=1234):
+        self.resolutions = resolutions or list(self.RESOLUTIONS)
+        self.db_sizes = db_sizes or self.DB_SIZES
+        self.repeat = repeat
+        self.workdir = workdir
+        self.seed = seed
+    
+    def battle_template(self, scale=1.0):
+        """Template sintético da caixa de batalha (BGR) - bordas e faixas bem definidas"""
+        import cv2
+        import numpy as np
         
-        if subscription:
-            expires_at = datetime.fromisoformat(subscription[0])
-            return {
-                'expires_at': expires_at,
-                'subscription_type': subscription[1],
-                'is_expired': expires_at < datetime.now(),
-                'days_remaining': max(0, (expires_at - datetime.now()).days)
-            }
-        return None
+        template = np.zeros((48, 160, 3), dtype=np.uint8)
+        template[:] = (40, 40, 160)
+        cv2.rectangle(template, (2, 2), (157, 45), (255, 255, 255), 2)
+        for i, x in enumerate(range(12, 150, 24)):
+            cv2.rectangle(template, (x, 14), (x + 14, 34), (0, 200 - i * 25, 60 + i * 30), -1)
+        if scale != 1.0:
+            template = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_LINEAR)
+        return template
     
-    def create_user(self, username, password, is_admin=False):
-        """Criar novo usuário"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def synthetic_scene(self, width, height, template):
+        """Frame de ruído com o template plantado - retorna (frame, posição)"""
+        import numpy as np
         
-        try:
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            cursor.execute(
-                "INSERT INTO users (username, password_hash, is_admin) VALUES (?, ?, ?)",
-                (username, password_hash, is_admin)
-            )
-            user_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            return user_id
-        except sqlite3.IntegrityError:
-            conn.close()
-            return None
+        rng = np.random.default_rng(self.seed)
+        frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        x, y = int(width * 0.6), int(height * 0.7)
+        th, tw = template.shape[:2]
+        frame[y:y + th, x:x + tw] = template
+        return frame, (x, y)
     
-    def get_all_users(self):
-        """Obter todos os usuários"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT u.id, u.username, u.is_admin, u.created_at, u.last_login,
-                   s.expires_at, s.subscription_type, s.active
-            FROM users u
-            LEFT JOIN subscriptions s ON u.id = s.user_id AND s.active = 1
-            ORDER BY u.created_at DESC
-        """)
-        
-        users = []
-        for row in cursor.fetchall():
-            user_data = {
-                'id': row[0],
-                'username': row[1],
-                'is_admin': row[2],
-                'created_at': row[3],
-                'last_login': row[4],
-                'subscription': None
-            }
+    def bench_vision(self):
+        """detect_battle: busca completa, busca local e pirâmide multi-escala"""
+        results = {}
+        template = self.battle_template()
+        for name in self.resolutions:
+            width, height = self.RESOLUTIONS[name]
+            frame, planted = self.synthetic_scene(width, height, template)
+            scaled_frame, scaled_planted = self.synthetic_scene(width, height, self.battle_template(1.1))
             
-            if row[5]:  # Tem assinatura
-                expires_at = datetime.fromisoformat(row[5])
-                user_data['subscription'] = {
-                    'expires_at': expires_at,
-                    'subscription_type': row[6],
-                    'active': row[7],
-                    'is_expired': expires_at < datetime.now(),
-                    'days_remaining': max(0, (expires_at - datetime.now()).days)
-                }
+            matcher = TemplateMatcher()
+            def full_search():
+                matcher.reset()
+                return matcher.match(frame, template, 0.8)
+            found, score, loc = full_search()
             
-            users.append(user_data)
-        
-        conn.close()
-        return users
+            local = TemplateMatcher()
+            local.match(frame, template, 0.8)
+            
+            pyramid = PyramidMatcher(scales=scale_steps(0.8, 1.2, 5))
+            def pyramid_search():
+                pyramid.reset()
+                return pyramid.match(scaled_frame, template, 0.8)
+            scaled_found, scaled_score, scaled_loc = pyramid_search()
+            
+            results[name] = {
+                # Busca completa custa segundos em 4K - menos repetições
+                'full_search': measure(full_search, max(3, self.repeat // 4), warmup=1),
+                'local_search': measure(lambda: local.match(frame, template, 0.8), self.repeat),
+                'pyramid_search': measure(pyramid_search, self.repeat),
+                'found': bool(found and loc == planted),
+                'pyramid_found': bool(scaled_found and scaled_loc is not None
+                                      and abs(scaled_loc[0] - scaled_planted[0]) <= 4
+                                      and abs(scaled_loc[1] - scaled_planted[1]) <= 4)
+            }
+        return results
     
-    def extend_user_subscription(self, user_id, days, subscription_type='premium'):
-        """Estender assinatura de usuário"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Verificar se já tem assinatura ativa
-        cursor.execute("SELECT expires_at FROM subscriptions WHERE user_id = ? AND active = 1", (user_id,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Estender assinatura existente
-            current_expires = datetime.fromisoformat(existing[0])
-            if current_expires < datetime.now():
-                # Se expirou, começar de hoje
-                new_expires = datetime.now() + timedelta(days=days)
-            else:
-                # Se ainda está ativa, adicionar aos dias restantes
-                new_expires = current_expires + timedelta(days=days)
+    def bench_fishing(self):
+        """Checagem de cor dos pontos de pesca (captura de patch e frame compartilhado)"""
+        results = {}
+        for name in self.resolutions:
+            width, height = self.RESOLUTIONS[name]
+            frame, _ = self.synthetic_scene(width, height, self.battle_template())
+            source = FileFrameSource([frame])
+            points = [(int(width * (0.3 + 0.05 * i)), int(height * 0.5)) for i in range(8)]
+            probe = PixelProbe(source, points, radius=1)
+            detector = BiteDetector()
+            detector.start_cast(0)
             
-            cursor.execute(
-                "UPDATE subscriptions SET expires_at = ?, subscription_type = ? WHERE user_id = ? AND active = 1",
-                (new_expires, subscription_type, user_id)
-            )
-        else:
-            # Criar nova assinatura
-            expires_at = datetime.now() + timedelta(days=days)
-            cursor.execute(
-                "INSERT INTO subscriptions (user_id, expires_at, subscription_type) VALUES (?, ?, ?)",
-                (user_id, expires_at, subscription_type)
-            )
+            def check():
+                colors = probe.sample([0])
+                detector.update(0, colors[0])
+            
+            results[name] = {
+                'patch_check': measure(check, self.repeat * 10),
+                'shared_frame_check': measure(lambda: probe.sample([0], frame), self.repeat * 10),
+                'all_points': measure(lambda: probe.sample(), self.repeat * 10)
+            }
+        return results
+    
+    def bench_scheduler(self, duration=2.0):
+        """Ritmo do healing_loop/skills: atraso do CooldownScheduler com 4 skills"""
+        scheduler = CooldownScheduler()
+        intervals = {'f1': 0.05, 'f2': 0.1, 'f3': 0.2, 'f4': 0.35}
+        scheduler.sync(intervals, lambda key: lambda: None)
+        deadline = time.monotonic() + duration
+        scheduler.run(lambda: time.monotonic() < deadline, lambda s: None)
+        
+        stats = scheduler.drift_stats()
+        return {
+            'duration_s': duration,
+            'mean_drift_ms': round(sum(s['mean_ms'] for s in stats.values()) / len(stats), 4),
+            'max_drift_ms': round(max(s['max_ms'] for s in stats.values()), 4),
+            'tasks': stats
+        }
+    
+    def generate_database(self, users, now=None):
+        """Banco com users usuários e assinaturas espalhadas (reaproveitado entre execuções).
         
-        conn.commit()
-        conn.close()
-        return True
+        Todas as linhas saem do gerador com self.seed - o mesmo seed e o mesmo now
+        produzem o mesmo banco. Cerca de 80% dos usuários têm licença, vencendo entre
+        60 dias antes e 60 dias depois de now.
+        """
+        import random
+        
+        os.makedirs(self.workdir, exist_ok=True)
+        path = os.path.join(self.workdir, f"rm_bot_{users}_{self.seed}.db")
+        db = DatabaseManager(path)
+        with db.connection() as conn:
+            existing = conn.execute("SELECT COUNT(*) FROM users WHERE NOT is_admin").fetchone()[0]
+        if existing == users and now is None:
+            return db
+        
+        rng = random.Random(self.seed)
+        password_hash = hash_password("bench", rounds=4)
+        now = now or datetime.now()
+        chunk = 50000
+        with db.transaction() as conn:
+            conn.execute("DELETE FROM subscriptions WHERE user_id IN (SELECT id FROM users WHERE NOT is_admin)")
+            conn.execute("DELETE FROM users WHERE NOT is_admin")
+            for offset in range(0, users, chunk):
+                count = min(chunk, users - offset)
+                conn.executemany(
+                    "INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
+                    [(f"user{offset + i:07d}", password_hash, now - timedelta(minutes=offset + i))
+                     for i in range(count)]
+                )
+            
+            # ids AUTOINCREMENT mudam a cada regeneração - a ordem de inserção não
+            user_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE NOT is_admin ORDER BY id")]
+            for offset in range(0, users, chunk):
+                rows = []
+                for user_id in user_ids[offset:offset + chunk]:
+                    if rng.random() < 0.8:
+                        rows.append((user_id, now + timedelta(days=rng.randrange(-60, 60)), 'premium'))
+                conn.executemany(
+                    "INSERT INTO subscriptions (user_id, expires_at, subscription_type) VALUES (?, ?, ?)", rows
+                )
+        with db.connection() as conn:
+            conn.execute("ANALYZE")
+        db.entitlements.invalidate()
+        return db
     
-    def delete_user(self, user_id):
-        """Deletar usuário"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def bench_database(self):
+        """Consultas de licença e do painel admin sobre bancos de tamanhos crescentes"""
+        import random
         
-        # Deletar assinaturas primeiro
-        cursor.execute("DELETE FROM subscriptions WHERE user_id = ?", (user_id,))
-        # Deletar usuário
-        cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        results = {}
+        for users in self.db_sizes:
+            start = time.perf_counter()
+            db = self.generate_database(users)
+            setup_s = time.perf_counter() - start
+            rng = random.Random(self.seed)
+            with db.connection() as conn:
+                user_ids = [row[0] for row in conn.execute("SELECT id FROM users")]
+            
+            def subscription_uncached():
+                db.entitlements.invalidate()
+                db.get_user_subscription(rng.choice(user_ids))
+            
+            user_id = rng.choice(user_ids)
+            first_page, cursor = db.list_users(limit=50)
+            results[str(users)] = {
+                'setup_s': round(setup_s, 2),
+                'get_user_subscription': measure(subscription_uncached, self.repeat * 10),
+                'is_entitled_cached': measure(lambda: db.is_entitled(user_id), self.repeat * 10),
+                'list_users_first_page': measure(lambda: db.list_users(limit=50), self.repeat),
+                'list_users_next_page': measure(lambda: db.list_users(after=cursor, limit=50), self.repeat),
+                'list_users_search': measure(lambda: db.list_users(search="user00012", limit=50), self.repeat),
+                'list_users_expired': measure(lambda: db.list_users(status='expired', limit=50), self.repeat),
+                'user_stats': measure(db.user_stats, max(3, self.repeat // 4))
+            }
+            db.close()
+        return results
+    
+    def run(self, sections=("vision", "fishing", "scheduler", "database")):
+        """Executar seções e retornar resultados com metadados do ambiente"""
+        import platform
+        import cv2
+        import numpy as np
         
-        conn.commit()
-        conn.close()
-        return True
+        results = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec="seconds"),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'opencv': cv2.__version__,
+                'numpy': np.__version__,
+                'sqlite': sqlite3.sqlite_version,
+                'repeat': self.repeat
+            }
+        }
+        for section in sections:
+            print(f"⏱️ Benchmark: {section}...")
+            results[section] = getattr(self, f"bench_{section}")()
+        return results
+
+def compare_benchmarks(baseline, current, tolerance=0.2, path=""):
+    """Medianas que pioraram mais que tolerance em relação à baseline - lista (métrica, antes, depois)"""
+    regressions = []
+    for key, value in current.items():
+        if key == 'meta' or key not in baseline:
+            continue
+        metric = f"{path}.{key}" if path else key
+        if isinstance(value, dict) and 'median_ms' in value:
+            before, after = baseline[key].get('median_ms'), value['median_ms']
+            if before and after > before * (1 + tolerance):
+                regressions.append((metric, before, after))
+        elif isinstance(value, dict) and isinstance(baseline[key], dict):
+            regressions.extend(compare_benchmarks(baseline[key], value, tolerance, metric))
+    return regressions
+
+def run_benchmark_cli(args):
+    """Executar benchmarks pela linha de comando - código de saída 1 se houver regressão"""
+    suite = BenchmarkSuite(
+        resolutions=args.resolutions.split(",") if args.resolutions else None,
+        db_sizes=[int(size) for size in args.db_sizes.split(",")] if args.db_sizes else None,
+        repeat=args.repeat,
+        seed=args.seed
+    )
+    sections = args.sections.split(",") if args.sections else ("vision", "fishing", "scheduler", "database")
+    results = suite.run(sections)
+    
+    output = args.output or "rm_bot_benchmark.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"✅ Resultados salvos em {output}")
+    
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare_benchmarks(baseline, results, args.tolerance)
+        for metric, before, after in regressions:
+            print(f"❌ Regressão em {metric}: {before:.3f} ms -> {after:.3f} ms")
+        if regressions:
+            return 1
+        print(f"✅ Nenhuma regressão acima de {args.tolerance:.0%} em relação a {args.baseline}")
+    return 0
+
+def replay_session(path, battle_template=None, confidence=0.9):
+    """Reprocessar uma gravação na velocidade máxima pela detecção de batalha e de mordida.
+    
+    Frames de tela inteira passam pelo mesmo PyramidMatcher do detect_battle; a partir de
+    cada evento 'cast' os frames que cobrem o ponto alimentam um BiteDetector novo, como
+    no fishing_loop. Retorna detecções e tempos num dicionário serializável em JSON.
+    """
+    reader = SessionReader(path)
+    matcher = PyramidMatcher(scales=scale_steps(0.8, 1.2, 5))
+    detector = BiteDetector()
+    decode_times, match_times, check_times = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    
+    battle_frames, bites = [], []
+    recorded = {'battle_checks': 0, 'battle_found': 0, 'bites': 0}
+    cast = None  # (número do lançamento, ponto, probe, instante)
+    casts = 0
+    
+    for kind, item in reader.timeline():
+        if kind == 'event':
+            if item['kind'] == 'battle_check':
+                recorded['battle_checks'] += 1
+                recorded['battle_found'] += bool(item['found'])
+            elif item['kind'] == 'bite':
+                recorded['bites'] += 1
+            elif item['kind'] == 'cast':
+                probe = PixelProbe(None, [item['xy']], radius=item['radius'])
+                detector.start_cast(item['point'], item.get('water_color'))
+                cast = (casts, item['point'], probe, item['t'])
+                casts += 1
+            continue
+        
+        start = time.perf_counter()
+        image = reader.frame(item['n'])
+        decode_times.record(time.perf_counter() - start)
+        
+        if item['region'] is None and battle_template is not None:
+            start = time.perf_counter()
+            found, _, _ = matcher.match(image, battle_template, confidence)
+            match_times.record(time.perf_counter() - start)
+            if found:
+                battle_frames.append(item['n'])
+        
+        if cast is not None:
+            number, point_index, probe, cast_time = cast
+            if probe.covers([0], image.shape, item['origin']):
+                start = time.perf_counter()
+                colors = probe.sample([0], image, origin=item['origin'])
+                bitten = detector.update(point_index, colors[0])
+                check_times.record(time.perf_counter() - start)
+                if bitten:
+                    bites.append({'cast': number, 'elapsed_s': round(item['t'] - cast_time, 4)})
+                    cast = None
+    
+    reader.close()
+    return {
+        'meta': {
+            'session': os.path.basename(path),
+            'frames': len(reader.frames),
+            'events': len(reader.events),
+            'duration_s': reader.index['duration_s'],
+            'dropped': reader.index['dropped'],
+            'recorded': recorded
+        },
+        'battle': {'found_frames': battle_frames, 'match': match_times.summary()},
+        'fishing': {'casts': casts, 'bites': bites, 'check': check_times.summary()},
+        'decode': decode_times.summary()
+    }
+
+def compare_replays(baseline, current):
+    """Diferenças de detecção entre duas reproduções da mesma gravação - lista de textos"""
+    differences = []
+    before, after = set(baseline['battle']['found_frames']), set(current['battle']['found_frames'])
+    if before != after:
+        differences.append(
+            f"batalha: {len(after - before)} frames novos, {len(before - after)} perdidos "
+            f"({len(before)} -> {len(after)})"
+        )
+    
+    before = {bite['cast']: bite['elapsed_s'] for bite in baseline['fishing']['bites']}
+    after = {bite['cast']: bite['elapsed_s'] for bite in current['fishing']['bites']}
+    for number in sorted(set(before) | set(after)):
+        if before.get(number) != after.get(number):
+            differences.append(f"pesca: lançamento {number} mordida {before.get(number)} s -> {after.get(number)} s")
+    return differences
+
+def run_replay_cli(args):
+    """Reproduzir gravação pela linha de comando - código de saída 1 se a detecção mudou"""
+    template = None
+    if args.battle_image:
+        import cv2
+        template = cv2.imread(args.battle_image, cv2.IMREAD_COLOR)
+        if template is None:
+            print(f"❌ Não foi possível carregar {args.battle_image}")
+            return 2
+    
+    results = replay_session(args.replay, template, args.confidence)
+    output = args.output or "rm_bot_replay.json"
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    
+    meta = results['meta']
+    print(f"🎞️ {meta['frames']} frames reproduzidos ({meta['duration_s']:.1f} s gravados)")
+    print(f"   decodificação p50 {results['decode']['p50_ms']:.3f} ms, "
+          f"matching p50 {results['battle']['match']['p50_ms']:.3f} ms")
+    print(f"   batalha em {len(results['battle']['found_frames'])} frames "
+          f"(gravação: {meta['recorded']['battle_found']}/{meta['recorded']['battle_checks']} checagens)")
+    print(f"   {len(results['fishing']['bites'])} mordidas em {results['fishing']['casts']} lançamentos "
+          f"(gravação: {meta['recorded']['bites']})")
+    print(f"✅ Resultados salvos em {output}")
+    
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        differences = compare_replays(baseline, results)
+        for difference in differences:
+            print(f"❌ {difference}")
+        if differences:
+            return 1
+        print(f"✅ Detecções idênticas a {args.baseline}")
+    return 0
+
+def parse_args(argv=None):
+    """Argumentos da linha de comando"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="RM Bot - Automação para Poke Old")
+    parser.add_argument("--benchmark", action="store_true", help="executar benchmarks headless e sair")
+    parser.add_argument("--record", help="gravar frames e ações da sessão neste arquivo .rmrec")
+    parser.add_argument("--log-file", help="gravar também os logs dos loops neste arquivo (rotativo)")
+    parser.add_argument("--replay", help="reproduzir gravação .rmrec pela detecção e sair")
+    parser.add_argument("--battle-image", help="imagem de referência da batalha para --replay")
+    parser.add_argument("--confidence", type=float, default=0.9, help="confiança do matching para --replay")
+    parser.add_argument("--output", help="arquivo JSON de resultados (rm_bot_benchmark.json / rm_bot_replay.json)")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="piora relativa aceita (0.2 = 20%%)")
+    parser.add_argument("--sections", help="seções separadas por vírgula (vision,fishing,scheduler,database)")
+    parser.add_argument("--resolutions", help="resoluções separadas por vírgula (1080p,1440p,4k)")
+    parser.add_argument("--db-sizes", help="tamanhos de banco separados por vírgula (ex: 1000,100000)")
+    parser.add_argument("--repeat", type=int, default=20, help="repetições por medida")
+    parser.add_argument("--seed", type=int, default=1234, help="semente dos frames e bancos sintéticos")
+    return parser.parse_args(argv)
+
+class TabManager:
+    """Abas construídas na primeira visita e reaproveitadas (ocultas/exibidas) nas seguintes.
+    
+    build(nome, parent) monta a aba dentro de parent. Com max_tabs, as abas usadas
+    há mais tempo são destruídas ao passar do limite (a aba atual nunca é descartada).
+    """
+    
+    def __init__(self, host, build, max_tabs=None):
+        self.host = host
+        self.build = build
+        self.max_tabs = max_tabs
+        self.frames = OrderedDict()  # nome -> frame, do menos para o mais recente
+        self.current = None
+        self.build_times = {}
+    
+    def show(self, name):
+        """Exibir aba, construindo-a se necessário"""
+        frame = self.frames.get(name)
+        if frame is None or not frame.winfo_exists():
+            frame = ctk.CTkFrame(self.host, fg_color="transparent")
+            start = time.perf_counter()
+            self.build(name, frame)
+            self.build_times[name] = time.perf_counter() - start
+            self.frames[name] = frame
+        self.frames.move_to_end(name)
+        
+        previous = self.frames.get(self.current)
+        if previous is not None and previous is not frame:
+            previous.pack_forget()
+        if not frame.winfo_manager():
+            frame.pack(fill="both", expand=True)
+        self.current = name
+        
+        self.evict()
+        return frame
+    
+    def current_frame(self):
+        """Frame da aba visível"""
+        return self.frames.get(self.current)
+    
+    def evict(self):
+        """Destruir abas menos usadas acima do limite"""
+        if not self.max_tabs:
+            return
+        while len(self.frames) > max(1, self.max_tabs):
+            name, frame = next(iter(self.frames.items()))
+            if name == self.current:
+                break
+            del self.frames[name]
+            frame.destroy()
+    
+    def invalidate(self, name):
+        """Descartar aba em cache (reconstruída na próxima exibição)"""
+        frame = self.frames.pop(name, None)
+        if frame is not None:
+            frame.destroy()
+        if name == self.current:
+            self.current = None
 
 class RMBotApp:
     """Aplicação principal do RM Bot"""
     
+    # Opções do filtro de status da lista de usuários -> DatabaseManager.STATUS_FILTERS
+    USER_STATUS_FILTERS = {
+        "Todos": None,
+        "Ativos": "active",
+        "Expirados": "expired",
+        "Sem licença": "none",
+        "Admins": "admin",
+    }
+    
+    # Abas que precisam das bibliotecas de automação carregadas antes de montar
+    AUTOMATION_TABS = ("process", "fishing", "skills", "hotkeys", "cura", "auto_battle")
+    PROCESS_REFRESH_MS = 2000
+    
+    # Histogramas de latência por etapa gravados ao fechar (HotPathProfiler.dump)
+    PROFILE_DUMP_PATH = "rm_bot_profile.json"
+    
+    # Linhas da aba de estatísticas: (rótulo, contador de BotCounters)
+    STATS_COUNTERS = (
+        ("Peixes Pescados", "catches"),
+        ("Mordidas Detectadas", "bites"),
+        ("Lançamentos", "casts"),
+        ("Skills Utilizadas", "skills"),
+        ("Curas", "heals"),
+        ("Batalhas", "battles"),
+        ("Erros", "errors"),
+    )
+    LOOP_NAMES = {"fishing": "Pesca", "skills": "Skills", "cura": "Cura", "auto_battle": "Auto Battle"}
+    STATS_REFRESH_MS = 1000
+    
     def __init__(self):
-        self.db = DatabaseManager()
+        self.db = DatabaseManager(create_admin=False)
+        self.auth = AuthService(self.db)
+        self.auth.start_setup()
+        startup_timer.mark("banco de dados")
         self.current_user = None
         
         # Configurações de hotkeys padrão
@@ -344,6 +3503,9 @@ class RMBotApp:
         self.fishing_active = False
         self.fishing_points = []
         self.water_color = None
+        self.bite_detector = BiteDetector()
+        self.counters = BotCounters()
+        self.license_stops = set()  # flags com parada por licença já agendada na UI
         
         # Threads de automação
         self.skills_thread = None
@@ -359,6 +3521,30 @@ class RMBotApp:
         # Detecção visual
         self.battle_image_path = None
         self.water_image_path = None
+        # Captura e entrada dependem das bibliotecas de automação (ver on_automation_ready)
+        self.frame_source = None
+        self.frame_bus = None
+        self.template_cache = TemplateCache()
+        self.input_backend = None
+        self.base_frame_source = None   # Fontes reais, antes de janela/gravação
+        self.base_input_backend = None
+        self.window_index = None
+        self.game_window = None  # GameWindow selecionada na aba de processo
+        self.recorder = None  # SessionRecorder com RM_BOT_RECORD/--record
+        
+        # Configuração lida pelos workers - publicada pela UI a cada mudança
+        self.config_store = ConfigStore(
+            battle_image="",
+            confidence=0.9,
+            battle_skills=(),
+            fishing_hotkey="shift+f1",
+            wait_time=2.2,
+            heal_skills={},
+            skills={}
+        )
+        self.config_bindings = set()
+        # Escalas de 80% a 120% para tolerar redimensionamento da janela/DPI
+        self.battle_matcher = PyramidMatcher(scales=scale_steps(0.8, 1.2, 5))
         
         # Interface
         self.root = ctk.CTk()
@@ -366,9 +3552,19 @@ class RMBotApp:
         self.root.geometry("1200x800")
         self.root.grid_columnconfigure(1, weight=1)
         self.root.grid_rowconfigure(0, weight=1)
+        startup_timer.mark("janela Tk")
         
         self.main_frame = None
+        self.tabs = None
+        self.max_cached_tabs = None  # Sem limite - defina um número para descartar abas LRU
+        
+        # Logs dos loops de automação - drenados pela UI em lotes; arquivo só com
+        # RM_BOT_LOG_FILE/--log-file
+        self.log_sink = LogSink(self.root, log_file=os.environ.get("RM_BOT_LOG_FILE"))
+        self.log_sink.start()
+        
         self.setup_login_interface()
+        startup_timer.mark("tela de login")
         
         # Configurar fechamento
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -383,6 +3579,9 @@ class RMBotApp:
         self.animation_speed = 1.0
         self.last_tab_switch_time = 0
         self.animation_progress_bar = None
+        self.animator = AnimationEngine(self.root)
+        self.animation_steps = 16  # Tons pré-calculados por rampa de cor
+        self.animation_widget_limit = 250  # Acima disso a troca de aba é direta
     
     def load_hotkeys_config(self):
         """Carregar configurações de hotkeys do arquivo"""
@@ -447,7 +3646,7 @@ class RMBotApp:
         self.password_entry.pack(pady=10)
         
         # Botões
-        login_btn = ctk.CTkButton(
+        self.login_btn = login_btn = ctk.CTkButton(
             login_frame,
             text="🚀 Entrar",
             command=self.perform_login,
@@ -531,12 +3730,19 @@ class RMBotApp:
                 messagebox.showerror("Erro", "Senha deve ter pelo menos 4 caracteres!")
                 return
             
-            user_id = self.db.create_user(username, password)
-            if user_id:
-                messagebox.showinfo("Sucesso", f"Usuário '{username}' criado com sucesso!\n\nIMPORTANTE: Você começou com 0 dias de licença.\nProcure um administrador para ativar sua licença.")
-                dialog.destroy()
-            else:
-                messagebox.showerror("Erro", "Usuário já existe!")
+            def on_created(user_id):
+                if not dialog.winfo_exists():
+                    return
+                register_btn.configure(state="normal")
+                if user_id:
+                    messagebox.showinfo("Sucesso", f"Usuário '{username}' criado com sucesso!\n\nIMPORTANTE: Você começou com 0 dias de licença.\nProcure um administrador para ativar sua licença.")
+                    dialog.destroy()
+                else:
+                    messagebox.showerror("Erro", "Usuário já existe!")
+            
+            # Hash bcrypt fora da thread da UI
+            register_btn.configure(state="disabled")
+            self.auth.submit(self.root, self.auth.create_user, username, password, callback=on_created)
         
         register_btn = ctk.CTkButton(dialog, text="✅ Cadastrar", command=register_user, width=200, height=40)
         register_btn.pack(pady=20)
@@ -552,7 +3758,27 @@ class RMBotApp:
             messagebox.showerror("Erro", "Preencha usuário e senha!")
             return
         
-        user = self.db.authenticate_user(username, password)
+        if self.login_btn.cget("state") == "disabled":
+            return  # Login já em andamento
+        
+        # bcrypt fora da thread da UI - resultado entregue em on_login_result
+        self.login_btn.configure(state="disabled", text="⏳ Entrando...")
+        self.auth.submit(
+            self.root, self.auth.authenticate, username, password,
+            callback=self.on_login_result, on_error=self.on_login_error
+        )
+    
+    def on_login_error(self, error):
+        """Falha inesperada durante o login"""
+        if self.login_btn.winfo_exists():
+            self.login_btn.configure(state="normal", text="🚀 Entrar")
+        messagebox.showerror("Erro", f"Erro ao autenticar: {error}")
+    
+    def on_login_result(self, user):
+        """Continuar login com o resultado da autenticação"""
+        if self.login_btn.winfo_exists():
+            self.login_btn.configure(state="normal", text="🚀 Entrar")
+        
         if user:
             self.current_user = user
             
@@ -577,6 +3803,11 @@ class RMBotApp:
         # Main frame
         self.main_frame = ctk.CTkFrame(self.root)
         self.main_frame.grid(row=0, column=1, sticky="nsew", padx=(5, 10), pady=10)
+        self.tabs = TabManager(self.main_frame, self.build_tab, max_tabs=self.max_cached_tabs)
+        self.current_tab = None
+        
+        # Adiantar o carregamento das bibliotecas de automação em segundo plano
+        automation_stack.start()
         
         # Iniciar com aba de processo
         self.switch_tab("process")
@@ -591,6 +3822,8 @@ class RMBotApp:
         # Main frame
         self.main_frame = ctk.CTkFrame(self.root)
         self.main_frame.grid(row=0, column=1, sticky="nsew", padx=(5, 10), pady=10)
+        self.tabs = TabManager(self.main_frame, self.build_tab, max_tabs=self.max_cached_tabs)
+        self.current_tab = None
         
         # Iniciar com aba de usuários
         self.switch_tab("users")
@@ -882,7 +4115,7 @@ class RMBotApp:
         
         self.animation_in_progress = True
         
-        if self.animation_enabled:
+        if self.animation_enabled and not self.tab_too_heavy(self.tabs.current_frame()):
             # Escolher tipo de animação baseado na aba
             if tab_name in ["auto_battle", "skills", "cura"]:
                 # Animação de slide para abas de ação
@@ -896,268 +4129,256 @@ class RMBotApp:
     
     def fade_out_current_tab(self, callback):
         """Animação de fade out da aba atual"""
-        def fade_step(alpha):
-            if alpha > 0:
-                # Reduzir opacidade gradualmente
-                for widget in self.main_frame.winfo_children():
-                    try:
-                        # Simular fade out alterando a cor do texto
-                        if hasattr(widget, 'configure'):
-                            if hasattr(widget, 'cget'):
-                                try:
-                                    current_color = widget.cget('text_color')
-                                    if current_color:
-                                        # Escurecer gradualmente
-                                        fade_color = self.interpolate_color(current_color, "#2b2b2b", 1 - alpha)
-                                        widget.configure(text_color=fade_color)
-                                except:
-                                    pass
-                    except:
-                        pass
-                
-                # Continuar animação com easing
-                eased_alpha = self.ease_in_out_cubic(1 - alpha)
-                delay = int(30 / self.animation_speed)
-                self.root.after(delay, lambda: fade_step(alpha - 0.1))
-            else:
-                # Fade out completo, executar callback
-                callback()
+        # Guardar cores originais - a aba fica em cache e precisa voltar intacta
+        text_colors = self.capture_text_colors(self.current_tab_widgets())
+        ramps = [(widget, color_ramp(color, "#2b2b2b", self.animation_steps))
+                 for widget, original, color in text_colors]
+        
+        def done():
+            # Fade out completo - trocar de aba e restaurar a aba oculta
+            callback()
+            self.restore_text_colors(text_colors)
         
-        fade_step(1.0)
+        self.animate_color_ramps(ramps, 0.3, done)
     
     def load_new_tab(self, tab_name):
         """Carregar nova aba e aplicar fade in"""
-        # Limpar widgets atuais
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
+        self.load_tab_content(tab_name)
         
-        # Carregar nova aba
-        if tab_name == "fishing":
-            self.create_fishing_tab()
-        elif tab_name == "skills":
-            self.create_skills_tab()
-        elif tab_name == "stats":
-            self.create_stats_tab()
-        elif tab_name == "process":
-            self.create_process_tab()
-        elif tab_name == "hotkeys":
-            self.create_hotkeys_tab()
-        elif tab_name == "cura":
-            self.create_cura_tab()
-        elif tab_name == "auto_battle":
-            self.create_auto_battle_tab()
-        elif tab_name == "users":
-            self.create_user_management_tab()
-        elif tab_name == "licenses":
-            self.create_license_management_tab()
-        
-        # Aplicar fade in
-        self.fade_in_new_tab()
+        # Aplicar fade in (abas muito grandes aparecem direto)
+        if self.tab_too_heavy(self.tabs.current_frame()):
+            self.animation_in_progress = False
+        else:
+            self.fade_in_new_tab()
+    
+    def fade_in_new_tab(self):
+        """Animação de fade in da nova aba"""
+        text_colors = self.capture_text_colors(self.current_tab_widgets())
+        ramps = [(widget, color_ramp("#1a1a1a", color, self.animation_steps))
+                 for widget, original, color in text_colors]
         
-        # Atualizar aba atual
-        self.current_tab = tab_name
+        def done():
+            # Fade in completo, animação finalizada
+            self.restore_text_colors(text_colors)
+            self.animation_in_progress = False
+        
+        self.animate_color_ramps(ramps, 0.2, done)
+    
+    def animate_color_ramps(self, ramps, duration, on_done):
+        """Percorrer rampas de cor pré-calculadas no relógio de animação"""
+        last_index = [-1]
+        
+        def step(t):
+            # Reconfigurar widgets só quando o tom muda
+            index = int(t * (self.animation_steps - 1))
+            if index == last_index[0]:
+                return
+            last_index[0] = index
+            for widget, ramp in ramps:
+                try:
+                    widget.configure(text_color=ramp[index])
+                except (tk.TclError, ValueError):
+                    pass
+        
+        step(0.0)
+        self.animator.animate(duration / self.animation_speed, step, on_done, easing=self.ease_in_out_cubic)
+    
+    def tab_too_heavy(self, frame):
+        """Aba com widgets demais para animar sem travar a UI (contagem com corte no limite)"""
+        if frame is None:
+            return False
+        count = 0
+        pending = [frame]
+        while pending:
+            children = pending.pop().winfo_children()
+            count += len(children)
+            if count > self.animation_widget_limit:
+                return True
+            pending.extend(children)
+        return False
+    
+    def current_tab_widgets(self):
+        """Widgets de primeiro nível da aba visível"""
+        tab_frame = self.tabs.current_frame() if self.tabs else None
+        return tab_frame.winfo_children() if tab_frame is not None else []
+    
+    def capture_text_colors(self, widgets):
+        """Lista (widget, cor original, cor hex do modo atual) dos widgets com text_color"""
+        dark = ctk.get_appearance_mode() == "Dark"
+        text_colors = []
+        for widget in widgets:
+            try:
+                original = widget.cget('text_color')
+            except:
+                continue
+            if not original:
+                continue
+            color = original[1 if dark else 0] if isinstance(original, (list, tuple)) else original
+            try:
+                # Normalizar nomes de cor ("gray84") para hex uma única vez
+                r, g, b = widget.winfo_rgb(color)
+            except tk.TclError:
+                continue
+            text_colors.append((widget, original, f"#{r >> 8:02x}{g >> 8:02x}{b >> 8:02x}"))
+        return text_colors
     
-    def fade_in_new_tab(self):
-        """Animação de fade in da nova aba"""
-        def fade_step(alpha):
-            if alpha < 1.0:
-                # Aumentar opacidade gradualmente
-                for widget in self.main_frame.winfo_children():
-                    try:
-                        if hasattr(widget, 'configure'):
-                            # Restaurar cores gradualmente
-                            self.restore_widget_colors(widget, alpha)
-                    except:
-                        pass
-                
-                # Continuar animação
-                self.root.after(20, lambda: fade_step(alpha + 0.15))
-            else:
-                # Fade in completo, animação finalizada
-                self.animation_in_progress = False
-        
-        # Iniciar com widgets invisíveis
-        for widget in self.main_frame.winfo_children():
+    def restore_text_colors(self, text_colors):
+        """Restaurar cores originais capturadas"""
+        for widget, original, color in text_colors:
             try:
-                if hasattr(widget, 'configure'):
-                    if hasattr(widget, 'cget'):
-                        try:
-                            widget.configure(text_color="#1a1a1a")
-                        except:
-                            pass
+                if widget.winfo_exists():
+                    widget.configure(text_color=original)
             except:
                 pass
-        
-        fade_step(0.0)
-    
-    def interpolate_color(self, color1, color2, t):
-        """Interpolar entre duas cores"""
-        try:
-            # Converter cores hex para RGB
-            if color1.startswith('#'):
-                r1, g1, b1 = int(color1[1:3], 16), int(color1[3:5], 16), int(color1[5:7], 16)
-            else:
-                r1, g1, b1 = 255, 255, 255  # Branco padrão
-            
-            if color2.startswith('#'):
-                r2, g2, b2 = int(color2[1:3], 16), int(color2[3:5], 16), int(color2[5:7], 16)
-            else:
-                r2, g2, b2 = 43, 43, 43  # Cinza escuro padrão
-            
-            # Interpolar
-            r = int(r1 + (r2 - r1) * t)
-            g = int(g1 + (g2 - g1) * t)
-            b = int(b1 + (b2 - b1) * t)
-            
-            return f"#{r:02x}{g:02x}{b:02x}"
-        except:
-            return "#ffffff"
-    
-    def restore_widget_colors(self, widget, alpha):
-        """Restaurar cores originais dos widgets gradualmente"""
-        try:
-            widget_type = widget.__class__.__name__
-            
-            # Definir cores padrão por tipo de widget
-            default_colors = {
-                'CTkLabel': "#ffffff",
-                'CTkButton': "#3b8ed0",
-                'CTkEntry': "#ffffff",
-                'CTkTextbox': "#ffffff",
-                'CTkCheckBox': "#ffffff",
-                'CTkFrame': "#2b2b2b"
-            }
-            
-            if widget_type in default_colors:
-                target_color = default_colors[widget_type]
-                current_color = self.interpolate_color("#1a1a1a", target_color, alpha)
-                
-                if hasattr(widget, 'configure'):
-                    if widget_type in ['CTkLabel', 'CTkEntry', 'CTkTextbox', 'CTkCheckBox']:
-                        widget.configure(text_color=current_color)
-                    elif widget_type == 'CTkButton':
-                        # Para botões, interpolar também a cor de fundo
-                        bg_color = self.interpolate_color("#1a1a1a", "#3b8ed0", alpha)
-                        widget.configure(fg_color=bg_color, text_color="#ffffff")
-        except:
-            pass
     
     def slide_transition(self, tab_name):
         """Animação de deslizamento para transições especiais"""
-        # Capturar conteúdo atual
-        current_widgets = list(self.main_frame.winfo_children())
+        tab_frame = self.tabs.current_frame()
+        if tab_frame is None:
+            self.slide_in_new_tab(tab_name)
+            return
         
         # Aplicar efeito de slide out (deslizar para a esquerda)
-        self.slide_out_current(current_widgets, lambda: self.slide_in_new_tab(tab_name))
-    
-    def slide_out_current(self, widgets, callback):
-        """Deslizar conteúdo atual para fora"""
-        def slide_step(offset):
-            if offset > -300:  # Deslizar 300 pixels para a esquerda
-                for widget in widgets:
-                    try:
-                        if widget.winfo_exists():
-                            # Simular movimento alterando padding
-                            current_padx = widget.pack_info().get('padx', (0, 0))
-                            if isinstance(current_padx, int):
-                                new_padx = (current_padx + offset, 0)
-                            else:
-                                new_padx = (current_padx[0] + offset, current_padx[1])
-                            
-                            widget.pack_configure(padx=new_padx)
-                    except:
-                        pass
-                
-                # Continuar animação
-                self.root.after(15, lambda: slide_step(offset - 20))
-            else:
-                # Slide out completo
-                callback()
+        width = max(1, self.main_frame.winfo_width())
+        self.slide_frame(tab_frame, 0, -width, lambda: self.slide_in_new_tab(tab_name), repack=False)
+    
+    def slide_frame(self, frame, start_x, end_x, on_done, repack=True):
+        """Deslizar o frame da aba via place - move a janela inteira sem relayout dos filhos"""
+        frame.pack_forget()
+        frame.place(x=start_x, y=0, relwidth=1, relheight=1)
+        
+        def step(t):
+            frame.place_configure(x=int(start_x + (end_x - start_x) * t))
         
-        slide_step(0)
+        def done():
+            frame.place_forget()
+            if repack:
+                frame.pack(fill="both", expand=True)
+            on_done()
+        
+        self.animator.animate(0.25 / self.animation_speed, step, done, easing=self.ease_in_out_cubic)
     
     def slide_in_new_tab(self, tab_name):
         """Carregar nova aba com efeito de slide in"""
-        # Limpar widgets atuais
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-        
-        # Carregar nova aba
         self.load_tab_content(tab_name)
+        tab_frame = self.tabs.current_frame()
+        
+        def done():
+            # Animação finalizada
+            self.animation_in_progress = False
+        
+        if self.tab_too_heavy(tab_frame):
+            done()
+            return
         
         # Aplicar slide in (deslizar da direita)
-        new_widgets = list(self.main_frame.winfo_children())
-        self.slide_in_widgets(new_widgets)
+        width = max(1, self.main_frame.winfo_width())
+        self.slide_frame(tab_frame, width, 0, done)
     
-    def slide_in_widgets(self, widgets):
-        """Deslizar novos widgets para dentro"""
-        # Começar fora da tela (direita)
-        for widget in widgets:
-            try:
-                widget.pack_configure(padx=(300, 0))
-            except:
-                pass
+    def ensure_automation(self, callback):
+        """Chamar callback na thread da UI quando as bibliotecas de automação estiverem prontas"""
+        if automation_stack.ready.is_set():
+            if self.input_backend is None:
+                self.on_automation_ready()
+            callback()
+            return
         
-        def slide_step(offset):
-            if offset > 0:
-                for widget in widgets:
-                    try:
-                        if widget.winfo_exists():
-                            widget.pack_configure(padx=(offset, 0))
-                    except:
-                        pass
-                
-                # Continuar animação
-                self.root.after(15, lambda: slide_step(offset - 20))
-            else:
-                # Slide in completo, restaurar padding normal
-                for widget in widgets:
-                    try:
-                        if widget.winfo_exists():
-                            widget.pack_configure(padx=20)
-                    except:
-                        pass
-                
-                # Animação finalizada
-                self.animation_in_progress = False
+        automation_stack.start()
+        self.root.after(50, lambda: self.ensure_automation(callback))
+    
+    def on_automation_ready(self):
+        """Criar captura e entrada com as bibliotecas carregadas"""
+        self.automation_enabled = AUTOMATION_AVAILABLE
+        self.base_frame_source = create_frame_source()
+        self.base_input_backend = create_input_backend()
         
-        slide_step(300)
+        window_backend = create_window_backend()
+        self.window_index = WindowIndex(window_backend) if window_backend else None
+        
+        record_path = os.environ.get("RM_BOT_RECORD")
+        if record_path and self.base_frame_source:
+            self.recorder = SessionRecorder(record_path)
+            print(f"🎞️ Gravando sessão em {record_path}")
+        
+        self.configure_capture()
+    
+    def configure_capture(self):
+        """Montar captura e entrada: janela do jogo (se selecionada) e gravação (se ativa) sobre as reais"""
+        source, backend = self.base_frame_source, self.base_input_backend
+        if self.game_window is not None:
+            source = WindowFrameSource(source, self.game_window) if source else None
+            backend = WindowInputBackend(backend, self.game_window)
+        if self.recorder is not None and source is not None:
+            source = RecordedFrameSource(source, self.recorder)
+            backend = RecordedInputBackend(backend, self.recorder)
+        
+        self.frame_source, self.input_backend = source, backend
+        if source is None:
+            self.frame_bus = None
+        elif self.frame_bus is None:
+            self.frame_bus = FrameBus(source)
+        else:
+            self.frame_bus.set_source(source)
+    
+    def record_event(self, kind, **data):
+        """Registrar evento de detecção na gravação da sessão (se ativa)"""
+        if self.recorder is not None:
+            self.recorder.event(kind, **data)
+    
+    def build_tab(self, tab_name, parent):
+        """Construir conteúdo da aba dentro de parent (chamado pelo TabManager)"""
+        if tab_name in self.AUTOMATION_TABS and self.input_backend is None:
+            # Mostrar aviso e montar a aba assim que as bibliotecas carregarem
+            loading = ctk.CTkLabel(parent, text="⏳ Carregando módulos de automação...",
+                                   font=ctk.CTkFont(size=16), text_color="gray")
+            loading.pack(expand=True, pady=40)
+            
+            def build():
+                if parent.winfo_exists():
+                    loading.destroy()
+                    self.build_tab(tab_name, parent)
+            
+            self.ensure_automation(build)
+            return
+        
+        builders = {
+            "fishing": self.create_fishing_tab,
+            "skills": self.create_skills_tab,
+            "stats": self.create_stats_tab,
+            "process": self.create_process_tab,
+            "hotkeys": self.create_hotkeys_tab,
+            "cura": self.create_cura_tab,
+            "auto_battle": self.create_auto_battle_tab,
+            "users": self.create_user_management_tab,
+            "licenses": self.create_license_management_tab,
+        }
+        builders[tab_name](parent)
     
     def load_tab_content(self, tab_name):
-        """Carregar conteúdo da aba sem animação"""
-        if tab_name == "fishing":
-            self.create_fishing_tab()
-        elif tab_name == "skills":
-            self.create_skills_tab()
-        elif tab_name == "stats":
-            self.create_stats_tab()
-        elif tab_name == "process":
-            self.create_process_tab()
-        elif tab_name == "hotkeys":
-            self.create_hotkeys_tab()
-        elif tab_name == "cura":
-            self.create_cura_tab()
-        elif tab_name == "auto_battle":
-            self.create_auto_battle_tab()
-        elif tab_name == "users":
-            self.create_user_management_tab()
-        elif tab_name == "licenses":
-            self.create_license_management_tab()
+        """Mostrar aba sem animação (construída na primeira visita, depois reaproveitada)"""
+        self.tabs.show(tab_name)
         
         # Atualizar aba atual
         self.current_tab = tab_name
     
-    def create_process_tab(self):
+    def refresh_tab(self, *tab_names):
+        """Descartar abas em cache cujos dados mudaram e reconstruir a atual"""
+        for tab_name in tab_names:
+            self.tabs.invalidate(tab_name)
+        if self.current_tab in tab_names:
+            self.tabs.show(self.current_tab)
+    
+    def create_process_tab(self, parent):
         """Criar aba de seleção de processo"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="🎮 Seleção do Processo do Jogo",
             font=ctk.CTkFont(size=24, weight="bold")
         )
         header.pack(pady=20)
         
         info = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Selecione o processo do Poke Old para que o bot possa interagir com o jogo",
             font=ctk.CTkFont(size=14),
             text_color="gray"
@@ -1165,59 +4386,50 @@ class RMBotApp:
         info.pack(pady=10)
         
         # Frame para lista de processos
-        process_frame = ctk.CTkFrame(self.main_frame)
+        process_frame = ctk.CTkFrame(parent)
         process_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
-        # Mensagem temporária para sistemas sem automação
-        if not AUTOMATION_AVAILABLE:
+        # Mensagem para sistemas sem enumeração de janelas
+        if self.window_index is None:
             no_automation = ctk.CTkLabel(
                 process_frame,
-                text="⚠️ Automação não disponível neste sistema\n\nPara funcionalidade completa, execute no Windows com:\npip install pyautogui opencv-python psutil pywin32",
+                text="⚠️ Automação não disponível neste sistema\n\nPara funcionalidade completa, execute no Windows com:\npip install pyautogui opencv-python psutil pywin32\n\n(RM_BOT_WINDOW_BACKEND=stub usa janelas fictícias para testes)",
                 font=ctk.CTkFont(size=16),
                 text_color="orange"
             )
             no_automation.pack(expand=True)
             return
         
-        # Lista de processos (simulada)
+        # Janela vinculada - captura e cliques ficam restritos à área cliente dela
+        selected_frame = ctk.CTkFrame(process_frame)
+        selected_frame.pack(fill="x", padx=20, pady=(20, 0))
+        
+        self.selected_window_label = ctk.CTkLabel(
+            selected_frame,
+            text="",
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        self.selected_window_label.pack(side="left", padx=10, pady=10)
+        
+        ctk.CTkButton(
+            selected_frame,
+            text="Desvincular",
+            width=110,
+            fg_color="gray",
+            command=lambda: self.select_process(None)
+        ).pack(side="right", padx=10, pady=10)
+        
         processes_label = ctk.CTkLabel(
             process_frame,
-            text="📋 Processos Disponíveis:",
+            text="📋 Janelas Disponíveis:",
             font=ctk.CTkFont(size=16, weight="bold")
         )
-        processes_label.pack(pady=20)
-        
-        # Frame scrollável para processos
-        scroll_frame = ctk.CTkScrollableFrame(process_frame)
-        scroll_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        processes_label.pack(pady=(20, 0))
         
-        # Simular alguns processos para demonstração
-        sample_processes = [
-            {"name": "PokeOld.exe", "pid": "1234", "status": "🎮 Jogo Principal"},
-            {"name": "PokeClient.exe", "pid": "5678", "status": "🎮 Cliente Alternativo"},
-            {"name": "Chrome.exe", "pid": "9012", "status": "🌐 Navegador"},
-            {"name": "Notepad.exe", "pid": "3456", "status": "📝 Editor de Texto"}
-        ]
-        
-        for proc in sample_processes:
-            proc_frame = ctk.CTkFrame(scroll_frame)
-            proc_frame.pack(fill="x", padx=10, pady=5)
-            
-            proc_info = ctk.CTkLabel(
-                proc_frame,
-                text=f"{proc['name']} (PID: {proc['pid']}) - {proc['status']}",
-                font=ctk.CTkFont(size=12)
-            )
-            proc_info.pack(side="left", padx=10, pady=10)
-            
-            select_btn = ctk.CTkButton(
-                proc_frame,
-                text="Selecionar",
-                width=100,
-                height=30,
-                command=lambda p=proc: self.select_process(p)
-            )
-            select_btn.pack(side="right", padx=10, pady=10)
+        # Frame scrollável para janelas - linhas recriadas só quando o índice muda
+        self.process_list_frame = ctk.CTkScrollableFrame(process_frame)
+        self.process_list_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        self.process_list_version = None
         
         # Botão para atualizar lista
         refresh_btn = ctk.CTkButton(
@@ -1228,18 +4440,24 @@ class RMBotApp:
             font=ctk.CTkFont(size=14, weight="bold")
         )
         refresh_btn.pack(pady=20)
+        
+        if getattr(self, 'process_refresh_job', None):
+            self.root.after_cancel(self.process_refresh_job)
+        self.process_refresh_job = None
+        self.window_index.refresh(force=True)
+        self.update_process_list()
     
-    def create_hotkeys_tab(self):
+    def create_hotkeys_tab(self, parent):
         """Criar aba de configuração de hotkeys"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="⌨️ Configuração de Hotkeys",
             font=ctk.CTkFont(size=24, weight="bold")
         )
         header.pack(pady=20)
         
         description = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Configure teclas de atalho para controlar o bot rapidamente",
             font=ctk.CTkFont(size=14),
             text_color="gray"
@@ -1247,7 +4465,7 @@ class RMBotApp:
         description.pack(pady=10)
         
         # Frame principal scrollável
-        main_scroll = ctk.CTkScrollableFrame(self.main_frame)
+        main_scroll = ctk.CTkScrollableFrame(parent)
         main_scroll.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Configurações de hotkeys
@@ -1398,17 +4616,17 @@ class RMBotApp:
         )
         self.hotkeys_status.pack(side="right", padx=20, pady=10)
     
-    def create_cura_tab(self):
+    def create_cura_tab(self, parent):
         """Criar aba de sistema de cura automática"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="💊 Sistema de Cura Automática",
             font=ctk.CTkFont(size=24, weight="bold")
         )
         header.pack(pady=20)
         
         description = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Configure skills de cura e targets para manter seu Pokémon saudável",
             font=ctk.CTkFont(size=14),
             text_color="gray"
@@ -1416,7 +4634,7 @@ class RMBotApp:
         description.pack(pady=10)
         
         # Frame principal scrollável
-        main_scroll = ctk.CTkScrollableFrame(self.main_frame)
+        main_scroll = ctk.CTkScrollableFrame(parent)
         main_scroll.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Seção 1: Configuração de Targets
@@ -1586,23 +4804,29 @@ class RMBotApp:
         heal_log = ctk.CTkTextbox(log_frame, height=100)
         heal_log.pack(fill="x", padx=10, pady=10)
         heal_log.insert("end", "Sistema de cura inicializado. Configure targets e skills para começar.\n")
+        self.log_sink.attach("cura", heal_log)
         
         # Armazenar referências importantes
         self.heal_log = heal_log
         self.targets_status = targets_status
         self.cura_status = cura_status
+        
+        # Publicar skills de cura para o worker
+        self.bind_config('heal_skills',
+                         list(self.heal_skill_vars.values()) + list(self.heal_skill_speed_vars.values()),
+                         lambda: self.read_skill_intervals(self.heal_skill_vars, self.heal_skill_speed_vars))
     
-    def create_auto_battle_tab(self):
+    def create_auto_battle_tab(self, parent):
         """Criar aba Auto Battle - Sistema inteligente inspirado no repositório bot-otpokemon"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="🤖 Sistema Auto Battle Inteligente",
             font=ctk.CTkFont(size=24, weight="bold")
         )
         header.pack(pady=20)
         
         description = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Sistema que detecta automaticamente se está em batalha ou pescando e executa as ações apropriadas",
             font=ctk.CTkFont(size=14),
             text_color="gray"
@@ -1610,7 +4834,7 @@ class RMBotApp:
         description.pack(pady=10)
         
         # Frame principal scrollável
-        main_scroll = ctk.CTkScrollableFrame(self.main_frame)
+        main_scroll = ctk.CTkScrollableFrame(parent)
         main_scroll.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Seção 1: Configuração de Detecção Visual
@@ -1823,6 +5047,7 @@ class RMBotApp:
         self.auto_battle_log = ctk.CTkTextbox(log_frame, height=120)
         self.auto_battle_log.pack(fill="x", padx=10, pady=10)
         self.auto_battle_log.insert("end", "Sistema Auto Battle inicializado.\nConfiguração baseada no repositório bot-otpokemon.\nDetecção inteligente: Batalha → usar skills / Fora de batalha → pescar.\n")
+        self.log_sink.attach("auto_battle", self.auto_battle_log)
         
         # Inicializar variáveis do Auto Battle
         self.auto_battle_active = False
@@ -1856,8 +5081,38 @@ class RMBotApp:
             'stop_cura': self.toggle_healing,
             'emergency_stop': self.emergency_stop_all
         }
+        
+        # Publicar configuração para os workers
+        if self.config_store.get('battle_image'):
+            self.battle_img_entry.insert(0, self.config_store.get('battle_image'))
+        self.battle_img_entry.bind("<KeyRelease>", self.publish_battle_image)
+        self.battle_img_entry.bind("<FocusOut>", self.publish_battle_image)
+        self.bind_config('confidence', [self.confidence_var], lambda: float(self.confidence_var.get()))
+        self.bind_config('battle_skills', self.battle_skill_vars.values(),
+                         lambda: tuple(key for key, var in self.battle_skill_vars.items() if var.get()))
+        self.bind_config('fishing_hotkey', [self.fishing_hotkey_var], lambda: self.fishing_hotkey_var.get().strip())
+        self.bind_config('wait_time', [self.wait_time_var], lambda: float(self.wait_time_var.get()))
 
     
+    def bind_config(self, key, variables, read):
+        """Publicar read() no ConfigStore sempre que uma das variáveis Tk mudar (thread da UI)"""
+        def publish(*_):
+            try:
+                self.config_store.publish(**{key: read()})
+            except (ValueError, tk.TclError):
+                pass  # Valor inválido durante a edição - manter o último válido
+        
+        for var in variables:
+            binding = (key, str(var))
+            if binding not in self.config_bindings:
+                self.config_bindings.add(binding)
+                var.trace_add("write", publish)
+        publish()
+    
+    def publish_battle_image(self, event=None):
+        """Publicar caminho da imagem de batalha digitado"""
+        self.config_store.publish(battle_image=self.battle_img_entry.get().strip())
+    
     def browse_battle_image(self):
         """Procurar imagem de batalha"""
         from tkinter import filedialog
@@ -1868,6 +5123,7 @@ class RMBotApp:
         if filename:
             self.battle_img_entry.delete(0, 'end')
             self.battle_img_entry.insert(0, filename)
+            self.publish_battle_image()
     
     def toggle_auto_battle(self):
         """Alternar sistema Auto Battle"""
@@ -1886,8 +5142,7 @@ class RMBotApp:
         self.auto_battle_thread = threading.Thread(target=self.auto_battle_loop, daemon=True)
         self.auto_battle_thread.start()
         
-        self.auto_battle_log.insert("end", f"[{datetime.now().strftime('%H:%M:%S')}] Auto Battle iniciado!\n")
-        self.auto_battle_log.see("end")
+        self.log_sink.emit("auto_battle", f"[{datetime.now().strftime('%H:%M:%S')}] Auto Battle iniciado!")
     
     def stop_auto_battle(self):
         """Parar Auto Battle"""
@@ -1895,64 +5150,116 @@ class RMBotApp:
         self.auto_battle_btn.configure(text="▶️ Iniciar Auto Battle", fg_color="#FF6B35", hover_color="#E55A2B")
         self.auto_battle_status.configure(text="❌ Auto Battle Inativo", text_color="red")
         
-        self.auto_battle_log.insert("end", f"[{datetime.now().strftime('%H:%M:%S')}] Auto Battle parado.\n")
-        self.auto_battle_log.see("end")
+        self.log_sink.emit("auto_battle", f"[{datetime.now().strftime('%H:%M:%S')}] Auto Battle parado.")
+        matcher = self.battle_matcher
+        self.log_sink.emit(
+            "auto_battle",
+            f"🎯 Busca local: {matcher.local_hits} acertos / {matcher.local_misses} erros "
+            f"({matcher.hit_ratio():.0%}) - {matcher.full_searches} buscas completas"
+        )
+    
+    def check_license(self, flag, channel):
+        """Licença do usuário logado ainda válida (cache - barato para os loops).
+        
+        Quando a licença expira, agenda na thread da UI a mesma parada do botão
+        (stop_for_license) e avisa no log uma única vez.
+        """
+        user = self.current_user
+        if user is None or user['is_admin'] or self.db.is_entitled(user['id']):
+            return True
+        if getattr(self, flag, False) and flag not in self.license_stops:
+            self.license_stops.add(flag)
+            self.log_sink.emit(channel, "⛔ Licença expirada - automação interrompida", "error")
+            self.root.after(0, self.stop_for_license, flag)
+        return False
+    
+    def stop_for_license(self, flag):
+        """Parar pela UI a automação de flag (chamado via root.after pelos workers)"""
+        self.license_stops.discard(flag)
+        if not getattr(self, flag, False):
+            return
+        handlers = {
+            'auto_battle_active': self.stop_auto_battle,
+            'cura_active': self.toggle_healing,
+            'fishing_active': self.toggle_fishing,
+            'skills_active': self.toggle_skills,
+        }
+        try:
+            handlers[flag]()
+        except tk.TclError:
+            # Aba já destruída - só desliga o loop
+            setattr(self, flag, False)
     
     def auto_battle_loop(self):
         """Loop principal do Auto Battle - inspirado no repositório bot-otpokemon"""
-        import cv2
-        import numpy as np
         from datetime import datetime
         
-        while self.auto_battle_active:
-            try:
-                # Verificar se está em batalha usando detecção de imagem
-                in_battle = self.detect_battle()
-                
-                if in_battle:
-                    # Está em batalha - usar skills
-                    self.execute_battle_skills()
-                    self.auto_battle_log.insert("end", f"[{datetime.now().strftime('%H:%M:%S')}] Em batalha - usando skills\n")
-                else:
-                    # Fora de batalha - pescar
-                    self.execute_fishing_action()
-                    self.auto_battle_log.insert("end", f"[{datetime.now().strftime('%H:%M:%S')}] Fora de batalha - pescando\n")
-                
-                self.auto_battle_log.see("end")
-                time.sleep(0.5)  # Pequena pausa para não sobrecarregar
-                
-            except Exception as e:
-                self.auto_battle_log.insert("end", f"[{datetime.now().strftime('%H:%M:%S')}] Erro: {str(e)}\n")
-                self.auto_battle_log.see("end")
-                time.sleep(1)
+        # Consumir frames do barramento compartilhado
+        self.frame_bus.subscribe('auto_battle')
+        profiler.bind("auto_battle")
+        self.counters.loop_started("auto_battle")
+        was_in_battle = False
+        
+        try:
+            while self.auto_battle_active and self.check_license('auto_battle_active', "auto_battle"):
+                try:
+                    tick_start = profiler.clock()
+                    
+                    # Verificar se está em batalha usando detecção de imagem
+                    in_battle = self.detect_battle()
+                    if in_battle and not was_in_battle:
+                        self.counters.increment("battles")
+                    was_in_battle = in_battle
+                    
+                    start = profiler.clock()
+                    if in_battle:
+                        # Está em batalha - usar skills
+                        self.execute_battle_skills()
+                        self.log_sink.emit("auto_battle", f"[{datetime.now().strftime('%H:%M:%S')}] Em batalha - usando skills")
+                    else:
+                        # Fora de batalha - pescar
+                        self.execute_fishing_action()
+                        self.log_sink.emit("auto_battle", f"[{datetime.now().strftime('%H:%M:%S')}] Fora de batalha - pescando")
+                    start = profiler.lap("input", start)
+                    profiler.lap("tick", tick_start)
+                    
+                    time.sleep(0.5)  # Pequena pausa para não sobrecarregar
+                    profiler.lap("sleep", start)
+                    
+                except Exception as e:
+                    self.counters.increment("errors")
+                    self.log_sink.emit("auto_battle", f"[{datetime.now().strftime('%H:%M:%S')}] Erro: {str(e)}", "error")
+                    time.sleep(1)
+        finally:
+            self.counters.loop_stopped("auto_battle")
+            self.frame_bus.unsubscribe('auto_battle')
+        
+        self.log_sink.emit("auto_battle", profiler.report("auto_battle"))
     
     def detect_battle(self):
         """Detectar se está em batalha usando OpenCV"""
         try:
-            import cv2
-            import numpy as np
-            
-            battle_img_path = self.battle_img_entry.get().strip()
-            if not battle_img_path or not os.path.exists(battle_img_path):
+            config = self.config_store.snapshot().values
+            battle_img_path = config['battle_image']
+            if not battle_img_path:
                 return False
             
-            # Capturar screenshot da tela
-            screenshot = pyautogui.screenshot()
-            screenshot_np = np.array(screenshot)
-            screenshot_cv = cv2.cvtColor(screenshot_np, cv2.COLOR_RGB2BGR)
-            
-            # Carregar imagem de referência
-            template = cv2.imread(battle_img_path)
+            # Imagem de referência do cache (decodificada uma vez)
+            template = self.template_cache.get(battle_img_path)
             if template is None:
                 return False
             
-            # Fazer template matching
-            result = cv2.matchTemplate(screenshot_cv, template, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, _ = cv2.minMaxLoc(result)
+            # Frame mais recente do barramento (já em BGR)
+            start = profiler.clock()
+            screenshot_cv = self.frame_bus.latest_frame().image
+            start = profiler.lap("capture", start)
             
-            # Usar nível de confiança configurado
-            confidence_threshold = float(self.confidence_var.get())
-            return max_val >= confidence_threshold
+            # Template matching - janela local primeiro, frame inteiro se errar
+            confidence_threshold = config['confidence']
+            found, _, _ = self.battle_matcher.match(screenshot_cv, template, confidence_threshold)
+            profiler.lap("match", start)
+            self.record_event("battle_check", found=bool(found))
+            return found
             
         except Exception as e:
             print(f"Erro na detecção de batalha: {e}")
@@ -1961,26 +5268,30 @@ class RMBotApp:
     def execute_battle_skills(self):
         """Executar skills de batalha"""
         try:
-            for skill_key, skill_var in self.battle_skill_vars.items():
-                if skill_var.get():  # Se skill está marcada
-                    pyautogui.press(skill_key)
-                    time.sleep(0.1)  # Pequena pausa entre skills
+            # Rajada em lote: só a pausa 'gap' entre skills e uma pausa ao final
+            with self.input_backend.batch():
+                for index, skill_key in enumerate(self.config_store.get('battle_skills', ())):
+                    if index:
+                        self.input_backend.wait()
+                    self.input_backend.press(skill_key)
+                    self.counters.increment("skills")
         except Exception as e:
             print(f"Erro ao executar skills de batalha: {e}")
     
     def execute_fishing_action(self):
         """Executar ação de pesca"""
         try:
-            fishing_hotkey = self.fishing_hotkey_var.get().strip()
-            wait_time = float(self.wait_time_var.get())
+            config = self.config_store.snapshot().values
+            fishing_hotkey = config['fishing_hotkey']
+            wait_time = config['wait_time']
             
             if fishing_hotkey:
                 # Pressionar hotkey de pesca
                 if "+" in fishing_hotkey:
                     keys = fishing_hotkey.split("+")
-                    pyautogui.hotkey(*keys)
+                    self.input_backend.hotkey(*keys)
                 else:
-                    pyautogui.press(fishing_hotkey)
+                    self.input_backend.press(fishing_hotkey)
                 
                 time.sleep(wait_time)
         except Exception as e:
@@ -2108,9 +5419,7 @@ class RMBotApp:
                         text=f"✅ {count} targets configurados",
                         text_color="green"
                     )
-                if hasattr(self, 'heal_log'):
-                    self.heal_log.insert("end", f"✅ {count} targets configurados manualmente\n")
-                    self.heal_log.see("end")
+                self.log_sink.emit("cura", f"✅ {count} targets configurados manualmente")
             else:
                 if hasattr(self, 'targets_status'):
                     self.targets_status.configure(
@@ -2129,7 +5438,7 @@ class RMBotApp:
             text="❌ Nenhum target configurado - Use 'Marcar Targets' para configurar",
             text_color="red"
         )
-        self.heal_log.insert("end", "🗑️ Todos os targets foram removidos\n")
+        self.log_sink.emit("cura", "🗑️ Todos os targets foram removidos")
     
     def load_targets(self):
         """Carregar targets de arquivo"""
@@ -2142,7 +5451,7 @@ class RMBotApp:
                     text=f"✅ {count} targets carregados",
                     text_color="green"
                 )
-                self.heal_log.insert("end", f"📂 {count} targets carregados do arquivo\n")
+                self.log_sink.emit("cura", f"📂 {count} targets carregados do arquivo")
             else:
                 messagebox.showinfo("Info", "Nenhum arquivo de targets encontrado")
         except:
@@ -2165,7 +5474,7 @@ class RMBotApp:
                 text="❌ Sistema Inativo",
                 text_color="red"
             )
-            self.heal_log.insert("end", "⏹️ Sistema de cura parado\n")
+            self.log_sink.emit("cura", "⏹️ Sistema de cura parado")
         else:
             # Verificar se há targets
             if not self.target_points:
@@ -2183,7 +5492,7 @@ class RMBotApp:
                 text="✅ Sistema Ativo",
                 text_color="green"
             )
-            self.heal_log.insert("end", "▶️ Sistema de cura iniciado\n")
+            self.log_sink.emit("cura", "▶️ Sistema de cura iniciado")
             
             # Iniciar thread de cura
             if AUTOMATION_AVAILABLE:
@@ -2192,58 +5501,74 @@ class RMBotApp:
                 self.healing_thread.start()
     
     def healing_loop(self):
-        """Loop principal do sistema de cura"""
+        """Loop principal do sistema de cura - cada skill no seu próprio intervalo"""
         import time
         
-        while self.cura_active:
+        scheduler = CooldownScheduler()
+        profiler.bind("cura")
+        self.counters.loop_started("cura")
+        while self.cura_active and self.check_license('cura_active', "cura"):
             try:
-                # Verificar skills ativas
-                active_skills = []
-                for key, var in self.heal_skill_vars.items():
-                    if var.get():
-                        interval = int(self.heal_skill_speed_vars[key].get())
-                        active_skills.append((key, interval))
-                
-                if active_skills:
-                    # Executar skills
-                    for skill_key, interval in active_skills:
-                        if not self.cura_active:
-                            break
-                            
-                        # Selecionar target aleatório
-                        if self.target_points:
-                            import random
-                            target = random.choice(self.target_points)
-                            
-                            # Clicar no target
-                            pyautogui.click(target[0], target[1])
-                            time.sleep(0.1)
-                            
-                            # Usar skill
-                            skill_number = skill_key.replace('f', '')
-                            pyautogui.press(f'f{skill_number}')
-                            
-                            self.heal_log.insert("end", f"💊 Skill F{skill_number} usada\n")
-                            time.sleep(interval / 1000.0)
-                
-                time.sleep(0.5)
-                
+                scheduler.run(lambda: self.cura_active and self.check_license('cura_active', "cura"),
+                              self.refresh_heal_schedule, refresh_interval=0.1)
             except Exception as e:
                 if self.cura_active:
-                    self.heal_log.insert("end", f"❌ Erro: {str(e)}\n")
+                    self.counters.increment("errors")
+                    self.log_sink.emit("cura", f"❌ Erro: {str(e)}", "error")
                 time.sleep(1)
+        
+        self.counters.loop_stopped("cura")
+        self.log_sink.emit("cura", scheduler.drift_report())
+        self.log_sink.emit("cura", profiler.report("cura"))
+    
+    def refresh_heal_schedule(self, scheduler):
+        """Sincronizar agendador com as skills de cura do snapshot de configuração"""
+        config = self.config_store.snapshot()
+        if scheduler.config_version != config.version:
+            scheduler.config_version = config.version
+            scheduler.sync(config.values['heal_skills'], lambda key: lambda: self.use_heal_skill(key))
+    
+    def read_skill_intervals(self, skill_vars, speed_vars):
+        """Ler skills marcadas e seus intervalos (ms) em segundos"""
+        intervals = {}
+        for key, var in skill_vars.items():
+            if var.get():
+                try:
+                    intervals[key] = int(speed_vars[key].get()) / 1000.0
+                except ValueError:
+                    pass
+        return intervals
+    
+    def use_heal_skill(self, skill_key):
+        """Clicar num target aleatório e usar a skill de cura"""
+        import random
+        
+        if not self.cura_active or not self.target_points:
+            return
+        
+        target = random.choice(self.target_points)
+        
+        # Clicar no target e usar skill
+        skill_number = skill_key.replace('f', '')
+        with profiler.span("input"):
+            self.input_backend.click(target[0], target[1])
+            self.input_backend.wait()
+            self.input_backend.press(f'f{skill_number}')
+        self.counters.increment("heals")
+        
+        self.log_sink.emit("cura", f"💊 Skill F{skill_number} usada")
     
-    def create_fishing_tab(self):
+    def create_fishing_tab(self, parent):
         """Criar aba de pesca básica"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="🎣 Sistema de Pesca Automática",
             font=ctk.CTkFont(size=24, weight="bold")
         )
         header.pack(pady=20)
         
         info = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Configure e inicie a pesca automática no Poke Old",
             font=ctk.CTkFont(size=14),
             text_color="gray"
@@ -2251,7 +5576,7 @@ class RMBotApp:
         info.pack(pady=10)
         
         # Frame principal scrollável
-        main_scroll = ctk.CTkScrollableFrame(self.main_frame)
+        main_scroll = ctk.CTkScrollableFrame(parent)
         main_scroll.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Seção 1: Configuração da Pesca
@@ -2389,6 +5714,7 @@ class RMBotApp:
         self.fishing_log = ctk.CTkTextbox(log_frame, height=100)
         self.fishing_log.pack(fill="x", padx=10, pady=10)
         self.fishing_log.insert("end", "Sistema de pesca inicializado. Configure antes de iniciar.\n")
+        self.log_sink.attach("fishing", self.fishing_log)
         
         if not AUTOMATION_AVAILABLE:
             warning_frame = ctk.CTkFrame(main_scroll)
@@ -2450,11 +5776,12 @@ class RMBotApp:
                 
                 if 0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255:
                     self.water_color = (r, g, b)
+                    self.bite_detector.reset()
                     self.fishing_config_status.configure(
                         text=f"✅ Cor da água configurada: RGB({r},{g},{b})",
                         text_color="green"
                     )
-                    self.fishing_log.insert("end", f"💧 Cor da água configurada: RGB({r},{g},{b})\n")
+                    self.log_sink.emit("fishing", f"💧 Cor da água configurada: RGB({r},{g},{b})")
                     dialog.destroy()
                 else:
                     messagebox.showerror("Erro", "Valores RGB devem estar entre 0 e 255")
@@ -2534,7 +5861,7 @@ class RMBotApp:
                     text=f"✅ {count} pontos de pesca configurados",
                     text_color="green"
                 )
-                self.fishing_log.insert("end", f"📍 {count} pontos de pesca configurados\n")
+                self.log_sink.emit("fishing", f"📍 {count} pontos de pesca configurados")
             dialog.destroy()
         
         ctk.CTkButton(buttons_frame, text="Limpar", command=clear_all).pack(side="left", padx=5)
@@ -2544,11 +5871,12 @@ class RMBotApp:
         """Limpar pontos de pesca"""
         self.fishing_points = []
         self.water_color = None
+        self.bite_detector.reset()
         self.fishing_config_status.configure(
             text="❌ Configure cor da água e pontos de pesca",
             text_color="red"
         )
-        self.fishing_log.insert("end", "🗑️ Configurações de pesca limpas\n")
+        self.log_sink.emit("fishing", "🗑️ Configurações de pesca limpas")
     
     def toggle_fishing(self):
         """Alternar sistema de pesca"""
@@ -2567,7 +5895,7 @@ class RMBotApp:
                 text="❌ Pesca Inativa",
                 text_color="red"
             )
-            self.fishing_log.insert("end", "⏹️ Pesca parada\n")
+            self.log_sink.emit("fishing", "⏹️ Pesca parada")
         else:
             # Verificar configurações
             if not self.water_color or not self.fishing_points:
@@ -2585,7 +5913,7 @@ class RMBotApp:
                 text="✅ Pesca Ativa",
                 text_color="green"
             )
-            self.fishing_log.insert("end", "▶️ Pesca iniciada\n")
+            self.log_sink.emit("fishing", "▶️ Pesca iniciada")
             
             # Iniciar thread de pesca
             if AUTOMATION_AVAILABLE:
@@ -2598,86 +5926,140 @@ class RMBotApp:
         import time
         import random
         
-        while self.fishing_active:
+        probe = None
+        profiler.bind("fishing")
+        self.counters.loop_started("fishing")
+        
+        while self.fishing_active and self.check_license('fishing_active', "fishing"):
             try:
                 if self.fishing_points:
+                    # Sonda esparsa sobre os pontos configurados
+                    if (probe is None or probe.source is not self.frame_source
+                            or not probe.has_points(self.fishing_points)):
+                        probe = PixelProbe(self.frame_source, self.fishing_points, radius=1)
+                        self.bite_detector.reset()
+                    
                     # Escolher ponto aleatório
-                    point = random.choice(self.fishing_points)
+                    point_index = random.randrange(len(self.fishing_points))
+                    point = self.fishing_points[point_index]
                     
                     # Clicar no ponto
-                    pyautogui.click(point[0], point[1])
+                    start = profiler.clock()
+                    self.input_backend.click(point[0], point[1])
                     
                     # Manter espaço pressionado
-                    pyautogui.keyDown('space')
-                    self.fishing_log.insert("end", f"🎣 Pescando no ponto ({point[0]}, {point[1]})\n")
+                    self.input_backend.key_down('space')
+                    profiler.lap("input", start)
+                    self.counters.increment("casts")
+                    self.log_sink.emit("fishing", f"🎣 Pescando no ponto ({point[0]}, {point[1]})")
                     
-                    # Aguardar peixe (verificar mudança de cor)
-                    start_time = time.time()
-                    while self.fishing_active and (time.time() - start_time) < 10:
+                    # Aguardar peixe (verificar mudança de cor contra a baseline do ponto)
+                    self.bite_detector.start_cast(point_index, self.water_color)
+                    self.record_event(
+                        "cast", point=point_index, xy=[int(point[0]), int(point[1])], radius=probe.radius,
+                        water_color=[int(c) for c in self.water_color] if self.water_color else None
+                    )
+                    start_time = time.monotonic()
+                    elapsed = 0.0
+                    last_sample = start_time  # Instante da última amostra entregue ao detector
+                    sample_error = False  # Conta/registra no máximo um erro por lançamento
+                    while self.fishing_active and elapsed < 10:
+                        tick_start = start = profiler.clock()
                         try:
-                            # Verificar cor atual
-                            screenshot = pyautogui.screenshot()
-                            current_color = screenshot.getpixel(point)
+                            # Verificar cor atual - reaproveita o frame do barramento só se for
+                            # mais novo que a última amostra (o detector exige amostras
+                            # distintas) e cobrir o ponto; senão captura apenas o patch do ponto
+                            frame = self.frame_bus.peek()
+                            if (frame is not None and frame.timestamp > last_sample
+                                    and probe.covers([point_index], frame.image.shape, frame.origin)):
+                                colors = probe.sample([point_index], frame.image, frame.origin)
+                                last_sample = frame.timestamp
+                            else:
+                                colors = probe.sample([point_index])
+                                last_sample = time.monotonic()
+                            start = profiler.lap("sample", start)
                             
-                            # Se cor mudou, soltar espaço e clicar
-                            if current_color != self.water_color:
-                                pyautogui.keyUp('space')
-                                time.sleep(0.1)
-                                pyautogui.click(point[0], point[1])
-                                self.fishing_log.insert("end", "🐟 Peixe capturado!\n")
+                            # Se a mudança se confirmou, soltar espaço e clicar
+                            bitten = self.bite_detector.update(point_index, colors[0])
+                            start = profiler.lap("detect", start)
+                            if bitten:
+                                self.counters.increment("bites")
+                                self.record_event("bite", point=point_index, elapsed=round(elapsed, 4))
+                                self.bite_detector.record_bite(elapsed)
+                                self.input_backend.key_up('space')
+                                self.input_backend.wait()
+                                self.input_backend.click(point[0], point[1])
+                                profiler.lap("input", start)
+                                self.counters.increment("catches")
+                                self.log_sink.emit("fishing", "🐟 Peixe capturado!")
                                 time.sleep(2)
                                 break
                                 
-                        except:
-                            pass
+                        except Exception as e:
+                            if not sample_error:
+                                sample_error = True
+                                self.counters.increment("errors")
+                                self.log_sink.emit("fishing", f"⚠️ Falha ao amostrar o ponto: {str(e)}", "error")
+                        start = profiler.lap("tick", tick_start)
                         
-                        time.sleep(0.1)
+                        # Amostragem adaptativa - acelera na janela esperada da mordida
+                        time.sleep(self.bite_detector.next_interval(elapsed))
+                        profiler.lap("sleep", start)
+                        elapsed = time.monotonic() - start_time
                     
                     # Soltar espaço se ainda pressionado
-                    pyautogui.keyUp('space')
+                    self.input_backend.key_up('space')
                     time.sleep(0.5)
                 
             except Exception as e:
                 if self.fishing_active:
-                    self.fishing_log.insert("end", f"❌ Erro na pesca: {str(e)}\n")
+                    self.counters.increment("errors")
+                    self.log_sink.emit("fishing", f"❌ Erro na pesca: {str(e)}", "error")
                 time.sleep(1)
+        
+        self.counters.loop_stopped("fishing")
+        self.log_sink.emit("fishing", profiler.report("fishing"))
     
     def skills_automation_loop(self):
-        """Loop de automação para skills"""
+        """Loop de automação para skills - cada skill no seu próprio intervalo"""
         import time
         
-        while self.skills_active:
+        scheduler = CooldownScheduler()
+        profiler.bind("skills")
+        self.counters.loop_started("skills")
+        while self.skills_active and self.check_license('skills_active', "skills"):
             try:
-                # Verificar skills ativas
-                active_skills = []
-                for key, var in self.skill_vars.items():
-                    if var.get():
-                        interval = int(self.skill_speed_vars[key].get())
-                        active_skills.append((key, interval))
-                
-                if active_skills:
-                    # Executar skills em sequência
-                    for skill_key, interval in active_skills:
-                        if not self.skills_active:
-                            break
-                            
-                        # Usar skill
-                        skill_number = skill_key.replace('f', '')
-                        if AUTOMATION_AVAILABLE:
-                            pyautogui.press(f'f{skill_number}')
-                            
-                        # Log da skill
-                        if hasattr(self, 'skills_log'):
-                            self.skills_log.insert("end", f"⚔️ Skill F{skill_number} executada\n")
-                        
-                        time.sleep(interval / 1000.0)
-                
-                time.sleep(0.1)
-                
+                scheduler.run(lambda: self.skills_active and self.check_license('skills_active', "skills"),
+                              self.refresh_skills_schedule, refresh_interval=0.1)
             except Exception as e:
-                if self.skills_active and hasattr(self, 'skills_log'):
-                    self.skills_log.insert("end", f"❌ Erro: {str(e)}\n")
+                if self.skills_active:
+                    self.counters.increment("errors")
+                    self.log_sink.emit("skills", f"❌ Erro: {str(e)}", "error")
                 time.sleep(1)
+        
+        self.counters.loop_stopped("skills")
+        self.log_sink.emit("skills", scheduler.drift_report())
+        self.log_sink.emit("skills", profiler.report("skills"))
+    
+    def refresh_skills_schedule(self, scheduler):
+        """Sincronizar agendador com as skills do snapshot de configuração"""
+        config = self.config_store.snapshot()
+        if scheduler.config_version != config.version:
+            scheduler.config_version = config.version
+            scheduler.sync(config.values['skills'], lambda key: lambda: self.use_skill(key))
+    
+    def use_skill(self, skill_key):
+        """Usar skill automática"""
+        if not self.skills_active:
+            return
+        
+        skill_number = skill_key.replace('f', '')
+        with profiler.span("input"):
+            self.input_backend.press(f'f{skill_number}')
+        self.counters.increment("skills")
+        
+        # Log da skill
+        self.log_sink.emit("skills", f"⚔️ Skill F{skill_number} executada")
     
     def setup_hotkeys_system(self):
         """Configurar sistema de hotkeys globais"""
@@ -2709,17 +6091,17 @@ class RMBotApp:
         except:
             pass
     
-    def create_skills_tab(self):
+    def create_skills_tab(self, parent):
         """Criar aba de skills com configurações completas"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="⚔️ Sistema de Skills Automáticas",
             font=ctk.CTkFont(size=24, weight="bold")
         )
         header.pack(pady=20)
         
         description = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="Configure skills F1-F12 para execução automática com intervalos personalizados",
             font=ctk.CTkFont(size=14),
             text_color="gray"
@@ -2727,7 +6109,7 @@ class RMBotApp:
         description.pack(pady=10)
         
         # Frame principal scrollável
-        main_scroll = ctk.CTkScrollableFrame(self.main_frame)
+        main_scroll = ctk.CTkScrollableFrame(parent)
         main_scroll.pack(fill="both", expand=True, padx=20, pady=10)
         
         # Seção de Skills
@@ -2877,6 +6259,12 @@ class RMBotApp:
         self.skills_log = ctk.CTkTextbox(log_frame, height=100)
         self.skills_log.pack(fill="x", padx=10, pady=10)
         self.skills_log.insert("end", "Sistema de skills inicializado. Configure e ative as skills desejadas.\n")
+        self.log_sink.attach("skills", self.skills_log)
+        
+        # Publicar skills para o worker
+        self.bind_config('skills',
+                         list(self.skill_vars.values()) + list(self.skill_speed_vars.values()),
+                         lambda: self.read_skill_intervals(self.skill_vars, self.skill_speed_vars))
     
     def toggle_skills(self):
         """Alternar sistema de skills"""
@@ -2895,8 +6283,7 @@ class RMBotApp:
                 text="❌ Skills Inativas",
                 text_color="red"
             )
-            if hasattr(self, 'skills_log'):
-                self.skills_log.insert("end", f"⏹️ Sistema de skills parado\n")
+            self.log_sink.emit("skills", "⏹️ Sistema de skills parado")
         else:
             # Iniciar skills
             self.skills_active = True
@@ -2909,8 +6296,7 @@ class RMBotApp:
                 text="✅ Skills Ativas",
                 text_color="green"
             )
-            if hasattr(self, 'skills_log'):
-                self.skills_log.insert("end", f"▶️ Sistema de skills iniciado\n")
+            self.log_sink.emit("skills", "▶️ Sistema de skills iniciado")
             
             # Iniciar thread de automação de skills
             if AUTOMATION_AVAILABLE:
@@ -2918,50 +6304,142 @@ class RMBotApp:
                 self.skills_thread = threading.Thread(target=self.skills_automation_loop, daemon=True)
                 self.skills_thread.start()
     
-    def create_stats_tab(self):
+    def create_stats_tab(self, parent):
         """Criar aba de estatísticas básica"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="📊 Estatísticas do Bot",
             font=ctk.CTkFont(size=24, weight="bold")
         )
         header.pack(pady=20)
         
-        stats_frame = ctk.CTkFrame(self.main_frame)
+        stats_frame = ctk.CTkFrame(parent)
         stats_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
-        # Estatísticas básicas
+        # Contadores reais dos loops - atualizados por update_stats_labels
         stats_grid = ctk.CTkFrame(stats_frame)
         stats_grid.pack(fill="x", padx=20, pady=20)
         
-        stats_items = [
-            ("Peixes Pescados", "0"),
-            ("Skills Utilizadas", "0"),
-            ("Tempo de Uso", "0m"),
-            ("Status", "Inativo")
-        ]
+        stats_items = [(label, key) for label, key in self.STATS_COUNTERS]
+        stats_items += [("Tempo de Uso", "uptime"), ("Status", "status")]
         
-        for label, value in stats_items:
+        self.stat_labels = {}
+        self.stat_values = {}
+        for label, key in stats_items:
             stat_row = ctk.CTkFrame(stats_grid)
-            stat_row.pack(fill="x", padx=10, pady=5)
+            stat_row.pack(fill="x", padx=10, pady=2)
             
             ctk.CTkLabel(
                 stat_row,
                 text=f"{label}:",
                 font=ctk.CTkFont(size=14, weight="bold")
-            ).pack(side="left", padx=10, pady=10)
+            ).pack(side="left", padx=10, pady=6)
             
-            ctk.CTkLabel(
+            self.stat_labels[key] = ctk.CTkLabel(
                 stat_row,
-                text=value,
+                text="",
                 font=ctk.CTkFont(size=14),
                 text_color="cyan"
-            ).pack(side="right", padx=10, pady=10)
+            )
+            self.stat_labels[key].pack(side="right", padx=10, pady=6)
+        
+        if getattr(self, 'stats_refresh_job', None):
+            self.root.after_cancel(self.stats_refresh_job)
+        self.stats_refresh_job = None
+        self.update_stats_labels()
+        
+        # Latência por etapa dos loops de automação
+        latency_frame = ctk.CTkFrame(stats_frame)
+        latency_frame.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        
+        ctk.CTkLabel(
+            latency_frame,
+            text="⏱️ Latência por Etapa",
+            font=ctk.CTkFont(size=14, weight="bold")
+        ).pack(pady=5)
+        
+        self.latency_text = ctk.CTkTextbox(latency_frame, height=180, font=ctk.CTkFont(family="Consolas", size=12))
+        self.latency_text.pack(fill="both", expand=True, padx=10, pady=5)
+        
+        buttons_frame = ctk.CTkFrame(latency_frame, fg_color="transparent")
+        buttons_frame.pack(pady=5)
+        
+        ctk.CTkButton(
+            buttons_frame,
+            text="🔄 Atualizar",
+            command=self.refresh_latency_report,
+            width=120
+        ).pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            buttons_frame,
+            text="💾 Salvar Dump",
+            command=self.save_profile_dump,
+            width=120
+        ).pack(side="left", padx=5)
+        
+        ctk.CTkButton(
+            buttons_frame,
+            text="🗑️ Zerar",
+            command=lambda: (profiler.reset(), self.refresh_latency_report()),
+            width=120,
+            fg_color="gray"
+        ).pack(side="left", padx=5)
+        
+        self.refresh_latency_report()
+    
+    def stats_texts(self):
+        """Texto de cada linha da aba de estatísticas a partir dos contadores"""
+        counts, active, running = self.counters.snapshot()
+        texts = {}
+        for _, key in self.STATS_COUNTERS:
+            rate = BotCounters.per_hour(counts[key], active)
+            texts[key] = f"{counts[key]}  ({rate:.1f}/h)" if rate else str(counts[key])
+        
+        minutes, seconds = divmod(int(active), 60)
+        hours, minutes = divmod(minutes, 60)
+        texts['uptime'] = f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {seconds:02d}s"
+        texts['status'] = ("Ativo: " + ", ".join(self.LOOP_NAMES.get(name, name) for name in running)
+                           if running else "Inativo")
+        return texts
+    
+    def update_stats_labels(self):
+        """Timer da aba de estatísticas - reconfigura só os rótulos cujo texto mudou"""
+        labels = getattr(self, 'stat_labels', None)
+        if not labels or not next(iter(labels.values())).winfo_exists():
+            self.stats_refresh_job = None
+            return
+        
+        # Aba oculta (em cache): nada a desenhar, só manter o timer
+        if self.current_tab == "stats" or not self.stat_values:
+            for key, text in self.stats_texts().items():
+                if self.stat_values.get(key) != text:
+                    self.stat_values[key] = text
+                    labels[key].configure(text=text)
+        
+        self.stats_refresh_job = self.root.after(self.STATS_REFRESH_MS, self.update_stats_labels)
+    
+    def refresh_latency_report(self):
+        """Mostrar percentis por loop/etapa na aba de estatísticas"""
+        if not profiler.enabled:
+            report = "Instrumentação desligada (RM_BOT_PROFILE=0)."
+        else:
+            report = profiler.report() or "Nenhuma amostra ainda - inicie uma automação."
+        self.latency_text.delete("1.0", "end")
+        self.latency_text.insert("end", report)
     
-    def create_user_management_tab(self):
+    def save_profile_dump(self):
+        """Gravar histogramas em JSON"""
+        try:
+            path = profiler.dump(self.PROFILE_DUMP_PATH)
+            messagebox.showinfo("Sucesso", f"Histogramas salvos em {os.path.abspath(path)}")
+        except OSError as e:
+            messagebox.showerror("Erro", f"Erro ao salvar histogramas: {e}")
+    
+    def create_user_management_tab(self, parent):
         """Criar aba de gerenciamento de usuários (admin)"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="👥 Gerenciamento de Usuários",
             font=ctk.CTkFont(size=24, weight="bold")
         )
@@ -2969,7 +6447,7 @@ class RMBotApp:
         
         # Botão criar usuário
         create_user_btn = ctk.CTkButton(
-            self.main_frame,
+            parent,
             text="➕ Criar Novo Usuário",
             command=self.show_create_user_dialog,
             height=40,
@@ -2978,62 +6456,110 @@ class RMBotApp:
         )
         create_user_btn.pack(pady=10)
         
-        # Lista de usuários
-        users_frame = ctk.CTkScrollableFrame(self.main_frame)
-        users_frame.pack(fill="both", expand=True, padx=20, pady=20)
-        
-        users = self.db.get_all_users()
-        for user in users:
-            user_frame = ctk.CTkFrame(users_frame)
-            user_frame.pack(fill="x", padx=10, pady=5)
-            
-            # Info do usuário
-            user_info = f"👤 {user['username']}"
-            if user['is_admin']:
-                user_info += " (Admin)"
-            
-            if user['subscription']:
-                if user['subscription']['is_expired']:
-                    user_info += f" - ❌ Expirado"
-                else:
-                    user_info += f" - ✅ {user['subscription']['days_remaining']} dias"
+        # Filtros (busca e status) aplicados no banco
+        filters_frame = ctk.CTkFrame(parent)
+        filters_frame.pack(fill="x", padx=20, pady=(10, 0))
+        
+        self.user_search_entry = ctk.CTkEntry(filters_frame, placeholder_text="🔍 Buscar usuário", width=250)
+        self.user_search_entry.pack(side="left", padx=10, pady=10)
+        self.user_search_entry.bind("<KeyRelease>", self.schedule_user_search)
+        
+        self.user_status_var = ctk.StringVar(value="Todos")
+        status_combo = ctk.CTkComboBox(
+            filters_frame,
+            values=list(self.USER_STATUS_FILTERS),
+            variable=self.user_status_var,
+            command=lambda _: self.reload_user_list(),
+            width=160
+        )
+        status_combo.pack(side="left", padx=10, pady=10)
+        
+        # Lista de usuários (virtualizada, carregada por páginas)
+        self.user_list = VirtualList(
+            parent,
+            create_row=self.create_user_row,
+            render_row=self.render_user_row,
+            load_more=self.load_user_page
+        )
+        self.user_list.pack(fill="both", expand=True, padx=20, pady=20)
+        self.user_search_job = None
+        self.reload_user_list()
+    
+    def reload_user_list(self):
+        """Recarregar lista de usuários com os filtros atuais"""
+        self.user_search_job = None
+        if not self.user_list.winfo_exists():
+            return
+        self.user_list_filter = (
+            self.user_search_entry.get().strip() or None,
+            self.USER_STATUS_FILTERS.get(self.user_status_var.get())
+        )
+        self.user_list_cursor = None
+        self.user_list.reset()
+    
+    def schedule_user_search(self, event=None):
+        """Debounce da busca - consultar só após uma pausa na digitação"""
+        if self.user_search_job:
+            self.root.after_cancel(self.user_search_job)
+        self.user_search_job = self.root.after(300, self.reload_user_list)
+    
+    def load_user_page(self):
+        """Próxima página de usuários para a lista virtualizada"""
+        search, status = self.user_list_filter
+        users, self.user_list_cursor = self.db.list_users(
+            search=search, status=status, after=self.user_list_cursor, limit=100
+        )
+        return users, self.user_list_cursor is not None
+    
+    def format_user_info(self, user):
+        """Texto de uma linha da lista de usuários"""
+        user_info = f"👤 {user['username']}"
+        if user['is_admin']:
+            user_info += " (Admin)"
+        
+        if user['subscription']:
+            if user['subscription']['is_expired']:
+                user_info += " - ❌ Expirado"
             else:
-                user_info += " - ⏰ Sem licença"
-            
-            ctk.CTkLabel(user_frame, text=user_info, font=ctk.CTkFont(size=12)).pack(side="left", padx=10, pady=10)
-            
-            # Botões de ação
-            if not user['is_admin']:  # Não pode deletar admin
-                extend_btn = ctk.CTkButton(
-                    user_frame,
-                    text="Estender",
-                    width=80,
-                    height=30,
-                    command=lambda u=user: self.show_extend_license_dialog(u)
-                )
-                extend_btn.pack(side="right", padx=5, pady=10)
-                
-                delete_btn = ctk.CTkButton(
-                    user_frame,
-                    text="Deletar",
-                    width=80,
-                    height=30,
-                    fg_color="red",
-                    command=lambda u=user: self.confirm_delete_user(u)
-                )
-                delete_btn.pack(side="right", padx=5, pady=10)
+                user_info += f" - ✅ {user['subscription']['days_remaining']} dias"
+        else:
+            user_info += " - ⏰ Sem licença"
+        return user_info
     
-    def create_license_management_tab(self):
+    def create_user_row(self, row):
+        """Montar widgets reutilizáveis de uma linha de usuário"""
+        row.info_label = ctk.CTkLabel(row, text="", font=ctk.CTkFont(size=12))
+        row.info_label.pack(side="left", padx=10)
+        row.extend_btn = ctk.CTkButton(row, text="Estender", width=80, height=30)
+        row.delete_btn = ctk.CTkButton(row, text="Deletar", width=80, height=30, fg_color="red")
+    
+    def render_user_row(self, row, user):
+        """Preencher linha com os dados do usuário"""
+        row.info_label.configure(text=self.format_user_info(user))
+        
+        # Botões de ação
+        if user['is_admin']:  # Não pode deletar admin
+            row.extend_btn.pack_forget()
+            row.delete_btn.pack_forget()
+            return
+        
+        row.extend_btn.configure(command=lambda u=user: self.show_extend_license_dialog(u))
+        row.delete_btn.configure(command=lambda u=user: self.confirm_delete_user(u))
+        if not row.extend_btn.winfo_manager():
+            row.extend_btn.pack(side="right", padx=5)
+            row.delete_btn.pack(side="right", padx=5)
+    
+    def create_license_management_tab(self, parent):
         """Criar aba de gerenciamento de licenças"""
         header = ctk.CTkLabel(
-            self.main_frame,
+            parent,
             text="🎫 Gerenciamento de Licenças",
             font=ctk.CTkFont(size=24, weight="bold")
         )
         header.pack(pady=20)
         
         # Botões de ação em massa
-        mass_actions_frame = ctk.CTkFrame(self.main_frame)
+        mass_actions_frame = ctk.CTkFrame(parent)
         mass_actions_frame.pack(fill="x", padx=20, pady=10)
         
         extend_all_btn = ctk.CTkButton(
@@ -3057,15 +6583,11 @@ class RMBotApp:
         cleanup_btn.pack(side="left", padx=10, pady=10)
         
         # Estatísticas
-        stats_frame = ctk.CTkFrame(self.main_frame)
+        stats_frame = ctk.CTkFrame(parent)
         stats_frame.pack(fill="x", padx=20, pady=20)
         
-        users = self.db.get_all_users()
-        total_users = len(users)
-        active_users = len([u for u in users if u['subscription'] and not u['subscription']['is_expired']])
-        expired_users = len([u for u in users if u['subscription'] and u['subscription']['is_expired']])
-        
-        stats_text = f"📊 Total: {total_users} | ✅ Ativos: {active_users} | ❌ Expirados: {expired_users}"
+        stats = self.db.user_stats()
+        stats_text = f"📊 Total: {stats['total']} | ✅ Ativos: {stats['active']} | ❌ Expirados: {stats['expired']}"
         ctk.CTkLabel(stats_frame, text=stats_text, font=ctk.CTkFont(size=14)).pack(pady=20)
     
     def show_create_user_dialog(self):
@@ -3109,15 +6631,19 @@ class RMBotApp:
                 messagebox.showerror("Erro", "Preencha todos os campos!")
                 return
             
-            user_id = self.db.create_user(username, password)
-            if user_id:
-                if license_days > 0:
-                    self.db.extend_user_subscription(user_id, license_days)
-                messagebox.showinfo("Sucesso", f"Usuário '{username}' criado com {license_days} dias de licença!")
-                dialog.destroy()
-                self.switch_tab("users")  # Atualizar lista
-            else:
-                messagebox.showerror("Erro", "Usuário já existe!")
+            def on_created(user_id):
+                if user_id:
+                    if license_days > 0:
+                        self.db.extend_user_subscription(user_id, license_days)
+                    messagebox.showinfo("Sucesso", f"Usuário '{username}' criado com {license_days} dias de licença!")
+                    if dialog.winfo_exists():
+                        dialog.destroy()
+                    self.refresh_tab("users", "licenses")  # Atualizar lista
+                else:
+                    messagebox.showerror("Erro", "Usuário já existe!")
+            
+            # Hash bcrypt fora da thread da UI
+            self.auth.submit(self.root, self.auth.create_user, username, password, callback=on_created)
         
         create_btn = ctk.CTkButton(dialog, text="✅ Criar", command=create_user, width=200)
         create_btn.pack(pady=20)
@@ -3148,7 +6674,7 @@ class RMBotApp:
             self.db.extend_user_subscription(user['id'], days)
             messagebox.showinfo("Sucesso", f"Licença de {user['username']} estendida por {days} dias!")
             dialog.destroy()
-            self.switch_tab("users")
+            self.refresh_tab("users", "licenses")
         
         extend_btn = ctk.CTkButton(dialog, text="✅ Estender", command=extend_license, width=150)
         extend_btn.pack(pady=20)
@@ -3158,7 +6684,7 @@ class RMBotApp:
         if messagebox.askyesno("Confirmar", f"Deletar usuário '{user['username']}'?"):
             self.db.delete_user(user['id'])
             messagebox.showinfo("Sucesso", f"Usuário '{user['username']}' deletado!")
-            self.switch_tab("users")
+            self.refresh_tab("users", "licenses")
     
     def show_extend_all_dialog(self):
         """Mostrar diálogo para estender todas as licenças"""
@@ -3177,15 +6703,10 @@ class RMBotApp:
         
         def extend_all():
             days = int(days_var.get())
-            users = self.db.get_all_users()
-            count = 0
-            for user in users:
-                if not user['is_admin']:
-                    self.db.extend_user_subscription(user['id'], days)
-                    count += 1
+            count = self.db.extend_all_subscriptions(days)
             messagebox.showinfo("Sucesso", f"{count} licenças estendidas por {days} dias!")
             dialog.destroy()
-            self.switch_tab("licenses")
+            self.refresh_tab("users", "licenses")
         
         extend_btn = ctk.CTkButton(dialog, text="✅ Estender Todas", command=extend_all)
         extend_btn.pack(pady=20)
@@ -3193,23 +6714,92 @@ class RMBotApp:
     def cleanup_expired_users(self):
         """Limpar usuários com licenças expiradas"""
         if messagebox.askyesno("Confirmar", "Deletar todos os usuários com licenças expiradas?"):
-            users = self.db.get_all_users()
-            count = 0
-            for user in users:
-                if not user['is_admin'] and user['subscription'] and user['subscription']['is_expired']:
-                    self.db.delete_user(user['id'])
-                    count += 1
+            count = self.db.purge_expired()
             messagebox.showinfo("Sucesso", f"{count} usuários expirados deletados!")
-            self.switch_tab("licenses")
+            self.refresh_tab("users", "licenses")
     
     def refresh_processes(self):
-        """Atualizar lista de processos"""
-        # Implementação básica
-        messagebox.showinfo("Info", "Lista de processos atualizada!")
+        """Reenumerar janelas agora"""
+        self.window_index.refresh(force=True)
+        self.render_process_list()
+    
+    def update_process_list(self):
+        """Timer da aba de processo - reenumera pelo ttl do índice e redesenha só se mudou"""
+        frame = getattr(self, 'process_list_frame', None)
+        if frame is None or not frame.winfo_exists():
+            self.process_refresh_job = None
+            return
+        
+        if self.current_tab == "process" or self.process_list_version is None:
+            self.window_index.refresh()
+            self.render_process_list()
+        
+        self.process_refresh_job = self.root.after(self.PROCESS_REFRESH_MS, self.update_process_list)
+    
+    def render_process_list(self):
+        """Recriar linhas da lista de janelas (se o índice ou a seleção mudaram)"""
+        selected = self.game_window.info.hwnd if self.game_window else None
+        version = (self.window_index.version, selected)
+        
+        text = f"🎯 {self.game_window.describe()}" if self.game_window else "🖥️ Tela inteira (nenhuma janela vinculada)"
+        if self.selected_window_label.cget("text") != text:
+            self.selected_window_label.configure(text=text)
+        
+        if version == self.process_list_version:
+            return
+        self.process_list_version = version
+        
+        for child in self.process_list_frame.winfo_children():
+            child.destroy()
+        
+        windows = self.window_index.sorted_windows()
+        if not windows:
+            ctk.CTkLabel(self.process_list_frame, text="Nenhuma janela encontrada", text_color="gray").pack(pady=20)
+            return
+        
+        for window in windows:
+            proc_frame = ctk.CTkFrame(self.process_list_frame)
+            proc_frame.pack(fill="x", padx=10, pady=5)
+            
+            rect = self.window_index.client_rect(window.hwnd)
+            size = f"{rect[2]}x{rect[3]}" if rect else "minimizada"
+            title = window.title if len(window.title) <= 50 else window.title[:47] + "..."
+            
+            proc_info = ctk.CTkLabel(
+                proc_frame,
+                text=f"{window.process} (PID: {window.pid}) - {title} - {size}",
+                font=ctk.CTkFont(size=12)
+            )
+            proc_info.pack(side="left", padx=10, pady=10)
+            
+            is_selected = window.hwnd == selected
+            select_btn = ctk.CTkButton(
+                proc_frame,
+                text="✅ Vinculada" if is_selected else "Selecionar",
+                width=100,
+                height=30,
+                state="disabled" if is_selected else "normal",
+                command=lambda w=window: self.select_process(w)
+            )
+            select_btn.pack(side="right", padx=10, pady=10)
     
-    def select_process(self, process):
-        """Selecionar processo do jogo"""
-        messagebox.showinfo("Processo Selecionado", f"Processo selecionado: {process['name']}")
+    def select_process(self, window):
+        """Vincular captura e cliques à janela selecionada (None = tela inteira)"""
+        if window is not None:
+            game_window = GameWindow(self.window_index, window)
+            if game_window.rect() is None:
+                messagebox.showwarning("Aviso", "A janela está minimizada ou foi fechada - restaure-a e tente novamente")
+                return
+            try:
+                self.window_index.backend.focus(window.hwnd)
+            except Exception as e:
+                print(f"Não foi possível focar a janela: {e}")
+            self.game_window = game_window
+        else:
+            self.game_window = None
+        
+        self.configure_capture()
+        self.render_process_list()
     
     def capture_hotkey(self, config_key, entry):
         """Capturar uma tecla pressionada - modo simples para usuários"""
@@ -3351,21 +6941,8 @@ class RMBotApp:
         for widget in self.root.winfo_children():
             widget.destroy()
     
-    def on_closing(self):
-        """Manipular fechamento"""
-        self.root.quit()
-        self.root.destroy()
-    
-    def run(self):
-        """Executar aplicação"""
-        self.root.mainloop()
-
     def load_new_tab_direct(self, tab_name):
         """Carregar nova aba sem animação"""
-        # Limpar widgets atuais
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-        
         # Carregar conteúdo da aba
         self.load_tab_content(tab_name)
         
@@ -3396,24 +6973,44 @@ class RMBotApp:
         
         # Fechar janela
         self.root.destroy()
+        self.auth.shutdown()
+        self.db.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        
+        if profiler.histograms:
+            try:
+                profiler.dump(self.PROFILE_DUMP_PATH)
+            except OSError as e:
+                print(f"Erro ao salvar histogramas de latência: {e}")
+    
+    def report_startup(self):
+        """Registrar tela de login visível e imprimir relatório de inicialização"""
+        startup_timer.mark("primeiro frame")
+        print(startup_timer.report())
     
     def run(self):
         """Executar aplicação"""
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after_idle(self.report_startup)
         self.root.mainloop()
 
 def main():
     """Função principal"""
+    args = parse_args()
+    if args.benchmark:
+        sys.exit(run_benchmark_cli(args))
+    if args.replay:
+        sys.exit(run_replay_cli(args))
+    if args.record:
+        os.environ["RM_BOT_RECORD"] = args.record
+    if args.log_file:
+        os.environ["RM_BOT_LOG_FILE"] = args.log_file
+    
     print("🤖 RM Bot - Automação para Poke Old")
     print("Versão Desktop v2.0 - Com Animações de Transição")
     print("-" * 40)
     
-    if not AUTOMATION_AVAILABLE:
-        print("AVISO: Funcionalidades de automação limitadas")
-        print("Para habilitar automação completa, instale:")
-        print("pip install pyautogui opencv-python psutil")
-        print("-" * 40)
-    
     try:
         app = RMBotApp()
         app.run()
@@ -0,0 +1,24 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def bot():
+    """Módulo do bot importado sem abrir a interface"""
+    pytest.importorskip("customtkinter")
+    pytest.importorskip("bcrypt")
+    return importlib.import_module("rm_bot_standalone_1749604376723")
+
+
+@pytest.fixture
+def db(bot, tmp_path, monkeypatch):
+    """Banco novo em tmp_path com bcrypt barato"""
+    monkeypatch.setenv("RM_BOT_BCRYPT_ROUNDS", "4")
+    manager = bot.DatabaseManager(str(tmp_path / "rm_bot.db"))
+    yield manager
+    manager.close()
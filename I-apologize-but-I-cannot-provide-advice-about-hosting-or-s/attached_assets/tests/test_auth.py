@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture
+def auth(bot, db):
+    service = bot.AuthService(db, rounds=4)
+    yield service
+    service.shutdown()
+
+
+def test_authenticate_checks_password(auth):
+    assert auth.create_user("ash", "pikachu") is not None
+    
+    user = auth.authenticate("ash", "pikachu")
+    assert user['username'] == "ash" and not user['is_admin']
+    assert auth.authenticate("ash", "wrong") is None
+    assert auth.authenticate("nobody", "pikachu") is None
+
+
+def test_default_admin_can_log_in(auth):
+    assert auth.authenticate("admin", "admin123")['is_admin']
+
+
+def test_login_rehashes_with_configured_cost(bot, auth, db):
+    old_hash = bot.hash_password("pikachu", rounds=5)
+    db.create_user("ash", password_hash=old_hash)
+    assert auth.needs_rehash(old_hash)
+    
+    assert auth.authenticate("ash", "pikachu") is not None
+    
+    new_hash = db.get_credentials("ash")[1]
+    assert new_hash != old_hash
+    assert auth.cost_of(new_hash) == 4
+    assert auth.authenticate("ash", "pikachu") is not None
+
+
+def test_default_admin_is_created_on_the_worker(bot, tmp_path):
+    db = bot.DatabaseManager(str(tmp_path / "novo.db"), create_admin=False)
+    auth = bot.AuthService(db, rounds=4)
+    try:
+        assert db.get_credentials("admin") is None
+        
+        auth.start_setup()
+        # authenticate espera a criação do admin antes de consultar o banco
+        assert auth.authenticate("admin", "admin123")['is_admin']
+        assert auth.setup.result() is True
+        assert db.ensure_default_admin() is False
+    finally:
+        auth.shutdown()
+        db.close()
+
+
+def test_cost_of_malformed_hash(auth):
+    assert auth.cost_of("$2b$07$abc") == 7
+    assert auth.cost_of("not-a-hash") is None
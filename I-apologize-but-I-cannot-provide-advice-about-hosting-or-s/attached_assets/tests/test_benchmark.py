@@ -0,0 +1,99 @@
+from datetime import datetime
+
+import pytest
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+@pytest.fixture
+def suite(bot, tmp_path, monkeypatch):
+    monkeypatch.setenv("RM_BOT_BCRYPT_ROUNDS", "4")  # Admin padrão de cada banco gerado
+    return bot.BenchmarkSuite(resolutions=['1080p'], db_sizes=(200,), repeat=2, workdir=str(tmp_path))
+
+
+def subscriptions(db):
+    """(usuário, vencimento) de todas as licenças não-admin"""
+    with db.connection() as conn:
+        return conn.execute("""
+            SELECT u.username, s.expires_at FROM subscriptions s JOIN users u ON u.id = s.user_id
+            WHERE NOT u.is_admin ORDER BY u.username
+        """).fetchall()
+
+
+def test_measure_reports_ordered_stats(bot):
+    calls = []
+    stats = bot.measure(lambda: calls.append(1), repeat=5, warmup=2)
+    
+    assert len(calls) == 7
+    assert stats['runs'] == 5
+    assert stats['min_ms'] <= stats['median_ms'] <= stats['p95_ms']
+
+
+def test_compare_benchmarks_flags_only_regressions_beyond_tolerance(bot):
+    baseline = {'meta': {'median_ms': 1.0},
+                'vision': {'1080p': {'full': {'median_ms': 10.0}, 'local': {'median_ms': 1.0}}}}
+    current = {'meta': {'median_ms': 99.0},
+               'vision': {'1080p': {'full': {'median_ms': 11.5}, 'local': {'median_ms': 1.5}},
+                          '4k': {'full': {'median_ms': 50.0}}}}
+    
+    assert bot.compare_benchmarks(baseline, current, tolerance=0.2) == [("vision.1080p.local", 1.0, 1.5)]
+
+
+def test_generated_database_is_reproducible_from_seed(bot, suite, tmp_path):
+    first = subscriptions(suite.generate_database(200, now=NOW))
+    
+    again = bot.BenchmarkSuite(workdir=str(tmp_path / "again"))
+    assert subscriptions(again.generate_database(200, now=NOW)) == first
+    
+    other = bot.BenchmarkSuite(workdir=str(tmp_path / "other"), seed=99)
+    assert subscriptions(other.generate_database(200, now=NOW)) != first
+    
+    # ~80% com licença, vencendo até 60 dias antes/depois de now
+    assert 120 <= len(first) <= 190
+    for _, expires_at in first:
+        assert abs((datetime.fromisoformat(expires_at) - NOW).days) <= 60
+
+
+def test_bench_database_looks_up_existing_users_after_regeneration(bot, suite, monkeypatch):
+    db = suite.generate_database(200, now=NOW)
+    db.close()
+    # Regenerar desloca os ids AUTOINCREMENT para além de 1..users
+    db = suite.generate_database(200, now=NOW)
+    with db.connection() as conn:
+        existing = {row[0] for row in conn.execute("SELECT id FROM users")}
+    db.close()
+    assert max(existing) > 200
+    
+    looked_up = []
+    original = bot.DatabaseManager.get_user_subscription
+    
+    def spy(self, user_id):
+        looked_up.append(user_id)
+        return original(self, user_id)
+    
+    monkeypatch.setattr(bot.DatabaseManager, "get_user_subscription", spy)
+    results = suite.bench_database()['200']
+    
+    assert looked_up and set(looked_up) <= existing
+    assert results['list_users_first_page']['runs'] == 2
+
+
+def test_bench_scheduler_tracks_every_task(suite):
+    results = suite.bench_scheduler(duration=0.2)
+    
+    assert set(results['tasks']) == {'f1', 'f2', 'f3', 'f4'}
+    assert all(task['fired'] >= 1 for task in results['tasks'].values())
+
+
+def test_bench_vision_finds_planted_templates(suite):
+    pytest.importorskip("cv2")
+    results = suite.bench_vision()['1080p']
+    
+    assert results['found'] and results['pyramid_found']
+
+
+def test_bench_fishing_measures_each_check(suite):
+    pytest.importorskip("cv2")
+    results = suite.bench_fishing()['1080p']
+    
+    assert set(results) == {'patch_check', 'shared_frame_check', 'all_points'}
@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+WATER = (40, 90, 160)
+GRASS = (60, 140, 50)
+BOBBER = (220, 40, 40)
+
+
+def cast(detector, samples, reference=None):
+    """Lançar no ponto 0 e devolver o índice da amostra que confirmou a mordida (ou None)"""
+    detector.start_cast(0, reference)
+    for i, color in enumerate(samples):
+        if detector.update(0, color):
+            return i
+    return None
+
+
+def test_detects_bite_after_confirm_samples(bot):
+    detector = bot.BiteDetector()
+    samples = [WATER] * 10 + [BOBBER] * 3
+    assert cast(detector, samples, WATER) == 11
+
+
+def test_single_noisy_sample_is_ignored(bot):
+    detector = bot.BiteDetector()
+    samples = [WATER] * 5 + [BOBBER] + [WATER] * 5
+    assert cast(detector, samples, WATER) is None
+
+
+def test_step_change_does_not_cause_endless_false_bites(bot):
+    detector = bot.BiteDetector()
+    assert cast(detector, [WATER] * 10, WATER) is None
+    
+    # Cena mudou de forma duradoura (câmera/overlay) - a referência calibrada ficou velha
+    for _ in range(5):
+        assert cast(detector, [GRASS] * 20, WATER) is None
+    
+    # Mordidas reais continuam sendo detectadas sobre a nova cena
+    assert cast(detector, [GRASS] * 5 + [BOBBER] * 2, WATER) == 6
+
+
+def test_baseline_restarts_each_cast_without_reference(bot):
+    detector = bot.BiteDetector()
+    assert cast(detector, [WATER] * 5) is None
+    assert cast(detector, [GRASS] * 10) is None
+
+
+def test_sampling_speeds_up_inside_learned_window(bot):
+    detector = bot.BiteDetector()
+    for elapsed in (2.0, 2.2, 2.4, 2.6, 2.8):
+        detector.record_bite(elapsed)
+    start, end = detector.expected_window()
+    assert start < 2.0 < 2.8 < end
+    assert detector.next_interval(2.5) == detector.fast_interval
+    assert detector.next_interval(0.1) == detector.slow_interval
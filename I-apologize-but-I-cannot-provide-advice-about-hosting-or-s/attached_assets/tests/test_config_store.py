@@ -0,0 +1,41 @@
+import pytest
+
+
+def test_publish_bumps_version_only_on_change(bot):
+    store = bot.ConfigStore(wait_time=2.0, skills={})
+    first = store.snapshot()
+    
+    assert store.publish(wait_time=2.0) is first
+    second = store.publish(wait_time=3.0)
+    
+    assert second.version == first.version + 1
+    assert store.get("wait_time") == 3.0
+    assert first.values["wait_time"] == 2.0  # Snapshot antigo não muda
+
+
+def test_new_key_counts_as_change(bot):
+    store = bot.ConfigStore()
+    assert store.publish(fishing_hotkey="f1").version == 1
+    assert store.get("fishing_hotkey") == "f1"
+    assert store.get("missing", "default") == "default"
+
+
+def test_snapshot_values_are_read_only(bot):
+    store = bot.ConfigStore(wait_time=2.0)
+    with pytest.raises(TypeError):
+        store.snapshot().values["wait_time"] = 5.0
+
+
+def test_nested_values_are_frozen_copies(bot):
+    skills = {'f1': 1.0}
+    store = bot.ConfigStore(skills=skills, battle_skills=['f1'])
+    old = store.snapshot()
+    
+    skills['f2'] = 2.0  # Alterar o dict original não afeta o snapshot
+    with pytest.raises(TypeError):
+        old.values['skills']['f3'] = 3.0
+    assert dict(old.values['skills']) == {'f1': 1.0}
+    assert old.values['battle_skills'] == ('f1',)
+    
+    assert store.publish(skills={'f1': 1.0}) is old
+    assert dict(store.publish(skills=skills).values['skills']) == {'f1': 1.0, 'f2': 2.0}
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def add_user(db, username, created_at, expires_at=None):
+    """Usuário com created_at fixo (e assinatura ativa, se expires_at) - sem custo de bcrypt"""
+    with db.transaction() as conn:
+        user_id = conn.execute(
+            "INSERT INTO users (username, password_hash, created_at) VALUES (?, 'x', ?)",
+            (username, created_at.isoformat(" "))
+        ).lastrowid
+        if expires_at is not None:
+            conn.execute(
+                "INSERT INTO subscriptions (user_id, expires_at, subscription_type) VALUES (?, ?, ?)",
+                (user_id, expires_at.isoformat(" "), "premium")
+            )
+    return user_id
+
+
+def usernames(db):
+    with db.connection() as conn:
+        return {row[0] for row in conn.execute("SELECT username FROM users")}
+
+
+def expiry(db, user_id):
+    with db.connection() as conn:
+        row = conn.execute("SELECT expires_at FROM subscriptions WHERE user_id = ? AND active = 1",
+                           (user_id,)).fetchone()
+    return datetime.fromisoformat(row[0]) if row else None
+
+
+def test_migrations_reach_latest_version_once(bot, db, capsys):
+    latest = bot.DatabaseManager.MIGRATIONS[-1][0]
+    assert db.schema_version() == latest
+    
+    capsys.readouterr()
+    db.migrate()
+    assert "Migração" not in capsys.readouterr().out
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == latest
+
+
+def test_reopening_keeps_data_and_single_admin(bot, db):
+    add_user(db, "ash", datetime.now())
+    db.close()
+    
+    reopened = bot.DatabaseManager(db.db_path)
+    try:
+        assert usernames(reopened) == {"admin", "ash"}
+    finally:
+        reopened.close()
+
+
+def test_create_user_rejects_duplicates(db):
+    assert db.create_user("ash", "pikachu") is not None
+    assert db.create_user("ash", "pikachu") is None
+
+
+def test_transaction_rolls_back_on_error(db):
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO users (username, password_hash) VALUES ('ghost', 'x')")
+            raise RuntimeError("falha no meio da transação")
+    
+    assert "ghost" not in usernames(db)
+
+
+def test_keyset_pagination_walks_all_users_without_gaps(db):
+    base = datetime(2026, 1, 1)
+    # Pares com o mesmo created_at exercitam o desempate por id
+    ids = [add_user(db, f"user{i:02d}", base + timedelta(minutes=i // 2)) for i in range(25)]
+    
+    seen, cursor = [], None
+    while True:
+        page, cursor = db.list_users(search="user", after=cursor, limit=10)
+        seen.extend(user['id'] for user in page)
+        if cursor is None:
+            break
+    
+    assert len(seen) == len(set(seen)) == 25
+    assert set(seen) == set(ids)
+    # Mais novos primeiro
+    assert seen[0] in ids[-2:]
+
+
+def test_list_users_filters_by_status_and_escapes_search(db):
+    now = datetime(2026, 6, 1)
+    add_user(db, "active_one", now, expires_at=now + timedelta(days=5))
+    add_user(db, "expired_one", now, expires_at=now - timedelta(days=5))
+    add_user(db, "no_license", now)
+    add_user(db, "percent%user", now)
+    
+    def names(**kwargs):
+        return {user['username'] for user in db.list_users(now=now, **kwargs)[0]}
+    
+    assert names(status='active') == {"admin", "active_one"}
+    assert names(status='expired') == {"expired_one"}
+    assert names(status='none') == {"no_license", "percent%user"}
+    assert names(status='admin') == {"admin"}
+    assert names(search="%") == {"percent%user"}
+    assert names(search="_one") == {"active_one", "expired_one"}
+
+
+def test_user_stats_counts_by_status(db):
+    now = datetime(2026, 6, 1)
+    add_user(db, "active_one", now, expires_at=now + timedelta(days=5))
+    add_user(db, "expired_one", now, expires_at=now - timedelta(days=5))
+    add_user(db, "no_license", now)
+    
+    # admin conta como ativo (licença de um ano a partir de hoje)
+    assert db.user_stats(now=now) == {'total': 4, 'active': 2, 'expired': 1}
+
+
+def test_extend_all_subscriptions(db):
+    now = datetime(2026, 6, 1)
+    active = add_user(db, "active_one", now, expires_at=now + timedelta(days=5))
+    expired = add_user(db, "expired_one", now, expires_at=now - timedelta(days=5))
+    missing = add_user(db, "no_license", now)
+    admin_before = expiry(db, 1)
+    
+    assert db.extend_all_subscriptions(10, now=now) == 3
+    
+    assert expiry(db, active) == now + timedelta(days=15)
+    assert expiry(db, expired) == now + timedelta(days=10)
+    assert expiry(db, missing) == now + timedelta(days=10)
+    assert expiry(db, 1) == admin_before
+
+
+def test_purge_expired_removes_only_expired_non_admins(db):
+    now = datetime(2026, 6, 1)
+    active = add_user(db, "active_one", now, expires_at=now + timedelta(days=5))
+    add_user(db, "expired_one", now, expires_at=now - timedelta(days=5))
+    add_user(db, "no_license", now)
+    
+    assert db.purge_expired(now=now) == 1
+    
+    with db.connection() as conn:
+        orphans = conn.execute(
+            "SELECT COUNT(*) FROM subscriptions WHERE user_id NOT IN (SELECT id FROM users)"
+        ).fetchone()[0]
+    assert usernames(db) == {"admin", "active_one", "no_license"}
+    assert orphans == 0
+    assert expiry(db, active) == now + timedelta(days=5)
+
+
+def test_extend_user_subscription_invalidates_entitlement(db):
+    user_id = add_user(db, "ash", datetime.now(), expires_at=datetime.now() - timedelta(days=1))
+    assert not db.is_entitled(user_id)
+    
+    db.extend_user_subscription(user_id, 3)
+    
+    assert db.is_entitled(user_id)
+    assert db.get_user_subscription(user_id)['days_remaining'] in (2, 3)
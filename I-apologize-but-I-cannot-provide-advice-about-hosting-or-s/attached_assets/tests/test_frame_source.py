@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Monitor secundário à esquerda e acima do principal (1920x1080 em 0,0)
+DESKTOP = {'left': -1280, 'top': -200, 'width': 3200, 'height': 1280}
+
+
+class FakeMSS:
+    """Instância do mss com a área virtual DESKTOP que registra as capturas"""
+    
+    monitors = [DESKTOP]
+    
+    def __init__(self):
+        self.grabs = []
+    
+    def grab(self, area):
+        self.grabs.append(area)
+        return np.zeros((area['height'], area['width'], 4), dtype=np.uint8)
+
+
+@pytest.fixture
+def source(bot):
+    source = bot.MSSFrameSource.__new__(bot.MSSFrameSource)
+    source._local = threading.local()
+    source._local.sct = FakeMSS()
+    return source
+
+
+def test_clip_region_limits_to_frame(bot):
+    # Parte fora à esquerda/acima encurta a região, não só a desloca
+    assert bot.clip_region((-10, -5, 20, 50), 30, 40) == (0, 0, 10, 40)
+    assert bot.clip_region((25, 5, 50, 50), 30, 40) == (25, 5, 5, 35)
+    assert bot.clip_region((100, 100, 5, 5), 30, 40) == (30, 40, 0, 0)
+    assert bot.clip_region(None, 30, 40) == (0, 0, 30, 40)
+
+
+def test_mss_area_uses_virtual_desktop_bounds(source):
+    assert source.area() == (-1280, -200, 3200, 1280)
+    # Região no monitor da esquerda não é recortada para x >= 0
+    assert source.area((-1000, -100, 200, 100)) == (-1000, -100, 200, 100)
+    # Região que passa da borda esquerda/superior da área virtual
+    assert source.area((-1300, -250, 100, 100)) == (-1280, -200, 80, 50)
+    assert source.area((1900, 1000, 100, 100)) == (1900, 1000, 20, 80)
+
+
+def test_mss_grab_captures_the_clipped_area(source):
+    pytest.importorskip("cv2")
+    frame = source.grab((-1300, -250, 100, 100))
+    
+    assert source._local.sct.grabs == [{'left': -1280, 'top': -200, 'width': 80, 'height': 50}]
+    assert frame.shape == (50, 80, 3)
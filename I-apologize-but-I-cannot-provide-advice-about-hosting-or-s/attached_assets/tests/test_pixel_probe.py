@@ -0,0 +1,67 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def source(bot):
+    """Frame 200x100 com gradiente conhecido que registra cada região capturada"""
+    class Source(bot.FileFrameSource):
+        def grab(self, region=None):
+            self.regions.append(region)
+            return super().grab(region)
+    
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    frame[:, :, 0] = np.arange(200)[None, :]  # B = x
+    frame[:, :, 1] = np.arange(100)[:, None]  # G = y
+    result = Source([frame])
+    result.regions = []
+    return result
+
+
+def test_sample_subset_grabs_only_requested_patch(bot, source):
+    probe = bot.PixelProbe(source, [(10, 10), (150, 80)], radius=1)
+    
+    colors = probe.sample([1])
+    
+    assert source.regions == [(149, 79, 3, 3)]
+    np.testing.assert_allclose(colors[0], (0, 80, 150))
+
+
+def test_sample_all_uses_bounding_box(bot, source):
+    probe = bot.PixelProbe(source, [(10, 10), (20, 30)])
+    
+    colors = probe.sample()
+    
+    assert source.regions == [probe.box]
+    np.testing.assert_allclose(colors, [(0, 10, 10), (0, 30, 20)])
+
+
+def test_sample_from_frame_uses_origin(bot, source):
+    probe = bot.PixelProbe(None, [(110, 60)], radius=1)
+    patch = source.current()[50:70, 100:120]
+    
+    np.testing.assert_allclose(probe.sample([0], patch, origin=(100, 50))[0], (0, 60, 110))
+
+
+def test_sample_clips_patch_at_frame_edge(bot, source):
+    probe = bot.PixelProbe(None, [(0, 0)], radius=1)
+    
+    # Só os pixels dentro do frame entram na média
+    np.testing.assert_allclose(probe.sample([0], source.current())[0], (0, 0.5, 0.5))
+
+
+@pytest.mark.parametrize("point", [(-5, 10), (10, -5), (205, 10), (10, 105)])
+def test_sample_rejects_points_outside_frame(bot, source, point):
+    probe = bot.PixelProbe(None, [point], radius=1)
+    
+    with pytest.raises(ValueError):
+        probe.sample([0], source.current())
+
+
+def test_covers_requires_whole_patch(bot):
+    probe = bot.PixelProbe(None, [(110, 60)], radius=2)
+    
+    assert probe.covers([0], (20, 20, 3), origin=(100, 50))
+    assert not probe.covers([0], (20, 20, 3), origin=(109, 50))
+    assert not probe.covers([0], (11, 20, 3), origin=(100, 50))
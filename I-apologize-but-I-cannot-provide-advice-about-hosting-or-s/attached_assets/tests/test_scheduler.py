@@ -0,0 +1,95 @@
+import pytest
+
+
+class FakeTime:
+    """Relógio controlado pelo teste no lugar do módulo time do bot"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(bot, monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(bot, "time", fake)
+    return fake
+
+
+def run_for(scheduler, clock, seconds, step=0.01):
+    """Avançar o relógio em passos, disparando o que vencer"""
+    end = clock.now + seconds
+    while clock.now < end:
+        scheduler.run_pending()
+        clock.now += step
+
+
+def test_tasks_fire_on_their_own_interval(bot, clock):
+    scheduler = bot.CooldownScheduler()
+    fired = []
+    scheduler.set_task("f1", 0.5, lambda: fired.append("f1"))
+    scheduler.set_task("f2", 1.0, lambda: fired.append("f2"))
+    
+    run_for(scheduler, clock, 2.0)
+    
+    assert fired.count("f1") == 4
+    assert fired.count("f2") == 2
+
+
+def test_interval_is_clamped_to_minimum(bot, clock):
+    scheduler = bot.CooldownScheduler(min_interval=0.2)
+    scheduler.set_task("f1", 0.0, lambda: None)
+    assert scheduler.tasks["f1"]["interval"] == 0.2
+
+
+def test_remove_and_readd_keeps_single_firing_rate(bot, clock):
+    scheduler = bot.CooldownScheduler()
+    fired = []
+    scheduler.set_task("f1", 0.5, lambda: fired.append(1))
+    run_for(scheduler, clock, 0.2)
+    
+    scheduler.remove("f1")
+    scheduler.set_task("f1", 0.5, lambda: fired.append(1))
+    fired.clear()
+    run_for(scheduler, clock, 2.0)
+    
+    # Entrada antiga do heap não pode disparar junto com a nova
+    assert len(fired) == 4
+    assert len(scheduler.heap) == 1
+
+
+def test_removed_task_stops_firing_and_keeps_stats(bot, clock):
+    scheduler = bot.CooldownScheduler()
+    fired = []
+    scheduler.set_task("f1", 0.5, lambda: fired.append(1))
+    run_for(scheduler, clock, 1.0)
+    count = len(fired)
+    
+    scheduler.remove("f1")
+    run_for(scheduler, clock, 1.0)
+    
+    assert len(fired) == count
+    assert scheduler.time_until_next() is None
+    assert scheduler.drift_stats()["f1"]["fired"] == count
+
+
+def test_sync_adds_updates_and_removes(bot, clock):
+    scheduler = bot.CooldownScheduler()
+    scheduler.sync({"f1": 1.0, "f2": 2.0}, lambda key: lambda: None)
+    scheduler.sync({"f1": 3.0}, lambda key: lambda: None)
+    
+    assert set(scheduler.tasks) == {"f1"}
+    assert scheduler.tasks["f1"]["interval"] == 3.0
+
+
+def test_time_until_next_reports_nearest_deadline(bot, clock):
+    scheduler = bot.CooldownScheduler()
+    scheduler.set_task("f1", 1.0, lambda: None)
+    scheduler.run_pending()
+    clock.now += 0.25
+    assert scheduler.time_until_next() == pytest.approx(0.75)
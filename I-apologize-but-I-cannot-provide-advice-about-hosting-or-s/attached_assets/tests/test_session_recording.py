@@ -0,0 +1,59 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+
+def test_round_trip_rebuilds_frames_and_events(bot, tmp_path):
+    path = str(tmp_path / "sessao.rmrec")
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, (40, 60, 3), dtype=np.uint8) for _ in range(3)]
+    patch = rng.integers(0, 255, (3, 3, 3), dtype=np.uint8)
+    
+    recorder = bot.SessionRecorder(path, keyframe_interval=4, max_pending=256)
+    recorder.meta['frame_source'] = "file"
+    expected = []
+    for i in range(10):
+        image = frames[i % 3].copy()
+        image[0, 0] = i  # Deltas com valores que dão a volta em uint8
+        recorder.add_frame(image)
+        expected.append(image)
+        recorder.add_frame(patch, region=(5, 5, 3, 3), origin=(5, 5))
+        recorder.event("cast", point=i)
+    recorder.close()
+    
+    reader = bot.SessionReader(path)
+    try:
+        assert reader.meta == {'frame_source': "file"}
+        assert reader.index['dropped'] == 0
+        assert [event['point'] for event in reader.events] == list(range(10))
+        
+        full = [entry for entry in reader.frames if entry['region'] is None]
+        patches = [entry for entry in reader.frames if entry['region'] is not None]
+        assert len(full) == 10 and len(patches) == 10
+        # Keyframe a cada keyframe_interval frames da mesma região
+        assert [entry['base'] is None for entry in full] == [i % 4 == 0 for i in range(10)]
+        assert patches[0]['origin'] == [5, 5]
+        
+        # Acesso aleatório, fora de ordem
+        for i in (7, 2, 9, 0, 5):
+            np.testing.assert_array_equal(reader.frame(full[i]['n']), expected[i])
+        np.testing.assert_array_equal(reader.frame(patches[6]['n']), patch)
+        
+        kinds = [kind for kind, _ in reader.timeline()]
+        assert kinds.count('frame') == 20 and kinds.count('event') == 10
+    finally:
+        reader.close()
+
+
+def test_recorder_ignores_frames_after_close(bot, tmp_path):
+    recorder = bot.SessionRecorder(str(tmp_path / "vazio.rmrec"))
+    recorder.close()
+    recorder.add_frame(np.zeros((4, 4, 3), dtype=np.uint8))
+    recorder.close()
+    
+    reader = bot.SessionReader(recorder.path)
+    try:
+        assert reader.frames == [] and reader.events == []
+    finally:
+        reader.close()